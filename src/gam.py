@@ -5,13 +5,11 @@
 import multiprocessing
 import platform
 
-from gam.__main__ import main
+from gam.__main__ import main, setMultiprocessingStartMethod
 
 # Run from command line
 if __name__ == '__main__':
   if platform.system() != 'Linux':
     multiprocessing.freeze_support()
-  # Python 3.14.4 and PyInstaller 6.19.0 don't play nice with Linux forkserver
-  # use spawn everywhere for now.
-  multiprocessing.set_start_method('spawn', force=True)
+  setMultiprocessingStartMethod(force=True)
   main()
@@ -35,6 +35,19 @@ datas += [('gam/meet-v2beta.json', '.')]
 datas += [('gam/serviceaccountlookup-v1.json', '.')]
 hiddenimports = [
      'gam.gamlib.yubikey',
+# Loaded on first use by gam.LazyLoader
+     'cryptography.x509',
+     'cryptography.x509.oid',
+     'distro',
+     'gdata.apps.audit.service',
+     'gdata.apps.contacts.service',
+     'gdata.apps.service',
+     'passlib.hash',
+     'smtplib',
+     'sqlite3',
+     'webbrowser',
+     'wsgiref.simple_server',
+     'wsgiref.util',
      ]
 
 excludes = [
@@ -32,7 +32,9 @@ __license__ = 'Apache License 2.0 (http://www.apache.org/licenses/LICENSE-2.0)'
 import base64
 import codecs
 import collections
+import concurrent.futures
 import configparser
+import copy
 import csv
 from email.charset import add_charset, QP
 from email.generator import Generator
@@ -59,6 +61,7 @@ import logging
 from logging.handlers import RotatingFileHandler
 import mimetypes
 import multiprocessing
+import operator
 import os
 import platform
 import queue
@@ -67,15 +70,13 @@ import re
 from secrets import SystemRandom
 import shlex
 import signal
-import smtplib
 import socket
-import sqlite3
 import ssl
 import string
 import struct
 import subprocess
 import sys
-from tempfile import TemporaryFile
+from tempfile import mkdtemp, mkstemp, TemporaryFile
 try:
   import termios
 except ImportError:
@@ -85,21 +86,17 @@ import threading
 import time
 from traceback import print_exc
 import types
-from urllib.parse import quote, quote_plus, unquote, urlencode, urlparse, parse_qs
+from urllib.parse import quote, quote_plus, unquote, urlencode, urljoin, urlparse, parse_qs
+import urllib.request
 import uuid
 import warnings
-import webbrowser
-import wsgiref.simple_server
-import wsgiref.util
 import zipfile
 
 # disable legacy stuff we don't use and isn't secure
 os.environ['CRYPTOGRAPHY_OPENSSL_NO_LEGACY'] = "1"
-from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.x509.oid import NameOID
 
 # 10/2024 - I don't recall why we did this but PyInstaller
 # 6.10.0+ does not like it. Only run this when we're not
@@ -128,12 +125,8 @@ import httplib2
 
 httplib2.RETRIES = 5
 
-from passlib.hash import sha512_crypt
 from filelock import FileLock
 
-if platform.system() == 'Linux':
-  import distro
-
 from gamlib import glaction
 from gamlib import glapi as API
 from gamlib import glcfg as GC
@@ -148,12 +141,6 @@ from gamlib import glskus as SKU
 from gamlib import gluprop as UProp
 from gamlib import glverlibs
 
-import gdata.apps.service
-import gdata.apps.audit
-import gdata.apps.audit.service
-import gdata.apps.contacts
-import gdata.apps.contacts.service
-
 IS08601_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%:z'
 RFC2822_TIME_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
 
@@ -226,6 +213,7 @@ UTF8 = 'utf-8'
 UTF8_SIG = 'utf-8-sig'
 EV_GAMCFGDIR = 'GAMCFGDIR'
 EV_GAMCFGSECTION = 'GAMCFGSECTION'
+EV_GAMTHROTTLEFILE = 'GAMTHROTTLEFILE'
 EV_OLDGAMPATH = 'OLDGAMPATH'
 FN_GAM_CFG = 'gam.cfg'
 FN_LAST_UPDATE_CHECK_TXT = 'lastupdatecheck.txt'
@@ -416,6 +404,17 @@ def redactable_debug_print(*args):
 
 # Multiprocessing lock
 mplock = None
+# API calls rate check lock and token buckets; mprl* are shared by all processes in gam batch/csv
+rllock = threading.Lock()
+mprllock = None
+mprlbuckets = None
+# Creation of the shared HTTP connection pools
+httpPoolLock = threading.Lock()
+# Throttling errors lock and count shared by all processes in gam batch/csv
+mpthrottlelock = None
+mpthrottlecount = None
+# Thread local global state in the worker processes when gam batch/csv runs multiple threads in each process
+mpthreadlocals = None
 
 # stdin/stdout/stderr
 def readStdin(prompt):
@@ -534,18 +533,23 @@ class LazyLoader(types.ModuleType):
 
   `contrib`, and `ffmpeg` are examples of modules that are large and not always
   needed, and this allows them to only be loaded when they are used.
+  Submodules that are referenced as attributes of the module, e.g. wsgiref.simple_server,
+  are imported when the module is loaded.
   """
 
   # The lint error here is incorrect.
-  def __init__(self, local_name, parent_module_globals, name):
+  def __init__(self, local_name, parent_module_globals, name, submodules=None):
     self._local_name = local_name
     self._parent_module_globals = parent_module_globals
+    self._submodules = submodules or []
 
     super().__init__(name)
 
   def _load(self):
     # Import the target module and insert it into the parent's namespace
     module = importlib.import_module(self.__name__)
+    for submodule in self._submodules:
+      importlib.import_module(submodule)
     self._parent_module_globals[self._local_name] = module
 
     # Update this object's dict so that if someone keeps a reference to the
@@ -564,6 +568,16 @@ class LazyLoader(types.ModuleType):
     return dir(module)
 
 yubikey = LazyLoader('yubikey', globals(), 'gam.gamlib.yubikey')
+# Modules only used by some commands; gdata loads lxml, wsgiref.simple_server loads http.server
+distro = LazyLoader('distro', globals(), 'distro')
+gdata = LazyLoader('gdata', globals(), 'gdata',
+                   ['gdata.apps.service', 'gdata.apps.audit', 'gdata.apps.audit.service', 'gdata.apps.contacts', 'gdata.apps.contacts.service'])
+passlib = LazyLoader('passlib', globals(), 'passlib', ['passlib.hash'])
+smtplib = LazyLoader('smtplib', globals(), 'smtplib')
+sqlite3 = LazyLoader('sqlite3', globals(), 'sqlite3')
+webbrowser = LazyLoader('webbrowser', globals(), 'webbrowser')
+wsgiref = LazyLoader('wsgiref', globals(), 'wsgiref', ['wsgiref.simple_server', 'wsgiref.util'])
+x509 = LazyLoader('x509', globals(), 'cryptography.x509', ['cryptography.x509.oid'])
 
 # gam yubikey resetpvi [yubikey_serialnumber <String>]
 def doResetYubiKeyPIV():
@@ -3371,26 +3385,62 @@ def incrAPICallsRetryData(errMsg, delta):
   GM.Globals[GM.API_CALLS_RETRY_DATA][errMsg][1] += delta
 
 def initAPICallsRateCheck():
-  GM.Globals[GM.RATE_CHECK_COUNT] = 0
-  GM.Globals[GM.RATE_CHECK_START] = time.time()
-
-def checkAPICallsRate():
-  GM.Globals[GM.RATE_CHECK_COUNT] += 1
-  if GM.Globals[GM.RATE_CHECK_COUNT] >= GC.Values[GC.API_CALLS_RATE_LIMIT]:
+  GM.Globals[GM.RATE_CHECK_BUCKETS] = {}
+
+# API calls rate is limited by a token bucket per API/user
+# The bucket refills at api_calls_rate_limit/60 tokens per second and holds at most one second of tokens
+# Each call takes a token; if the bucket is empty, the call sleeps until its token is available
+# In gam batch/csv, the buckets are held by the multiprocessing manager and shared by all processes
+def getAPICallsRateKey(service):
+  rootDesc = getattr(service, '_rootDesc', None)
+  if rootDesc:
+    api = rootDesc.get('name', '')
+    credentials = getattr(getattr(service, '_http', None), 'credentials', None)
+    user = getattr(credentials, '_subject', None) or ''
+  else:
+    api = service.__class__.__name__
+    user = ''
+  return f'{api}/{user}'
+
+def checkAPICallsRate(key):
+  rate = GC.Values[GC.API_CALLS_RATE_LIMIT]/60.0
+  capacity = max(1.0, rate)
+  if mprlbuckets is not None:
+    lock = mprllock
+    buckets = mprlbuckets
+  else:
+    lock = rllock
+    buckets = GM.Globals[GM.RATE_CHECK_BUCKETS]
+  with lock:
     current = time.time()
-    delta = int(current-GM.Globals[GM.RATE_CHECK_START])
-    if 0 <= delta < 60:
-      delta = (60-delta)+3
-      error_message = f'API calls per 60 seconds limit {GC.Values[GC.API_CALLS_RATE_LIMIT]} exceeded'
-      writeStderr(f'{WARNING_PREFIX}{error_message}: Backing off: {delta} seconds\n')
+    tokens, last = buckets.get(key, (capacity, current))
+    tokens = min(capacity, tokens+(current-last)*rate)-1.0
+    buckets[key] = (tokens, current)
+  if tokens < 0.0:
+    delta = -tokens/rate
+    error_message = f'API calls per 60 seconds limit {GC.Values[GC.API_CALLS_RATE_LIMIT]} exceeded'
+    if delta >= 1.0:
+      writeStderr(f'{WARNING_PREFIX}{error_message}: Backing off: {int(delta)} seconds\n')
       flushStderr()
-      time.sleep(delta)
-      if GC.Values[GC.SHOW_API_CALLS_RETRY_DATA]:
-        incrAPICallsRetryData(error_message, delta)
-      GM.Globals[GM.RATE_CHECK_START] = time.time()
-    else:
-      GM.Globals[GM.RATE_CHECK_START] = current
-    GM.Globals[GM.RATE_CHECK_COUNT] = 0
+    time.sleep(delta)
+    if GC.Values[GC.SHOW_API_CALLS_RETRY_DATA]:
+      incrAPICallsRetryData(error_message, delta)
+
+# Throttling errors are reported to the adaptive concurrency controller in gam batch/csv/tbatch
+# Processes in gam batch/csv update a count held by the multiprocessing manager
+# Processes started by gam tbatch append a byte to the file named by environment variable GAMTHROTTLEFILE
+def recordThrottleError():
+  if mpthrottlecount is not None:
+    with mpthrottlelock:
+      mpthrottlecount.value += 1
+    return
+  throttleFile = os.environ.get(EV_GAMTHROTTLEFILE)
+  if throttleFile:
+    try:
+      with open(throttleFile, 'ab') as f:
+        f.write(b'.')
+    except IOError:
+      pass
 
 def openGAMCommandLog(Globals, name):
   try:
@@ -4431,9 +4481,122 @@ def handleServerError(e):
   writeStderr(Msg.DISABLE_TLS_MIN_MAX)
   systemErrorExit(NETWORK_ERROR_RC, None)
 
-def getHttpObj(cache=None, timeout=None, override_min_tls=None, override_max_tls=None):
+# http_transport = pooled|http2: the Http objects returned by getHttpObj send their requests through a connection pool
+# that is shared by all services and threads in the process, so TLS connections to a host are kept alive and reused.
+# pooled uses urllib3, http2 uses httpx which multiplexes requests over a single HTTP/2 connection per host.
+HTTP_TRANSPORT_HTTPLIB2 = 'httplib2'
+HTTP_TRANSPORT_POOLED = 'pooled'
+HTTP_TRANSPORT_HTTP2 = 'http2'
+
+def _getTLSContext(tls_minimum_version, tls_maximum_version):
+  context = ssl.create_default_context(cafile=GC.Values[GC.CACERTS_PEM] or None)
+  if GC.Values[GC.NO_VERIFY_SSL]:
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+  if tls_minimum_version:
+    context.minimum_version = getattr(ssl.TLSVersion, tls_minimum_version)
+  if tls_maximum_version:
+    context.maximum_version = getattr(ssl.TLSVersion, tls_maximum_version)
+  return context
+
+class Urllib3ConnectionPool():
+  def __init__(self, context):
+    import urllib3
+    self.urllib3 = urllib3
+    poolKwargs = {'num_pools': 20, 'maxsize': max(10, GC.Values[GC.NUM_THREADS]), 'block': False,
+                  'ssl_context': context, 'retries': False}
+    proxy = urllib.request.getproxies().get('https')
+    self.manager = urllib3.ProxyManager(proxy, **poolKwargs) if proxy else urllib3.PoolManager(**poolKwargs)
+
+  def Request(self, method, uri, body, headers, timeout):
+    try:
+      response = self.manager.request(method, uri, body=body, headers=headers, redirect=False, retries=False,
+                                      timeout=timeout if timeout is not None else self.urllib3.util.Timeout.DEFAULT_TIMEOUT)
+    except self.urllib3.exceptions.HTTPError as e:
+      raise httplib2.HttpLib2Error(str(e)) from e
+    return (response.status, response.reason, {key.lower(): response.headers[key] for key in response.headers}, response.data)
+
+class HTTPXConnectionPool():
+  def __init__(self, context):
+    try:
+      import httpx
+    except ImportError:
+      systemErrorExit(CONFIG_ERROR_RC, Msg.HTTP_TRANSPORT_HTTP2_NOT_AVAILABLE)
+    self.httpx = httpx
+    try:
+      self.client = httpx.Client(http2=True, verify=context, follow_redirects=False, timeout=None,
+                                 limits=httpx.Limits(max_connections=None, max_keepalive_connections=max(10, GC.Values[GC.NUM_THREADS])))
+    except ImportError:
+      systemErrorExit(CONFIG_ERROR_RC, Msg.HTTP_TRANSPORT_HTTP2_NOT_AVAILABLE)
+
+  def Request(self, method, uri, body, headers, timeout):
+    try:
+      response = self.client.request(method, uri, content=body, headers=headers,
+                                     timeout=timeout if timeout is not None else self.httpx.USE_CLIENT_DEFAULT)
+    except self.httpx.HTTPError as e:
+      raise httplib2.HttpLib2Error(str(e)) from e
+    return (response.status_code, response.reason_phrase, {key: response.headers[key] for key in response.headers.keys()}, response.content)
+
+# Pools are per process; connections inherited from a parent process by fork must not be used
+def getHttpConnectionPool(transport, tls_minimum_version, tls_maximum_version):
+  poolKey = (os.getpid(), transport, tls_minimum_version, tls_maximum_version)
+  with httpPoolLock:
+    pool = GM.Globals[GM.HTTP_CONNECTION_POOLS].get(poolKey)
+    if pool is None:
+      context = _getTLSContext(tls_minimum_version, tls_maximum_version)
+      pool = HTTPXConnectionPool(context) if transport == HTTP_TRANSPORT_HTTP2 else Urllib3ConnectionPool(context)
+      GM.Globals[GM.HTTP_CONNECTION_POOLS][poolKey] = pool
+    return pool
+
+class PooledHttp():
+  """An httplib2.Http compatible object that sends its requests through a shared connection pool."""
+
+  def __init__(self, pool, timeout=None):
+    self.pool = pool
+    self.timeout = timeout
+    self.cache = None
+    self.follow_redirects = True
+    self.redirect_codes = set(httplib2.REDIRECT_CODES) - {308}
+
+# Connections that fail are discarded by the pool; there is nothing for callers to reset
+  @property
+  def connections(self):
+    return {}
+
+  @connections.setter
+  def connections(self, value):
+    pass
+
+  def close(self):
+    pass
+
+  def request(self, uri, method='GET', body=None, headers=None, redirections=httplib2.DEFAULT_MAX_REDIRECTS, connection_type=None): #pylint: disable=unused-argument
+    headers = dict(headers or {})
+    for _ in range(redirections+1):
+      status, reason, responseHeaders, content = self.pool.Request(method, uri, body, headers, self.timeout)
+      if 'content-encoding' in responseHeaders:
+        responseHeaders['-content-encoding'] = responseHeaders.pop('content-encoding')
+      response = httplib2.Response(responseHeaders)
+      response.status = status
+      response.reason = reason
+      response['status'] = str(status)
+      location = responseHeaders.get('location')
+      if (not self.follow_redirects or status not in self.redirect_codes or not location or
+          (method not in {'GET', 'HEAD'} and status != 303)):
+        return (response, content)
+      uri = urljoin(uri, location)
+      if status == 303 and method != 'HEAD':
+        method = 'GET'
+        body = None
+    raise httplib2.RedirectLimit('Redirected more times than redirection_limit allows.', response, content)
+
+def getHttpObj(cache=None, timeout=None, override_min_tls=None, override_max_tls=None, transport=None):
   tls_minimum_version = override_min_tls if override_min_tls else GC.Values[GC.TLS_MIN_VERSION] if GC.Values[GC.TLS_MIN_VERSION] else None
   tls_maximum_version = override_max_tls if override_max_tls else GC.Values[GC.TLS_MAX_VERSION] if GC.Values[GC.TLS_MAX_VERSION] else None
+  if transport is None:
+    transport = GC.Values.get(GC.HTTP_TRANSPORT, HTTP_TRANSPORT_HTTPLIB2)
+  if transport != HTTP_TRANSPORT_HTTPLIB2:
+    return PooledHttp(getHttpConnectionPool(transport, tls_minimum_version, tls_maximum_version), timeout)
   httpObj = httplib2.Http(cache=cache,
                           timeout=timeout,
                           ca_certs=GC.Values[GC.CACERTS_PEM],
@@ -4888,8 +5051,93 @@ def getAPIService(api, httpObj):
   return googleapiclient.discovery.build(api, version, http=httpObj, cache_discovery=False,
                                          discoveryServiceUrl=DISCOVERY_URIS[v2discovery], static_discovery=False)
 
+# Downloaded discovery documents are cached in cache_dir/discovery
+# <api>-<version>[-<label>].ref is a JSON index entry: {"sha256": <Hash of document>, "fetched": <Time>}
+# <sha256>.json holds the document text; it is only used if its hash matches its name,
+# and it is removed when no index entry refers to it
+# Documents are refreshed after discovery_cache_hours unless the API is in discovery_cache_pinned_apis
+DISCOVERY_CACHE_SUBDIR = 'discovery'
+
+def _getDiscoveryCacheDir():
+  if not GM.Globals[GM.CACHE_DIR] or GC.Values.get(GC.DISCOVERY_CACHE_HOURS, 0) == 0:
+    return None
+  cacheDir = os.path.join(GM.Globals[GM.CACHE_DIR], DISCOVERY_CACHE_SUBDIR)
+  if not os.path.isdir(cacheDir):
+    try:
+      os.makedirs(cacheDir, exist_ok=True)
+    except OSError:
+      return None
+  return cacheDir
+
+def _getDiscoveryCacheKey(api, version, label=''):
+  return f'{api}-{version}-{label}' if label else f'{api}-{version}'
+
+def _readDiscoveryCacheRef(cacheDir, cacheKey):
+  with open(os.path.join(cacheDir, f'{cacheKey}.ref'), 'r', encoding=UTF8) as f:
+    return json.load(f)
+
+def readDiscoveryCache(cacheKey, pinned=False):
+  cacheDir = _getDiscoveryCacheDir()
+  if not cacheDir:
+    return None
+  try:
+    ref = _readDiscoveryCacheRef(cacheDir, cacheKey)
+    if not pinned and time.time()-ref['fetched'] > GC.Values[GC.DISCOVERY_CACHE_HOURS]*SECONDS_PER_HOUR:
+      return None
+    with open(os.path.join(cacheDir, f'{ref["sha256"]}.json'), 'rb') as f:
+      jsonData = f.read()
+    if hashlib.sha256(jsonData).hexdigest() != ref['sha256']:
+      return None
+    return json.loads(jsonData)
+  except (OSError, ValueError, KeyError, TypeError):
+    return None
+
+def _writeDiscoveryCacheFile(filename, data):
+  tmpFilename = f'{filename}.{os.getpid()}.tmp'
+  try:
+    with open(tmpFilename, 'wb') as f:
+      f.write(data)
+    os.replace(tmpFilename, filename)
+  except OSError:
+    try:
+      os.remove(tmpFilename)
+    except OSError:
+      pass
+
+# Remove a document that was replaced if no other index entry refers to it
+def _pruneDiscoveryCache(cacheDir, sha256):
+  for filename in os.listdir(cacheDir):
+    if filename.endswith('.ref'):
+      try:
+        if _readDiscoveryCacheRef(cacheDir, filename[:-4]).get('sha256') == sha256:
+          return
+      except (OSError, ValueError, AttributeError):
+        pass
+  os.remove(os.path.join(cacheDir, f'{sha256}.json'))
+
+def writeDiscoveryCache(cacheKey, discovery):
+  cacheDir = _getDiscoveryCacheDir()
+  if not cacheDir:
+    return
+  try:
+    try:
+      oldSha256 = _readDiscoveryCacheRef(cacheDir, cacheKey).get('sha256')
+    except (OSError, ValueError, AttributeError):
+      oldSha256 = None
+    jsonData = json.dumps(discovery, ensure_ascii=False, sort_keys=True).encode(UTF8)
+    sha256 = hashlib.sha256(jsonData).hexdigest()
+    objectFile = os.path.join(cacheDir, f'{sha256}.json')
+    if not os.path.isfile(objectFile):
+      _writeDiscoveryCacheFile(objectFile, jsonData)
+    _writeDiscoveryCacheFile(os.path.join(cacheDir, f'{cacheKey}.ref'), json.dumps({'sha256': sha256, 'fetched': time.time()}).encode(UTF8))
+    if oldSha256 and oldSha256 != sha256:
+      _pruneDiscoveryCache(cacheDir, oldSha256)
+  except (OSError, TypeError, ValueError):
+    pass
+
 def getService(api, httpObj):
   hasLocalJSON = API.hasLocalJSON(api)
+  pinned = api in GC.Values.get(GC.DISCOVERY_CACHE_PINNED_APIS, [])
   api, version, v2discovery = API.getVersion(api)
   if api in GM.Globals[GM.CURRENT_API_SERVICES] and version in GM.Globals[GM.CURRENT_API_SERVICES][api]:
     service = googleapiclient.discovery.build_from_document(GM.Globals[GM.CURRENT_API_SERVICES][api][version], http=httpObj)
@@ -4897,19 +5145,33 @@ def getService(api, httpObj):
       clearServiceCache(service)
     return service
   if not hasLocalJSON:
+    if api not in GM.Globals[GM.DEVELOPER_PREVIEW_APIS] or not GC.Values[GC.DEVELOPER_PREVIEW_API_KEY]:
+      discoveryServiceUrl = DISCOVERY_URIS[v2discovery]
+      developerKey = ''
+      cacheKey = _getDiscoveryCacheKey(api, version)
+    else:
+      discoveryServiceUrl = DEVELOPER_PREVIEW_DISCOVERY_URI
+      developerKey = GC.Values[GC.DEVELOPER_PREVIEW_API_KEY]
+      cacheKey = _getDiscoveryCacheKey(api, version, 'DEVELOPER_PREVIEW')
+    discovery = readDiscoveryCache(cacheKey, pinned=pinned)
+    if discovery is not None:
+      try:
+        service = googleapiclient.discovery.build_from_document(discovery, http=httpObj, developerKey=developerKey or None)
+        GM.Globals[GM.CURRENT_API_SERVICES].setdefault(api, {})
+        GM.Globals[GM.CURRENT_API_SERVICES][api][version] = service._rootDesc.copy()
+        if GM.Globals[GM.CACHE_DISCOVERY_ONLY]:
+          clearServiceCache(service)
+        return service
+      except (googleapiclient.errors.InvalidJsonError, KeyError, ValueError):
+        pass
     triesLimit = 3
     for n in range(1, triesLimit+1):
       try:
-        if api not in GM.Globals[GM.DEVELOPER_PREVIEW_APIS] or not GC.Values[GC.DEVELOPER_PREVIEW_API_KEY]:
-          discoveryServiceUrl = DISCOVERY_URIS[v2discovery]
-          developerKey = ''
-        else:
-          discoveryServiceUrl = DEVELOPER_PREVIEW_DISCOVERY_URI
-          developerKey = GC.Values[GC.DEVELOPER_PREVIEW_API_KEY]
         service = googleapiclient.discovery.build(api, version, http=httpObj, cache_discovery=False,
                                                   discoveryServiceUrl=discoveryServiceUrl, developerKey=developerKey, static_discovery=False)
         GM.Globals[GM.CURRENT_API_SERVICES].setdefault(api, {})
         GM.Globals[GM.CURRENT_API_SERVICES][api][version] = service._rootDesc.copy()
+        writeDiscoveryCache(cacheKey, service._rootDesc)
         if GM.Globals[GM.CACHE_DISCOVERY_ONLY]:
           clearServiceCache(service)
         return service
@@ -5070,6 +5332,83 @@ def getSvcAcctCredentials(scopesOrAPI, userEmail, softErrors=False, forceOauth=F
   GM.Globals[GM.OAUTH2SERVICE_CLIENT_ID] = GM.Globals[GM.OAUTH2SERVICE_JSON_DATA]['client_id']
   return credentials
 
+# Service account access tokens are cached in cache_dir/svcaccttokens.db keyed by (service account, subject, scopes)
+SVCACCT_TOKEN_CACHE_FILE = 'svcaccttokens.db'
+
+def _getSvcAcctTokenCacheKey(credentials):
+  if not GC.Values[GC.SVCACCT_TOKEN_CACHE] or not GM.Globals[GM.CACHE_DIR] or not isinstance(credentials, google.oauth2.service_account.Credentials):
+    return None
+  return (credentials.service_account_email, credentials._subject or '', ' '.join(sorted(credentials._scopes or [])))
+
+# The database file is created, or its permissions set, before SQLite opens it so that tokens are never readable by others;
+# SQLite creates its journal files with the permissions of the database file
+def _openSvcAcctTokenCache():
+  dbFile = os.path.join(GM.Globals[GM.CACHE_DIR], SVCACCT_TOKEN_CACHE_FILE)
+  os.close(os.open(dbFile, os.O_RDWR|os.O_CREAT, 0o600))
+  os.chmod(dbFile, 0o600)
+  conn = sqlite3.connect(dbFile, timeout=30)
+  conn.execute('CREATE TABLE IF NOT EXISTS tokens (svcacct TEXT, subject TEXT, scopes TEXT, token TEXT, expiry REAL, PRIMARY KEY (svcacct, subject, scopes))')
+  return conn
+
+def _showSvcAcctTokenCacheStatus(status, key):
+  if GC.Values[GC.DEBUG_LEVEL] > 0:
+    writeStderr(f'Service account token cache {status}: {key[0]}, {key[1]}, hits: {GM.Globals[GM.SVCACCT_TOKEN_CACHE_HITS]}, misses: {GM.Globals[GM.SVCACCT_TOKEN_CACHE_MISSES]}\n')
+
+def refreshSvcAcctCredentials(credentials, request):
+  tokens = GM.Globals[GM.SVCACCT_TOKENS]
+  if tokens is None or not isinstance(credentials, google.oauth2.service_account.Credentials):
+    _refreshSvcAcctCredentials(credentials, request)
+    return
+# gam daemon keeps the tokens it gets in memory, keyed by section, service account, subject and scopes
+  key = (GM.Globals[GM.GAM_CFG_SECTION_NAME], credentials.service_account_email, credentials._subject or '', ' '.join(sorted(credentials._scopes or [])))
+  token = tokens.get(key)
+  if token and token[1] > time.time()+GC.Values[GC.SVCACCT_TOKEN_CACHE_MARGIN]:
+    credentials.token = token[0]
+    credentials.expiry = arrow.get(token[1]).naive
+    return
+  _refreshSvcAcctCredentials(credentials, request)
+  if credentials.token and credentials.expiry:
+    tokens[key] = (credentials.token, arrow.get(credentials.expiry).timestamp())
+
+def _refreshSvcAcctCredentials(credentials, request):
+  key = _getSvcAcctTokenCacheKey(credentials)
+  if key is None:
+    credentials.refresh(request)
+    return
+  lock = FileLock(os.path.join(GM.Globals[GM.CACHE_DIR], f'{SVCACCT_TOKEN_CACHE_FILE}.lock'))
+  minExpiry = time.time()+GC.Values[GC.SVCACCT_TOKEN_CACHE_MARGIN]
+  try:
+    with lock:
+      conn = _openSvcAcctTokenCache()
+      try:
+        row = conn.execute('SELECT token, expiry FROM tokens WHERE svcacct = ? AND subject = ? AND scopes = ?', key).fetchone()
+      finally:
+        conn.close()
+  except (OSError, sqlite3.Error):
+    row = None
+  if row and row[1] > minExpiry:
+    credentials.token = row[0]
+    credentials.expiry = arrow.get(row[1]).naive
+    GM.Globals[GM.SVCACCT_TOKEN_CACHE_HITS] += 1
+    _showSvcAcctTokenCacheStatus('hit', key)
+    return
+  GM.Globals[GM.SVCACCT_TOKEN_CACHE_MISSES] += 1
+  _showSvcAcctTokenCacheStatus('miss', key)
+  credentials.refresh(request)
+  if not credentials.token or not credentials.expiry:
+    return
+  try:
+    with lock:
+      conn = _openSvcAcctTokenCache()
+      try:
+        with conn:
+          conn.execute('DELETE FROM tokens WHERE expiry <= ?', (time.time(),))
+          conn.execute('INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)', key+(credentials.token, arrow.get(credentials.expiry).timestamp()))
+      finally:
+        conn.close()
+  except (OSError, sqlite3.Error):
+    pass
+
 def getGDataOAuthToken(gdataObj, credentials=None):
   if not credentials:
     credentials = getClientCredentials(refreshOnly=True)
@@ -5214,7 +5553,7 @@ def callGData(service, function,
   allRetryErrors = GDATA.NON_TERMINATING_ERRORS+retryErrors
   method = getattr(service, function)
   if GC.Values[GC.API_CALLS_RATE_CHECK]:
-    checkAPICallsRate()
+    checkAPICallsRate(getAPICallsRateKey(service))
   for n in range(1, triesLimit+1):
     try:
       return method(**kwargs)
@@ -5224,6 +5563,8 @@ def callGData(service, function,
         if (error_code == GDATA.INTERNAL_SERVER_ERROR and
             bailOnInternalServerError and n == GC.Values[GC.BAIL_ON_INTERNAL_ERROR_TRIES]):
           raise GDATA.ERROR_CODE_EXCEPTION_MAP[error_code](error_message)
+        if error_code in GDATA.THROTTLE_ERRORS:
+          recordThrottleError()
         waitOnFailure(n, triesLimit, error_code, error_message)
         continue
       if error_code in throwErrors:
@@ -5308,6 +5649,45 @@ def callGDataPages(service, function,
     if 'url_params' in kwargs:
       kwargs['url_params'].pop('start-index', None)
 
+# Generator variant of callGDataPages for functions that return (feed, entries) with incrementally parsed entries,
+# e.g. GetContactsFeedEntries; entries are yielded one at a time rather than all pages being held in memory
+def yieldGDataPages(service, function,
+                    pageMessage=None,
+                    softErrors=False, throwErrors=None, retryErrors=None,
+                    uri=None,
+                    **kwargs):
+  if throwErrors is None:
+    throwErrors = []
+  if retryErrors is None:
+    retryErrors = []
+  totalItems = 0
+  while True:
+    this_page = callGData(service, function,
+                          softErrors=softErrors, throwErrors=throwErrors, retryErrors=retryErrors,
+                          uri=uri,
+                          **kwargs)
+    nextLink = None
+    pageItems = 0
+    if this_page:
+      feed, entries = this_page
+      for entry in entries:
+        pageItems += 1
+        yield entry
+      if pageItems > 0:
+        nextLink = feed.GetNextLink()
+      totalItems += pageItems
+    if pageMessage:
+      show_message = pageMessage.replace(TOTAL_ITEMS_MARKER, str(totalItems))
+      writeGotMessage(show_message.format(Ent.ChooseGetting(totalItems)))
+    if nextLink is None:
+      if pageMessage and (pageMessage[-1] != '\n'):
+        writeStderr('\r\n')
+        flushStderr()
+      return
+    uri = nextLink.href
+    if 'url_params' in kwargs:
+      kwargs['url_params'].pop('start-index', None)
+
 def checkGAPIError(e, softErrors=False, retryOnHttpError=False, mapNotFound=True):
   def makeErrorDict(code, reason, message):
     return {'error': {'code': code, 'errors': [{'reason': reason, 'message': message}]}}
@@ -5507,7 +5887,7 @@ def callGAPI(service, function,
   method = getattr(service, function)
   svcparms = dict(list(kwargs.items())+GM.Globals[GM.EXTRA_ARGS_LIST])
   if GC.Values[GC.API_CALLS_RATE_CHECK]:
-    checkAPICallsRate()
+    checkAPICallsRate(getAPICallsRateKey(service))
   for n in range(1, triesLimit+1):
     try:
       return method(**svcparms).execute()
@@ -5532,6 +5912,8 @@ def callGAPI(service, function,
         if (reason in [GAPI.INVALID] and
             bailOnInvalidError and n == GC.Values[GC.BAIL_ON_INTERNAL_ERROR_TRIES]):
           raise GAPI.REASON_EXCEPTION_MAP[reason](message)
+        if reason in GAPI.THROTTLE_REASONS or http_status == 503:
+          recordThrottleError()
         waitOnFailure(n, triesLimit, reason, message)
         if reason == GAPI.TRANSIENT_ERROR and bailOnTransientError:
           raise GAPI.REASON_EXCEPTION_MAP[reason](message)
@@ -5575,6 +5957,160 @@ def callGAPI(service, function,
     except TypeError as e:
       systemErrorExit(GOOGLE_API_ERROR_RC, str(e))
 
+class ResumableUploadRequest():
+  """A media upload request built once and presented to callGAPI as the method function
+
+  googleapiclient keeps the resumable session URI and progress in the request, so when callGAPI
+  retries after a network or transient error, execute resumes the upload at the last chunk
+  acknowledged by the server instead of starting over.
+  """
+
+  def __init__(self, service, function, **kwargs):
+    self._http = service._http
+    self._rootDesc = getattr(service, '_rootDesc', None)
+    self.request = getattr(service, function)(**dict(list(kwargs.items())+GM.Globals[GM.EXTRA_ARGS_LIST]))
+
+  def upload(self, **_):
+    return self.request
+
+def callGAPIResumableUpload(service, function,
+                            bailOnInternalError=False, throwReasons=None, retryReasons=None,
+                            **kwargs):
+  return callGAPI(ResumableUploadRequest(service, function, **kwargs), 'upload',
+                  bailOnInternalError=bailOnInternalError, throwReasons=throwReasons, retryReasons=retryReasons)
+
+class GAPIBatcher():
+  """Send independent callGAPI style requests to a service in batches of up to batchSize requests
+
+  Each request is added with a callback(result, exception) that is called when the request completes;
+  exception is None on success, otherwise it is the exception that callGAPI would have raised for a reason in throwReasons.
+  Requests that fail with a retryable reason are retried in a subsequent batch; other errors are handled as in callGAPI.
+  Callbacks are called in the order that the requests were added, except that retried requests complete in a later batch.
+  With a batch size of 1, each request is made with callGAPI.
+  """
+
+  def __init__(self, service, batchSize=None, triesLimit=0):
+    self.service = service
+    self.batchSize = batchSize if batchSize is not None else GC.Values[GC.BATCH_SIZE]
+    self.triesLimit = triesLimit if triesLimit > 0 else GC.Values[GC.API_CALLS_TRIES_LIMIT]
+    self.pending = []
+    self.responses = {}
+
+  @staticmethod
+  def _throwExceptions(throwReasons):
+    return tuple({GAPI.REASON_EXCEPTION_MAP[reason] for reason in throwReasons if reason in GAPI.REASON_EXCEPTION_MAP})
+
+  def Add(self, service, function, callback,
+          bailOnInternalError=False, mapNotFound=True,
+          throwReasons=None, retryReasons=None,
+          **kwargs):
+    if throwReasons is None:
+      throwReasons = []
+    if retryReasons is None:
+      retryReasons = []
+    if self.batchSize <= 1:
+      try:
+        result = callGAPI(service, function,
+                          bailOnInternalError=bailOnInternalError, mapNotFound=mapNotFound,
+                          throwReasons=throwReasons, retryReasons=retryReasons, triesLimit=self.triesLimit,
+                          **kwargs)
+      except (googleapiclient.errors.HttpError,)+self._throwExceptions(throwReasons) as e:
+        callback(None, e)
+        return
+      callback(result, None)
+      return
+    svcparms = dict(list(kwargs.items())+GM.Globals[GM.EXTRA_ARGS_LIST])
+    self.pending.append({'request': getattr(service, function)(**svcparms), 'callback': callback, 'n': 1,
+                         'rateKey': getAPICallsRateKey(service),
+                         'bailOnInternalError': bailOnInternalError, 'mapNotFound': mapNotFound,
+                         'throwReasons': throwReasons, 'allRetryReasons': GAPI.DEFAULT_RETRY_REASONS+retryReasons})
+    if len(self.pending) >= self.batchSize:
+      self._executeBatch()
+
+  def Execute(self):
+    while self.pending:
+      self._executeBatch()
+
+  def _callback(self, request_id, response, exception):
+    self.responses[request_id] = (response, exception)
+
+  def _executeBatch(self):
+    items = self.pending[:self.batchSize]
+    del self.pending[:self.batchSize]
+    dbatch = self.service.new_batch_http_request(callback=self._callback)
+    for requestId, item in enumerate(items):
+      if GC.Values[GC.API_CALLS_RATE_CHECK]:
+        checkAPICallsRate(item['rateKey'])
+      dbatch.add(item['request'], request_id=str(requestId))
+    for n in range(1, self.triesLimit+1):
+      self.responses = {}
+      try:
+        executeBatch(dbatch)
+        break
+      except (httplib2.HttpLib2Error, google.auth.exceptions.TransportError, RuntimeError) as e:
+        if n != self.triesLimit:
+          self.service._http.connections = {}
+          waitOnFailure(n, self.triesLimit, NETWORK_ERROR_RC, str(e))
+          continue
+        handleServerError(e)
+      except google.auth.exceptions.RefreshError as e:
+        if isinstance(e.args, tuple):
+          e = e.args[0]
+        handleOAuthTokenError(e, all(GAPI.SERVICE_NOT_AVAILABLE in item['throwReasons'] for item in items))
+        for item in items:
+          item['callback'](None, GAPI.REASON_EXCEPTION_MAP[GAPI.SERVICE_NOT_AVAILABLE](str(e)))
+        return
+      except (http.client.ResponseNotReady, OSError) as e:
+        errMsg = f'Connection error: {str(e) or repr(e)}'
+        if n != self.triesLimit:
+          waitOnFailure(n, self.triesLimit, SOCKET_ERROR_RC, errMsg)
+          continue
+        systemErrorExit(SOCKET_ERROR_RC, errMsg)
+    retries = []
+    retryError = None
+    for requestId, item in enumerate(items):
+      response, exception = self.responses.get(str(requestId), (None, None))
+      if exception is None:
+        item['callback'](response, None)
+        continue
+      if not isinstance(exception, googleapiclient.errors.HttpError):
+        systemErrorExit(GOOGLE_API_ERROR_RC, str(exception))
+      n = item['n']
+      http_status, reason, message = checkGAPIError(exception, retryOnHttpError=n < 3, mapNotFound=item['mapNotFound'])
+      if http_status == -1:
+        try:
+          self.service._http.credentials.refresh(transportCreateRequest())
+        except TypeError:
+          systemErrorExit(HTTP_ERROR_RC, message)
+        retries.append(item)
+        continue
+      if http_status == 0:
+        item['callback'](None, None)
+        continue
+      if (n != self.triesLimit) and ((reason in item['allRetryReasons']) or
+                                     (GC.Values[GC.RETRY_API_SERVICE_NOT_AVAILABLE] and (reason == GAPI.SERVICE_NOT_AVAILABLE))):
+        if (reason in [GAPI.INTERNAL_ERROR, GAPI.BACKEND_ERROR] and
+            item['bailOnInternalError'] and n == GC.Values[GC.BAIL_ON_INTERNAL_ERROR_TRIES]):
+          item['callback'](None, GAPI.REASON_EXCEPTION_MAP[reason](message))
+          continue
+        if reason in GAPI.THROTTLE_REASONS or http_status == 503:
+          recordThrottleError()
+        retries.append(item)
+        retryError = (n, reason, message)
+        continue
+      if reason in item['throwReasons']:
+        item['callback'](None, GAPI.REASON_EXCEPTION_MAP[reason](message) if reason in GAPI.REASON_EXCEPTION_MAP else exception)
+        continue
+      if reason == GAPI.INSUFFICIENT_PERMISSIONS:
+        APIAccessDeniedExit()
+      systemErrorExit(HTTP_ERROR_RC, formatHTTPError(http_status, reason, message))
+    if retries:
+      if retryError is not None:
+        waitOnFailure(retryError[0], self.triesLimit, retryError[1], retryError[2])
+      for item in retries:
+        item['n'] += 1
+      self.pending[0:0] = retries
+
 def _showGAPIpagesResult(results, pageItems, totalItems, pageMessage, messageAttribute, entityType):
   showMessage = pageMessage.replace(TOTAL_ITEMS_MARKER, str(totalItems))
   if pageItems:
@@ -5645,19 +6181,89 @@ def _setMaxArgResults(maxItems, pageArgsInBody, kwargs):
           maxArg = 'pageSize'
   return (maxArg, maxResults)
 
+# The prefetch thread gets its own Http object as httplib2 is not thread safe
+def _cloneGAPIServiceForThread(service):
+  threadService = copy.copy(service)
+  httpObj = getHttpObj(cache=GM.Globals[GM.CACHE_DIR])
+  credentials = getattr(service._http, 'credentials', None)
+  threadService._http = transportAuthorizedHttp(credentials, http=httpObj) if credentials is not None else httpObj
+  return threadService
+
+# Fetch pages in a background thread, up to prefetchDepth pages ahead of the consumer
+# Exceptions, including SystemExit from systemErrorExit, are raised in the consumer when the failing page is reached
+def _prefetchGAPIpages(service, function, items, maxItems, maxArg, maxResults, pageArgsInBody, prefetchDepth,
+                       throwReasons, retryReasons, kwargs):
+  def _putPage(page):
+    while not stopEvent.is_set():
+      try:
+        pageQueue.put(page, timeout=1)
+        return
+      except queue.Full:
+        pass
+
+  def _fetchPages():
+    totalItems = 0
+    try:
+      while not stopEvent.is_set():
+        if maxArg and maxItems-totalItems < maxResults:
+          if not pageArgsInBody:
+            kwargs[maxArg] = maxItems-totalItems
+          else:
+            kwargs['body'][maxArg] = maxItems-totalItems
+        results = callGAPI(threadService, function,
+                           throwReasons=throwReasons, retryReasons=retryReasons,
+                           **kwargs)
+        pageToken = results.get('nextPageToken') if results else None
+        if results and items in results:
+          totalItems += len(results[items])
+        done = not pageToken or (maxItems and totalItems >= maxItems)
+        _putPage((results, done, None))
+        if done:
+          return
+        if not pageArgsInBody:
+          kwargs['pageToken'] = pageToken
+        else:
+          kwargs['body']['pageToken'] = pageToken
+    except BaseException as e:
+      _putPage((None, True, e))
+
+  threadService = _cloneGAPIServiceForThread(service)
+  pageQueue = queue.Queue(maxsize=prefetchDepth)
+  stopEvent = threading.Event()
+  threading.Thread(target=inheritThreadState(_fetchPages), daemon=True).start()
+  try:
+    while True:
+      results, done, e = pageQueue.get()
+      if e is not None:
+        raise e
+      yield results
+      if done:
+        return
+  finally:
+    stopEvent.set()
+
 def callGAPIpages(service, function, items,
                   pageMessage=None, messageAttribute=None, maxItems=0, noFinalize=False,
                   throwReasons=None, retryReasons=None,
-                  pageArgsInBody=False,
+                  pageArgsInBody=False, prefetchDepth=None,
                   **kwargs):
   if throwReasons is None:
     throwReasons = []
   if retryReasons is None:
     retryReasons = []
+  if prefetchDepth is None:
+    prefetchDepth = GC.Values[GC.API_PAGES_PREFETCH_DEPTH]
   allResults = []
   totalItems = 0
   maxArg, maxResults = _setMaxArgResults(maxItems, pageArgsInBody, kwargs)
   entityType = Ent.Getting() if pageMessage else None
+  if prefetchDepth > 0:
+    for results in _prefetchGAPIpages(service, function, items, maxItems, maxArg, maxResults, pageArgsInBody, prefetchDepth,
+                                      throwReasons, retryReasons, kwargs):
+      _, totalItems = _processGAPIpagesResult(results, items, allResults, totalItems, pageMessage, messageAttribute, entityType)
+    if not noFinalize:
+      _finalizeGAPIpagesResult(pageMessage)
+    return allResults
   while True:
     if maxArg and maxItems-totalItems < maxResults:
       if not pageArgsInBody:
@@ -5680,15 +6286,28 @@ def callGAPIpages(service, function, items,
 def yieldGAPIpages(service, function, items,
                    pageMessage=None, messageAttribute=None, maxItems=0, noFinalize=False,
                    throwReasons=None, retryReasons=None,
-                   pageArgsInBody=False,
+                   pageArgsInBody=False, prefetchDepth=None,
                    **kwargs):
   if throwReasons is None:
     throwReasons = []
   if retryReasons is None:
     retryReasons = []
+  if prefetchDepth is None:
+    prefetchDepth = GC.Values[GC.API_PAGES_PREFETCH_DEPTH]
   totalItems = 0
   maxArg, maxResults = _setMaxArgResults(maxItems, pageArgsInBody, kwargs)
   entityType = Ent.Getting() if pageMessage else None
+  if prefetchDepth > 0:
+    for results in _prefetchGAPIpages(service, function, items, maxItems, maxArg, maxResults, pageArgsInBody, prefetchDepth,
+                                      throwReasons, retryReasons, kwargs):
+      pageItems = results.get(items, []) if results else []
+      totalItems += len(pageItems)
+      if pageMessage:
+        _showGAPIpagesResult(pageItems, len(pageItems), totalItems, pageMessage, messageAttribute, entityType)
+      yield pageItems
+    if not noFinalize:
+      _finalizeGAPIpagesResult(pageMessage)
+    return
   while True:
     if maxArg and maxItems-totalItems < maxResults:
       if not pageArgsInBody:
@@ -5799,7 +6418,7 @@ def buildGAPIServiceObject(api, user, i=0, count=0, displayError=True):
   triesLimit = 3
   for n in range(1, triesLimit+1):
     try:
-      credentials.refresh(request)
+      refreshSvcAcctCredentials(credentials, request)
       service._http = transportAuthorizedHttp(credentials, http=httpObj)
       return (userEmail, service)
     except (httplib2.HttpLib2Error, google.auth.exceptions.TransportError, RuntimeError) as e:
@@ -5849,7 +6468,7 @@ def getGDataUserCredentials(api, user, i, count):
   credentials = getSvcAcctCredentials(api, userEmail)
   request = transportCreateRequest()
   try:
-    credentials.refresh(request)
+    refreshSvcAcctCredentials(credentials, request)
     return (userEmail, credentials)
   except (httplib2.HttpLib2Error, google.auth.exceptions.TransportError, RuntimeError) as e:
     handleServerError(e)
@@ -5872,27 +6491,208 @@ def getContactsQuery(**kwargs):
 def getEmailAuditObject():
   return initGDataObject(gdata.apps.audit.service.AuditService(), API.EMAIL_AUDIT)
 
+# User/group ID to email address and email address to ID mappings; at most uid_cache_size mappings are kept in memory,
+# least recently used first out. When uid_cache_hours > 0, mappings are also saved in cache_dir/uidcache.db.
+# A value of None records that the ID or email address was not found; these are only kept in memory
+# and are only recorded for userNotFound, groupNotFound and domainNotFound, not for errors that may be transient.
+UID_EMAIL_CACHE_FILE = 'uidcache.db'
+UID_EMAIL_CACHE_USER_ID = 'userid'
+UID_EMAIL_CACHE_USER_EMAIL = 'useremail'
+UID_EMAIL_CACHE_GROUP_ID = 'groupid'
+UID_EMAIL_CACHE_GROUP_EMAIL = 'groupemail'
+
+class UIDEmailCache():
+  def __init__(self, maxSize, dbFile):
+    self.maxSize = maxSize
+    self.dbFile = dbFile
+    self.entries = collections.OrderedDict()
+    self.lock = threading.Lock()
+
+  def _open(self):
+    conn = sqlite3.connect(self.dbFile, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS mappings (kind TEXT, key TEXT, value TEXT, fetched REAL, PRIMARY KEY (kind, key))')
+    return conn
+
+  def _set(self, cacheKey, value):
+    self.entries[cacheKey] = value
+    self.entries.move_to_end(cacheKey)
+    while len(self.entries) > self.maxSize:
+      self.entries.popitem(last=False)
+
+  def _saveMappings(self, mappings):
+    if self.dbFile is None:
+      return
+    fetched = time.time()
+    try:
+      conn = self._open()
+      try:
+        with conn:
+          conn.executemany('INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?)',
+                           [(kind, key, value, fetched) for kind, key, value in mappings])
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      self.dbFile = None
+
+# Returns (True, value) if key is cached, value may be None; (False, None) if it is not
+  def Get(self, kind, key):
+    cacheKey = (kind, key)
+    with self.lock:
+      if cacheKey in self.entries:
+        self.entries.move_to_end(cacheKey)
+        return (True, self.entries[cacheKey])
+    if self.dbFile is None:
+      return (False, None)
+    try:
+      conn = self._open()
+      try:
+        row = conn.execute('SELECT value FROM mappings WHERE kind = ? AND key = ? AND value IS NOT NULL AND fetched >= ?',
+                           (kind, key, time.time()-GC.Values[GC.UID_CACHE_HOURS]*SECONDS_PER_HOUR)).fetchone()
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      self.dbFile = None
+      return (False, None)
+    if row is None:
+      return (False, None)
+    with self.lock:
+      self._set(cacheKey, row[0])
+    return (True, row[0])
+
+  def Put(self, kind, key, value):
+    with self.lock:
+      self._set((kind, key), value)
+    if value is not None:
+      self._saveMappings([(kind, key, value)])
+
+# Map IDs to email addresses and email addresses to IDs
+  def PutMany(self, idKind, emailKind, items):
+    mappings = []
+    for itemId, email in items:
+      mappings.append((idKind, itemId, email))
+      mappings.append((emailKind, email.lower(), itemId))
+    with self.lock:
+      for kind, key, value in mappings:
+        self._set((kind, key), value)
+    self._saveMappings(mappings)
+
+# Forget any mappings to or from keys, which may be IDs or email addresses
+  def Remove(self, idKind, emailKind, keys):
+    keys = {key.lower() for key in keys if key}
+    if not keys:
+      return
+    with self.lock:
+      for cacheKey in [cacheKey for cacheKey, value in self.entries.items()
+                       if cacheKey[0] in {idKind, emailKind} and (cacheKey[1].lower() in keys or (value is not None and value.lower() in keys))]:
+        del self.entries[cacheKey]
+    if self.dbFile is None:
+      return
+    marks = ','.join(['?']*len(keys))
+    try:
+      conn = self._open()
+      try:
+        with conn:
+          conn.execute(f'DELETE FROM mappings WHERE kind IN (?, ?) AND (lower(key) IN ({marks}) OR lower(value) IN ({marks}))',
+                       [idKind, emailKind]+list(keys)+list(keys))
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      self.dbFile = None
+
+def getUIDEmailCache():
+  if GC.Values.get(GC.UID_CACHE_SIZE, 0) == 0:
+    return None
+  if GM.Globals[GM.UID_EMAIL_CACHE] is None:
+    dbFile = os.path.join(GM.Globals[GM.CACHE_DIR], UID_EMAIL_CACHE_FILE) if GM.Globals[GM.CACHE_DIR] and GC.Values[GC.UID_CACHE_HOURS] > 0 else None
+    GM.Globals[GM.UID_EMAIL_CACHE] = UIDEmailCache(GC.Values[GC.UID_CACHE_SIZE], dbFile)
+  return GM.Globals[GM.UID_EMAIL_CACHE]
+
+# Users and groups that are created, renamed or deleted must not be resolved from stale mappings
+def invalidateUIDEmailCache(keys, emailType='user'):
+  uec = getUIDEmailCache()
+  if uec is None:
+    return
+  if emailType == 'user':
+    uec.Remove(UID_EMAIL_CACHE_USER_ID, UID_EMAIL_CACHE_USER_EMAIL, keys)
+  else:
+    uec.Remove(UID_EMAIL_CACHE_GROUP_ID, UID_EMAIL_CACHE_GROUP_EMAIL, keys)
+
+# When more than uid_cache_prefetch_threshold of uids are not cached, list all users or groups once
+# rather than getting them individually; IDs not found by the list are left to be resolved individually
+def prefetchUIDEmailCache(cd, uids, emailType='user'):
+  uec = getUIDEmailCache()
+  threshold = GC.Values.get(GC.UID_CACHE_PREFETCH_THRESHOLD, 0)
+  if uec is None or threshold == 0:
+    return
+  idKind = UID_EMAIL_CACHE_USER_ID if emailType == 'user' else UID_EMAIL_CACHE_GROUP_ID
+  uncached = {uid for uid in uids if not uec.Get(idKind, uid)[0]}
+  if len(uncached) <= threshold:
+    return
+  if cd is None:
+    cd = buildGAPIObject(API.DIRECTORY)
+  try:
+    if emailType == 'user':
+      printGettingAllAccountEntities(Ent.USER)
+      items = [(user['id'], user['primaryEmail']) for user in
+               callGAPIpages(cd.users(), 'list', 'users',
+                             pageMessage=getPageMessage(),
+                             throwReasons=[GAPI.BAD_REQUEST, GAPI.RESOURCE_NOT_FOUND, GAPI.FORBIDDEN],
+                             retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
+                             customer=GC.Values[GC.CUSTOMER_ID], orderBy='email',
+                             fields='nextPageToken,users(id,primaryEmail)', maxResults=GC.Values[GC.USER_MAX_RESULTS])]
+      uec.PutMany(UID_EMAIL_CACHE_USER_ID, UID_EMAIL_CACHE_USER_EMAIL, items)
+    else:
+      printGettingAllAccountEntities(Ent.GROUP)
+      items = [(group['id'], group['email']) for group in
+               callGAPIpages(cd.groups(), 'list', 'groups',
+                             pageMessage=getPageMessage(),
+                             throwReasons=GAPI.GROUP_LIST_THROW_REASONS, retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
+                             customer=GC.Values[GC.CUSTOMER_ID], orderBy='email', fields='nextPageToken,groups(id,email)')]
+      uec.PutMany(UID_EMAIL_CACHE_GROUP_ID, UID_EMAIL_CACHE_GROUP_EMAIL, items)
+  except (GAPI.badRequest, GAPI.resourceNotFound, GAPI.forbidden, GAPI.domainNotFound, GAPI.permissionDenied):
+    pass
+
 def getUserEmailFromID(uid, cd):
+  uec = getUIDEmailCache()
+  if uec is not None:
+    found, email = uec.Get(UID_EMAIL_CACHE_USER_ID, uid)
+    if found:
+      return email
   try:
     result = callGAPI(cd.users(), 'get',
                       throwReasons=GAPI.USER_GET_THROW_REASONS,
                       retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
                       userKey=uid, fields='primaryEmail')
-    return result.get('primaryEmail')
-  except (GAPI.userNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden,
-          GAPI.badRequest, GAPI.backendError, GAPI.systemError, GAPI.serviceNotAvailable):
+    email = result.get('primaryEmail')
+  except (GAPI.userNotFound, GAPI.domainNotFound):
+    email = None
+  except (GAPI.domainCannotUseApis, GAPI.forbidden, GAPI.badRequest,
+          GAPI.backendError, GAPI.systemError, GAPI.serviceNotAvailable):
     return None
+  if uec is not None:
+    uec.Put(UID_EMAIL_CACHE_USER_ID, uid, email)
+  return email
 
 def getGroupEmailFromID(uid, cd):
+  uec = getUIDEmailCache()
+  if uec is not None:
+    found, email = uec.Get(UID_EMAIL_CACHE_GROUP_ID, uid)
+    if found:
+      return email
   try:
     result = callGAPI(cd.groups(), 'get',
                       throwReasons=GAPI.GROUP_GET_THROW_REASONS,
                       retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
                       groupKey=uid, fields='email')
-    return result.get('email')
-  except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden,
-          GAPI.badRequest, GAPI.serviceNotAvailable):
+    email = result.get('email')
+  except (GAPI.groupNotFound, GAPI.domainNotFound):
+    email = None
+  except (GAPI.domainCannotUseApis, GAPI.forbidden, GAPI.badRequest, GAPI.serviceNotAvailable):
     return None
+  if uec is not None:
+    uec.Put(UID_EMAIL_CACHE_GROUP_ID, uid, email)
+  return email
 
 def getServiceAccountEmailFromID(account_id, sal=None):
   if sal is None:
@@ -5997,27 +6797,49 @@ def convertEmailAddressToUID(emailAddressOrUID, cd=None, emailType='user', saved
   normalizedEmailAddressOrUID = normalizeEmailAddressOrUID(emailAddressOrUID)
   if normalizedEmailAddressOrUID.find('@') == -1:
     return normalizedEmailAddressOrUID
+  uec = getUIDEmailCache()
   if cd is None:
     cd = buildGAPIObject(API.DIRECTORY)
   if emailType != 'group':
+    found, uid = uec.Get(UID_EMAIL_CACHE_USER_EMAIL, normalizedEmailAddressOrUID) if uec is not None else (False, None)
+    if uid:
+      return uid
+    if not found:
+      try:
+        uid = callGAPI(cd.users(), 'get',
+                       throwReasons=GAPI.USER_GET_THROW_REASONS,
+                       userKey=normalizedEmailAddressOrUID, fields='id')['id']
+        if uec is not None:
+          uec.Put(UID_EMAIL_CACHE_USER_EMAIL, normalizedEmailAddressOrUID, uid)
+        return uid
+      except (GAPI.userNotFound, GAPI.domainNotFound):
+        if uec is not None:
+          uec.Put(UID_EMAIL_CACHE_USER_EMAIL, normalizedEmailAddressOrUID, None)
+      except (GAPI.domainCannotUseApis, GAPI.forbidden, GAPI.badRequest, GAPI.backendError, GAPI.systemError):
+        pass
+    if emailType == 'user':
+      if savedLocation is not None:
+        Cmd.SetLocation(savedLocation)
+      entityDoesNotExistExit(Ent.USER, normalizedEmailAddressOrUID, errMsg=getPhraseDNEorSNA(normalizedEmailAddressOrUID))
+  found, uid = uec.Get(UID_EMAIL_CACHE_GROUP_EMAIL, normalizedEmailAddressOrUID) if uec is not None else (False, None)
+  if uid:
+    return uid
+  if not found:
     try:
-      return callGAPI(cd.users(), 'get',
-                      throwReasons=GAPI.USER_GET_THROW_REASONS,
-                      userKey=normalizedEmailAddressOrUID, fields='id')['id']
-    except (GAPI.userNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden,
-            GAPI.badRequest, GAPI.backendError, GAPI.systemError):
-      if emailType == 'user':
-        if savedLocation is not None:
-          Cmd.SetLocation(savedLocation)
-        entityDoesNotExistExit(Ent.USER, normalizedEmailAddressOrUID, errMsg=getPhraseDNEorSNA(normalizedEmailAddressOrUID))
-  try:
-    return callGAPI(cd.groups(), 'get',
-                    throwReasons=GAPI.GROUP_GET_THROW_REASONS, retryReasons=GAPI.GROUP_GET_RETRY_REASONS,
-                    groupKey=normalizedEmailAddressOrUID, fields='id')['id']
-  except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden, GAPI.badRequest, GAPI.invalid, GAPI.systemError):
-    if savedLocation is not None:
-      Cmd.SetLocation(savedLocation)
-    entityDoesNotExistExit([Ent.USER, Ent.GROUP][emailType == 'group'], normalizedEmailAddressOrUID, errMsg=getPhraseDNEorSNA(normalizedEmailAddressOrUID))
+      uid = callGAPI(cd.groups(), 'get',
+                     throwReasons=GAPI.GROUP_GET_THROW_REASONS, retryReasons=GAPI.GROUP_GET_RETRY_REASONS,
+                     groupKey=normalizedEmailAddressOrUID, fields='id')['id']
+      if uec is not None:
+        uec.Put(UID_EMAIL_CACHE_GROUP_EMAIL, normalizedEmailAddressOrUID, uid)
+      return uid
+    except (GAPI.groupNotFound, GAPI.domainNotFound):
+      if uec is not None:
+        uec.Put(UID_EMAIL_CACHE_GROUP_EMAIL, normalizedEmailAddressOrUID, None)
+    except (GAPI.domainCannotUseApis, GAPI.forbidden, GAPI.badRequest, GAPI.invalid, GAPI.systemError):
+      pass
+  if savedLocation is not None:
+    Cmd.SetLocation(savedLocation)
+  entityDoesNotExistExit([Ent.USER, Ent.GROUP][emailType == 'group'], normalizedEmailAddressOrUID, errMsg=getPhraseDNEorSNA(normalizedEmailAddressOrUID))
 
 # Convert User UID from API call to email address
 def convertUserIDtoEmail(uid, cd=None):
@@ -6025,13 +6847,7 @@ def convertUserIDtoEmail(uid, cd=None):
   if not primaryEmail:
     if cd is None:
       cd = buildGAPIObject(API.DIRECTORY)
-    try:
-      primaryEmail = callGAPI(cd.users(), 'get',
-                              throwReasons=GAPI.USER_GET_THROW_REASONS,
-                              userKey=uid, fields='primaryEmail')['primaryEmail']
-    except (GAPI.userNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden,
-            GAPI.badRequest, GAPI.backendError, GAPI.systemError):
-      primaryEmail = f'uid:{uid}'
+    primaryEmail = getUserEmailFromID(uid, cd) or f'uid:{uid}'
     GM.Globals[GM.MAP_USER_ID_TO_NAME][uid] = primaryEmail
   return primaryEmail
 
@@ -6381,33 +7197,38 @@ def getItemsToModify(entityType, entity, memberRoles=None, isSuspended=None, isA
     entityError[ENTITY_ERROR_INVALID] += 1
     printErrorMessage(INVALID_ENTITY_RC, formatKeyValueList('', [Ent.Singular(entityType), entityName, Msg.INVALID], ''))
 
+# Nested groups are expanded breadth-first; each group is expanded once, so groups shared by several parents
+# are only listed once and membership cycles terminate
   def _addGroupUsersToUsers(group, domains, recursive, includeDerivedMembership):
-    printGettingAllEntityItemsForWhom(memberRoles if memberRoles else Ent.ROLE_MANAGER_MEMBER_OWNER, group, entityType=Ent.GROUP)
     validRoles, listRoles, listFields = _getRoleVerification(memberRoles, 'nextPageToken,members(email,type,status)')
-    try:
-      result = callGAPIpages(cd.members(), 'list', 'members',
-                             pageMessage=getPageMessageForWhom(),
-                             throwReasons=GAPI.MEMBERS_THROW_REASONS, retryReasons=GAPI.MEMBERS_RETRY_REASONS,
-                             includeDerivedMembership=includeDerivedMembership,
-                             groupKey=group, roles=listRoles, fields=listFields, maxResults=GC.Values[GC.MEMBER_MAX_RESULTS])
-    except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.invalid, GAPI.forbidden, GAPI.serviceNotAvailable):
-      entityUnknownWarning(Ent.GROUP, group)
-      _incrEntityDoesNotExist(Ent.GROUP)
-      return
-    for member in result:
-      if member['type'] == Ent.TYPE_USER:
-        email = member['email'].lower()
-        if email in entitySet:
-          continue
-        if _checkMemberRoleIsSuspendedIsArchived(member, validRoles, isSuspended, isArchived):
-          if domains:
-            _, domain = splitEmailAddress(email)
-            if domain not in domains:
-              continue
-          entitySet.add(email)
-          entityList.append(email)
-      elif recursive and member['type'] == Ent.TYPE_GROUP:
-        _addGroupUsersToUsers(member['email'], domains, recursive, includeDerivedMembership)
+    groupsToExpand = collections.deque([(group, None)])
+    while groupsToExpand:
+      group, groupId = groupsToExpand.popleft()
+      if group.lower() in groupsExpanded:
+        continue
+      groupsExpanded.add(group.lower())
+      printGettingAllEntityItemsForWhom(memberRoles if memberRoles else Ent.ROLE_MANAGER_MEMBER_OWNER, group, entityType=Ent.GROUP)
+      try:
+        result = listGroupMembers(cd, group, listRoles, listFields, includeDerivedMembership, recursive,
+                                  pageMessage=getPageMessageForWhom(), groupId=groupId)
+      except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.invalid, GAPI.forbidden, GAPI.serviceNotAvailable):
+        entityUnknownWarning(Ent.GROUP, group)
+        _incrEntityDoesNotExist(Ent.GROUP)
+        continue
+      for member in result:
+        if member['type'] == Ent.TYPE_USER:
+          email = member['email'].lower()
+          if email in entitySet:
+            continue
+          if _checkMemberRoleIsSuspendedIsArchived(member, validRoles, isSuspended, isArchived):
+            if domains:
+              _, domain = splitEmailAddress(email)
+              if domain not in domains:
+                continue
+            entitySet.add(email)
+            entityList.append(email)
+        elif recursive and member['type'] == Ent.TYPE_GROUP:
+          groupsToExpand.append((member['email'], member.get('id')))
 
   def _addCIGroupUsersToUsers(groupName, groupEmail, recursive):
     printGettingAllEntityItemsForWhom(memberRoles if memberRoles else Ent.ROLE_MANAGER_MEMBER_OWNER, groupEmail, entityType=Ent.CLOUD_IDENTITY_GROUP)
@@ -6441,6 +7262,7 @@ def getItemsToModify(entityType, entity, memberRoles=None, isSuspended=None, isA
   entityError = {'entityType': None, ENTITY_ERROR_DNE: 0, ENTITY_ERROR_INVALID: 0}
   entityList = []
   entitySet = set()
+  groupsExpanded = set()
   entityLocation = Cmd.Location()
   if entityType in {Cmd.ENTITY_USER, Cmd.ENTITY_USERS}:
     if not GC.Values[GC.USER_SERVICE_ACCOUNT_ACCESS_ONLY] and not GC.Values[GC.DOMAIN]:
@@ -6650,6 +7472,7 @@ def getItemsToModify(entityType, entity, memberRoles=None, isSuspended=None, isA
     directlyInOU = entityType in Cmd.OU_DIRECT_ENTITY_TYPES
     qualifier = Msg.DIRECTLY_IN_THE.format(Ent.Singular(Ent.ORGANIZATIONAL_UNIT)) if directlyInOU else Msg.IN_THE.format(Ent.Singular(Ent.ORGANIZATIONAL_UNIT))
     fields = 'nextPageToken,users(primaryEmail,orgUnitPath)' if directlyInOU else 'nextPageToken,users(primaryEmail)'
+    udi = getUserDirectoryIndex()
     for ou in ous:
       if ou == 'root':
         ou = '/'
@@ -6669,6 +7492,13 @@ def getItemsToModify(entityType, entity, memberRoles=None, isSuspended=None, isA
       printGettingAllEntityItemsForWhom(Ent.USER, ou, qualifier=Msg.IN_THE.format(Ent.Singular(Ent.ORGANIZATIONAL_UNIT)),
                                         entityType=Ent.ORGANIZATIONAL_UNIT)
       pageMessage = getPageMessageForWhom()
+      if udi is not None:
+        users = udi.GetOrgUnitUsers(cd, ou, directlyInOU, isSuspended, isArchived)
+        if users is not None:
+          entityList.extend([email for email, _ in users])
+          setGettingAllEntityItemsForWhom(Ent.USER, ou, qualifier=qualifier)
+          printGotEntityItemsForWhom(len(users))
+          continue
       usersInOU = 0
       try:
         feed = yieldGAPIpages(cd.users(), 'list', 'users',
@@ -7976,6 +8806,182 @@ def RowFilterMatch(row, titlesList, rowFilter, rowFilterModeAll, rowDropFilter,
       return False
   return True
 
+# Row filters compiled to predicates; used by CSVPrintFile so that filters are parsed once rather than for every row
+# Each filter becomes (columnPat, anyMatch, checkMatch, default, negate); checkMatch is applied to row.get(column, default)
+# Columns matching each filter are resolved when the titles list changes rather than for every row
+ROW_FILTER_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '!=': operator.ne}
+ROW_FILTER_ISO_DATETIME_PATTERN = re.compile(r'^([0-9]{4})-([0-9]{2})-([0-9]{2})(?:T(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9](?:\.[0-9]+)?(?:Z|[+-][0-9]{2}:[0-9]{2})?)?$')
+
+def _compileRowFilter(filterVal):
+  filterType = filterVal[2]
+  neverTime = GC.Values[GC.NEVER_TIME]
+  dateCache = {}
+
+  def stripTimeFromDateTime(rowDate):
+# The date portion of an ISO 8601 time is the date in the time's own offset, which is what arrow.get returns
+    mg = ROW_FILTER_ISO_DATETIME_PATTERN.match(rowDate)
+    if mg:
+      dateKey = mg.group(0)[:10]
+      if dateKey not in dateCache:
+        try:
+          dateCache[dateKey] = ISOformatTimeStamp(arrow.Arrow(int(mg.group(1)), int(mg.group(2)), int(mg.group(3)), tzinfo='UTC'))
+        except ValueError:
+          dateCache[dateKey] = None
+      return dateCache[dateKey]
+    try:
+      rowTime = arrow.get(rowDate)
+    except (arrow.parser.ParserError, OverflowError, ValueError, TypeError):
+      return None
+    return ISOformatTimeStamp(arrow.Arrow(rowTime.year, rowTime.month, rowTime.day, tzinfo='UTC'))
+
+  def getRowDate(rowDate, dateMode):
+    if not rowDate or not isinstance(rowDate, str):
+      return None
+    if rowDate == neverTime:
+      rowDate = NEVER_TIME
+    if dateMode:
+      return stripTimeFromDateTime(rowDate)
+    return rowDate
+
+  def getRowCount(rowCount, blankIsZero):
+    if isinstance(rowCount, str):
+      if not rowCount and blankIsZero:
+        return 0
+      if not rowCount.isdigit():
+        return None
+      return int(rowCount)
+    if not isinstance(rowCount, int):
+      return None
+    return rowCount
+
+  def getRowHourMinute(rowDate):
+    if not rowDate or not isinstance(rowDate, str) or rowDate == neverTime or YYYYMMDD_PATTERN.match(rowDate):
+      return None
+    try:
+      rowTime = arrow.get(rowDate)
+    except (arrow.parser.ParserError, OverflowError):
+      return None
+    return f'{rowTime.hour:02d}:{rowTime.minute:02d}'
+
+  def rangeMatch(value, op, valueL, valueR):
+    if value is None:
+      return False
+    if op == '!=':
+      return not valueL <= value <= valueR
+    return valueL <= value <= valueR
+
+  if filterType in {'regex', 'notregex'}:
+    search = filterVal[3].search
+    return (lambda v: search(str(v)) is not None, '', filterType == 'notregex')
+  if filterType in {'data', 'notdata'}:
+    filterData = filterVal[3]
+    return (lambda v: str(v) in filterData, '', filterType == 'notdata')
+  if filterType == 'boolean':
+    filterBoolean = filterVal[3]
+    filterBooleanStr = str(filterBoolean)
+    def checkBoolean(rowBoolean):
+      if isinstance(rowBoolean, bool):
+        return rowBoolean == filterBoolean
+      if isinstance(rowBoolean, str):
+        if rowBoolean.lower() in TRUE_FALSE:
+          return rowBoolean.capitalize() == filterBooleanStr
+        if not rowBoolean:
+          return not filterBoolean
+      return False
+    return (checkBoolean, False, False)
+  if filterType == 'timeofdayrange':
+    op, startHourMinute, endHourMinute = filterVal[3:6]
+    return (lambda v: rangeMatch(getRowHourMinute(v), op, startHourMinute, endHourMinute), '', False)
+  if filterType.endswith('range'):
+    op, valueL, valueR = filterVal[3:6]
+    if filterType in {'daterange', 'timerange'}:
+# As in RowFilterMatch, range values are compared without stripping the time from the row value
+      return (lambda v: rangeMatch(getRowDate(v, False), op, valueL, valueR), '', False)
+    if filterType in {'countrange', 'numberrange'}:
+      return (lambda v: rangeMatch(getRowCount(v, False), op, valueL, valueR), 0, False)
+    if filterType == 'lengthrange':
+      return (lambda v: rangeMatch(len(v) if isinstance(v, str) else None, op, valueL, valueR), '', False)
+    return (lambda v: rangeMatch(v if isinstance(v, str) else str(v), op, valueL, valueR), '', False)
+  op = filterVal[3]
+  value = filterVal[4]
+  compare = ROW_FILTER_OPERATORS.get(op, operator.eq)
+  if filterType in {'date', 'time'}:
+    dateMode = filterType == 'date'
+    def checkDateTime(rowDate):
+      rowDate = getRowDate(rowDate, dateMode)
+      return rowDate is not None and compare(rowDate, value)
+    return (checkDateTime, '', False)
+  if filterType in {'count', 'number'}:
+    def checkCount(rowCount):
+      rowCount = getRowCount(rowCount, True)
+      return rowCount is not None and compare(rowCount, value)
+    return (checkCount, 0, False)
+  if filterType == 'length':
+    return (lambda v: isinstance(v, str) and compare(len(v), value), '', False)
+  if filterType == 'text':
+    if compare is operator.eq:
+      return (lambda v: (v if isinstance(v, str) else str(v)) == value, '', False)
+    return (lambda v: compare(v if isinstance(v, str) else str(v), value), '', False)
+  return (lambda v: False, '', False)
+
+class CompiledRowFilter():
+
+  def __init__(self, rowFilter, rowFilterModeAll, rowDropFilter, rowDropFilterModeAll):
+    self.rowFilter = [(filterVal[0], filterVal[1])+_compileRowFilter(filterVal) for filterVal in rowFilter]
+    self.rowFilterModeAll = rowFilterModeAll
+    self.rowDropFilter = [(filterVal[0], filterVal[1])+_compileRowFilter(filterVal) for filterVal in rowDropFilter]
+    self.rowDropFilterModeAll = rowDropFilterModeAll
+    self.titlesList = None
+    self.rowFilterColumns = []
+    self.rowDropFilterColumns = []
+
+  def ResolveColumns(self, titlesList):
+    if titlesList == self.titlesList:
+      return
+    self.titlesList = titlesList[:]
+    self.rowFilterColumns = [[t for t in titlesList if filterVal[0].match(t)] or [None] for filterVal in self.rowFilter]
+    self.rowDropFilterColumns = [[t for t in titlesList if filterVal[0].match(t)] or [None] for filterVal in self.rowDropFilter]
+
+  @staticmethod
+  def FilterMatch(row, columns, anyMatch, checkMatch, default, negate):
+    if anyMatch:
+      for column in columns:
+        if checkMatch(row.get(column, default)):
+          return not negate
+      return negate
+    for column in columns:
+      if not checkMatch(row.get(column, default)):
+        return negate
+    return not negate
+
+  def Match(self, row, titlesList):
+    self.ResolveColumns(titlesList)
+    if self.rowFilter:
+      anyMatches = False
+      for filterVal, columns in zip(self.rowFilter, self.rowFilterColumns):
+        if self.FilterMatch(row, columns, *filterVal[1:]):
+          if not self.rowFilterModeAll: # Any - any match selects
+            anyMatches = True
+            break
+        else:
+          if self.rowFilterModeAll: # All - any match failure doesn't select
+            return False
+      if not self.rowFilterModeAll and not anyMatches: # Any - no matches doesn't select
+        return False
+    if self.rowDropFilter:
+      allMatches = True
+      for filterVal, columns in zip(self.rowDropFilter, self.rowDropFilterColumns):
+        if self.FilterMatch(row, columns, *filterVal[1:]):
+          if not self.rowDropFilterModeAll: # Any - any match drops
+            return False
+        else:
+          if self.rowDropFilterModeAll: # All - any match failure doesn't drop
+            allMatches = False
+            break
+      if self.rowDropFilterModeAll and allMatches: # All - all matches drops
+        return False
+    return True
+
 # myarg is command line argument
 # fieldChoiceMap maps myarg to API field names
 #FIELD_CHOICE_MAP = {
@@ -8024,11 +9030,49 @@ def getItemFieldsFromFieldsList(item, fieldsList, returnItemIfNoneList=False):
     return None
   return f'nextPageToken,{item}'
 
+# Rows are written to the CSV spool file in blocks of this size when streaming
+CSV_STREAMING_SPOOL_BLOCK_SIZE = 1000
+
+# In multiprocess mode, each worker process/thread writes its CSV rows as JSON lines to its own spool file;
+# when a command completes, the name of the spool file and the byte range holding the command's rows are sent
+# to the CSV output process which merges the rows as each notice arrives, i.e., in command completion order
+csvSpool = threading.local()
+
+def writeCSVSpoolRows(rows):
+  spoolKey = (GM.Globals[GM.CSVFILE][GM.REDIRECT_SPOOL_DIR], os.getpid())
+  if getattr(csvSpool, 'key', None) != spoolKey:
+    csvSpool.key = spoolKey
+    csvSpool.fileName = os.path.join(spoolKey[0], f'{spoolKey[1]}-{threading.get_ident()}.jsonl')
+    csvSpool.file = None
+    csvSpool.commandStart = 0
+  try:
+    if csvSpool.file is None:
+      csvSpool.file = open(csvSpool.fileName, 'ab')
+    for row in rows:
+      csvSpool.file.write((json.dumps(row, ensure_ascii=False, default=str)+'\n').encode(UTF8))
+    csvSpool.file.flush()
+  except IOError as e:
+    systemErrorExit(FILE_ERROR_RC, fileErrorMessage('write', csvSpool.fileName, e))
+  return csvSpool.fileName
+
+# Write a command's remaining rows and return (spool file, start, end) for its rows
+def finishCSVSpoolRows(rows):
+  spoolFile = writeCSVSpoolRows(rows)
+  start = csvSpool.commandStart
+  csvSpool.commandStart = csvSpool.file.tell()
+  return (spoolFile, start, csvSpool.commandStart)
+
 class CSVPrintFile():
 
   def __init__(self, titles=None, sortTitles=None, indexedTitles=None):
     self.rows = []
     self.rowCount = 0
+    self.streaming = None
+    self.streamFile = None
+    self.streamWriter = None
+    self.spillFile = None
+    self.spillCount = 0
+    self.spillRows = GC.Values.get(GC.CSV_OUTPUT_SPILL_ROWS, 0)
     self.outputTranspose = GM.Globals[GM.CSV_OUTPUT_TRANSPOSE]
     self.todrive = GM.Globals[GM.CSV_TODRIVE]
     self.titlesSet = set()
@@ -8078,6 +9122,12 @@ class CSVPrintFile():
     self.SetRowLimit(GC.Values[GC.CSV_OUTPUT_ROW_LIMIT])
     self.SetZeroBlankMimeTypeCounts(False)
 
+# The compiled row filter holds closures which can't be pickled; it is rebuilt when needed
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    state['compiledRowFilter'] = None
+    return state
+
   def AddTitle(self, title):
     self.titlesSet.add(title)
     self.titlesList.append(title)
@@ -8653,42 +9703,171 @@ class CSVPrintFile():
 
   def SortRows(self, title, reverse):
     if title in self.titlesSet:
+      self.CheckStreamingSort()
+      self.LoadSpilledRows()
       self.rows.sort(key=lambda k: k[title], reverse=reverse)
 
   def SortRowsTwoTitles(self, title1, title2, reverse):
     if title1 in self.titlesSet and title2 in self.titlesSet:
+      self.CheckStreamingSort()
+      self.LoadSpilledRows()
       self.rows.sort(key=lambda k: (k[title1], k[title2]), reverse=reverse)
 
   def SetRowFilter(self, rowFilter, rowFilterMode):
     self.rowFilter = rowFilter
     self.rowFilterMode = rowFilterMode
+    self.compiledRowFilter = None
 
   def SetRowDropFilter(self, rowDropFilter, rowDropFilterMode):
     self.rowDropFilter = rowDropFilter
     self.rowDropFilterMode = rowDropFilterMode
+    self.compiledRowFilter = None
+
+  def RowFilterMatch(self, row):
+    if not self.rowFilter and not self.rowDropFilter:
+      return True
+    if self.compiledRowFilter is None:
+      self.compiledRowFilter = CompiledRowFilter(self.rowFilter, self.rowFilterMode, self.rowDropFilter, self.rowDropFilterMode)
+    return self.compiledRowFilter.Match(row, self.titlesList)
 
   def SetRowLimit(self, rowLimit):
     self.rowLimit = rowLimit
 
+  def GetWriterDialect(self, lineterminator, noEscapeChar):
+    writerDialect = {
+      'delimiter': self.columnDelimiter,
+      'doublequote': True,
+      'escapechar': '\\' if not noEscapeChar else None,
+      'lineterminator': lineterminator,
+      'quotechar': self.quoteChar,
+      'quoting': csv.QUOTE_MINIMAL,
+      'skipinitialspace': False,
+      'strict': False}
+    return writerDialect
+
+# Streaming is determined when the first row is written so that command options processed after
+# the CSVPrintFile is created, e.g. todrive, are taken into account
+  def StartStreaming(self):
+    self.streaming = False
+    if (not GC.Values[GC.CSV_OUTPUT_STREAMING] or self.todrive or self.outputTranspose or
+        self.zeroBlankMimeTypeCounts or self.sortHeaders):
+      return
+    if GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE] is not None:
+      self.streaming = True
+      return
+    if not self.headerForce:
+      return
+    titlesList = self.headerForce[:]
+    if self.timestampColumn and self.timestampColumn not in titlesList:
+      titlesList.append(self.timestampColumn)
+    if self.headerOrder:
+      titlesList = self.orderHeaders(titlesList)
+    if self.rowFilter or self.rowDropFilter:
+      self.CheckOutputRowFilterHeaders(titlesList)
+    extrasaction = 'ignore' if self.headerFilter or self.headerDropFilter else 'raise'
+    if GM.Globals[GM.CSVFILE][GM.REDIRECT_NAME] == '-' and GM.Globals[GM.STDOUT][GM.REDIRECT_MULTI_FD]:
+      csvFile = GM.Globals[GM.STDOUT][GM.REDIRECT_MULTI_FD]
+      writerDialect = self.GetWriterDialect('\n', self.noEscapeChar)
+    else:
+      if GM.Globals[GM.CSVFILE][GM.REDIRECT_NAME] == '-':
+        GM.Globals[GM.CSVFILE][GM.REDIRECT_NAME] = GM.Globals[GM.STDOUT][GM.REDIRECT_NAME]
+      csvFile = GM.Globals[GM.CSVFILE].get(GM.REDIRECT_FD, None)
+      if not csvFile:
+        csvFile = openFile(GM.Globals[GM.CSVFILE][GM.REDIRECT_NAME], GM.Globals[GM.CSVFILE][GM.REDIRECT_MODE], newline='',
+                           encoding=GM.Globals[GM.CSVFILE][GM.REDIRECT_ENCODING], errors='backslashreplace',
+                           continueOnError=True)
+        if not csvFile:
+          return
+      self.streamFile = csvFile
+      writerDialect = self.GetWriterDialect(str(GC.Values[GC.CSV_OUTPUT_LINE_TERMINATOR]), self.noEscapeChar)
+    self.streamWriter = csv.DictWriter(csvFile, titlesList, extrasaction=extrasaction, **writerDialect)
+    if GM.Globals[GM.CSVFILE][GM.REDIRECT_WRITE_HEADER]:
+      self.streamWriter.writerow(dict((item, item) for item in titlesList))
+    self.streaming = True
+
+  def StreamRow(self, row):
+    if self.streamWriter is not None:
+      try:
+        self.streamWriter.writerow(row)
+      except IOError as e:
+        stderrErrorMsg(e)
+        setSysExitRC(FILE_ERROR_RC)
+      return
+    self.rows.append(row)
+    if len(self.rows) >= CSV_STREAMING_SPOOL_BLOCK_SIZE:
+      writeCSVSpoolRows(self.rows)
+      self.rows = []
+
+  def FinishStreaming(self):
+    if self.streamFile is not None:
+      closeFile(self.streamFile)
+      self.streamFile = None
+    self.streamWriter = None
+    if GM.Globals[GM.CSVFILE][GM.REDIRECT_MODE] == DEFAULT_FILE_APPEND_MODE:
+      GM.Globals[GM.CSVFILE][GM.REDIRECT_WRITE_HEADER] = False
+
+  def CheckStreamingSort(self):
+    if self.streaming and self.rowCount > len(self.rows):
+      stderrWarningMsg(Msg.CSV_OUTPUT_STREAMING_ROWS_NOT_SORTED.format(GC.CSV_OUTPUT_STREAMING))
+
+# Rows are spilled to a temporary file as JSON lines; only the titles are kept in memory
+  def SpillRows(self):
+    if self.spillFile is None:
+      self.spillFile = TemporaryFile(mode='w+', encoding=UTF8)
+    self.spillFile.seek(0, os.SEEK_END)
+    for row in self.rows:
+      self.spillFile.write(json.dumps(row, ensure_ascii=False, default=str)+'\n')
+    self.spillCount += len(self.rows)
+    self.rows = []
+
+  def GetRows(self):
+    if self.spillFile is not None:
+      self.spillFile.seek(0)
+      for line in self.spillFile:
+        yield json.loads(line)
+    yield from self.rows
+
+  def NumRows(self):
+    return self.spillCount+len(self.rows)
+
+  def LoadSpilledRows(self):
+    if self.spillFile is not None:
+      self.rows = list(self.GetRows())
+      self.spillFile.close()
+      self.spillFile = None
+      self.spillCount = 0
+
+  def ExtendRows(self, rows):
+    self.rows.extend(rows)
+    if self.spillRows and len(self.rows) >= self.spillRows:
+      self.SpillRows()
+
   def AppendRow(self, row):
     if self.timestampColumn:
       row[self.timestampColumn] = self.todaysTime
     if not self.rowLimit or self.rowCount < self.rowLimit:
       self.rowCount +=1
-      self.rows.append(row)
+      if self.streaming is None:
+        self.StartStreaming()
+      if not self.streaming:
+        self.rows.append(row)
+        if self.spillRows and len(self.rows) >= self.spillRows:
+          self.SpillRows()
+      else:
+        self.StreamRow(row)
 
   def WriteRowNoFilter(self, row):
     self.AppendRow(row)
 
   def WriteRow(self, row):
-    if RowFilterMatch(row, self.titlesList, self.rowFilter, self.rowFilterMode, self.rowDropFilter, self.rowDropFilterMode):
+    if self.RowFilterMatch(row):
       self.AppendRow(row)
 
   def WriteRowTitles(self, row):
     for title in row:
       if title not in self.titlesSet:
         self.AddTitle(title)
-    if RowFilterMatch(row, self.titlesList, self.rowFilter, self.rowFilterMode, self.rowDropFilter, self.rowDropFilterMode):
+    if self.RowFilterMatch(row):
       self.AppendRow(row)
 
   def WriteRowTitlesNoFilter(self, row):
@@ -8709,7 +9888,7 @@ class CSVPrintFile():
     for title in row:
       if title not in self.titlesSet:
         self.AddTitle(title)
-    return RowFilterMatch(row, self.titlesList, self.rowFilter, self.rowFilterMode, self.rowDropFilter, self.rowDropFilterMode)
+    return self.RowFilterMatch(row)
 
   def UpdateMimeTypeCounts(self, row, mimeTypeInfo, sizeField):
     saveList = self.titlesList[:]
@@ -8717,7 +9896,7 @@ class CSVPrintFile():
     for title in row:
       if title not in self.titlesSet:
         self.AddTitle(title)
-    if RowFilterMatch(row, self.titlesList, self.rowFilter, self.rowFilterMode, self.rowDropFilter, self.rowDropFilterMode):
+    if self.RowFilterMatch(row):
       mimeTypeInfo.setdefault(row['mimeType'], {'count': 0, 'size': 0})
       mimeTypeInfo[row['mimeType']]['count'] += 1
       mimeTypeInfo[row['mimeType']]['size'] += int(row.get(sizeField, '0'))
@@ -8728,18 +9907,21 @@ class CSVPrintFile():
     self.zeroBlankMimeTypeCounts = zeroBlankMimeTypeCounts
 
   def ZeroBlankMimeTypeCounts(self):
+    self.LoadSpilledRows()
     for row in self.rows:
       for title in self.titlesList:
         if title not in self.sortTitlesSet and title not in row:
           row[title] = 0
 
-  def CheckOutputRowFilterHeaders(self):
+  def CheckOutputRowFilterHeaders(self, titlesList=None):
+    if titlesList is None:
+      titlesList = self.titlesList
     for filterVal in self.rowFilter:
-      columns = [t for t in self.titlesList if filterVal[0].match(t)]
+      columns = [t for t in titlesList if filterVal[0].match(t)]
       if not columns:
         stderrWarningMsg(Msg.COLUMN_DOES_NOT_MATCH_ANY_OUTPUT_COLUMNS.format(GC.CSV_OUTPUT_ROW_FILTER, filterVal[0].pattern))
     for filterVal in self.rowDropFilter:
-      columns = [t for t in self.titlesList if filterVal[0].match(t)]
+      columns = [t for t in titlesList if filterVal[0].match(t)]
       if not columns:
         stderrWarningMsg(Msg.COLUMN_DOES_NOT_MATCH_ANY_OUTPUT_COLUMNS.format(GC.CSV_OUTPUT_ROW_DROP_FILTER, filterVal[0].pattern))
 
@@ -8815,9 +9997,9 @@ class CSVPrintFile():
           if GM.Globals[GM.CSVFILE][GM.REDIRECT_WRITE_HEADER]:
             writer.writerow(dict((item, item) for item in writer.fieldnames))
           if not self.sortHeaders:
-            writer.writerows(self.rows)
+            writer.writerows(self.GetRows())
           else:
-            for row in sorted(self.rows, key=itemgetter(*self.sortHeaders)):
+            for row in sorted(self.GetRows(), key=itemgetter(*self.sortHeaders)):
               writer.writerow(row)
         else:
           writer.writerows(self.rows)
@@ -8826,18 +10008,6 @@ class CSVPrintFile():
         stderrErrorMsg(e)
         return False
 
-    def setDialect(lineterminator, noEscapeChar):
-      writerDialect = {
-        'delimiter': self.columnDelimiter,
-        'doublequote': True,
-        'escapechar': '\\' if not noEscapeChar else None,
-        'lineterminator': lineterminator,
-        'quotechar': self.quoteChar,
-        'quoting': csv.QUOTE_MINIMAL,
-        'skipinitialspace': False,
-        'strict': False}
-      return writerDialect
-
     def normalizeSortHeaders():
       if self.sortHeaders:
         writerKeyMap = {}
@@ -8847,7 +10017,7 @@ class CSVPrintFile():
 
     def writeCSVToStdout():
       csvFile = StringIOobject()
-      writerDialect = setDialect('\n', self.noEscapeChar)
+      writerDialect = self.GetWriterDialect('\n', self.noEscapeChar)
       writer = csv.DictWriter(csvFile, titlesList, extrasaction=extrasaction, **writerDialect)
       if writeCSVData(writer):
         try:
@@ -8864,23 +10034,21 @@ class CSVPrintFile():
                            encoding=GM.Globals[GM.CSVFILE][GM.REDIRECT_ENCODING], errors='backslashreplace',
                            continueOnError=True)
       if csvFile:
-        writerDialect = setDialect(str(GC.Values[GC.CSV_OUTPUT_LINE_TERMINATOR]), self.noEscapeChar)
+        writerDialect = self.GetWriterDialect(str(GC.Values[GC.CSV_OUTPUT_LINE_TERMINATOR]), self.noEscapeChar)
         writer = csv.DictWriter(csvFile, titlesList, extrasaction=extrasaction, **writerDialect)
         writeCSVData(writer)
         closeFile(csvFile)
 
     def writeCSVToDrive():
-      numRows = len(self.rows)
+      numRows = self.NumRows()
       numColumns = len(titlesList)
       if numRows == 0 and not self.todrive['uploadnodata']:
         printKeyValueList([Msg.NO_CSV_DATA_TO_UPLOAD])
         setSysExitRC(NO_CSV_DATA_TO_UPLOAD_RC)
         return
-      if self.todrive['addsheet'] or self.todrive['updatesheet']:
-        csvFile = TemporaryFile(mode='w+', encoding=UTF8)
-      else:
-        csvFile = StringIOobject()
-      writerDialect = setDialect('\n', self.todrive['noescapechar'])
+# The CSV data is written to disk and uploaded from there in chunks rather than being held in memory
+      csvFile = TemporaryFile(mode='w+', encoding=UTF8, newline='')
+      writerDialect = self.GetWriterDialect('\n', self.todrive['noescapechar'])
       writer = csv.DictWriter(csvFile, titlesList, extrasaction=extrasaction, **writerDialect)
       if writeCSVData(writer):
         if ((self.todrive['title'] is None) or
@@ -9041,28 +10209,29 @@ class CSVPrintFile():
               body['description'] = Cmd.QuotedArgumentList(Cmd.AllArguments())
             if not self.todrive['fileId'] or not self.todrive['retaintitle']:
               body['name'] = title
+            csvFile.flush()
+            media_body = googleapiclient.http.MediaIoBaseUpload(csvFile.buffer, mimetype='text/csv', resumable=True,
+                                                                chunksize=GC.Values[GC.TODRIVE_CHUNK_SIZE]*ONE_MEGA_BYTES)
             try:
               if not self.todrive['fileId']:
                 Act.Set(Act.CREATE)
                 body['parents'] = [self.todrive['parentId']]
-                result = callGAPI(drive.files(), 'create',
-                                  bailOnInternalError=True,
-                                  throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.FORBIDDEN, GAPI.INSUFFICIENT_PERMISSIONS, GAPI.INSUFFICIENT_PARENT_PERMISSIONS,
-                                                                              GAPI.FILE_NOT_FOUND, GAPI.UNKNOWN_ERROR, GAPI.INTERNAL_ERROR, GAPI.STORAGE_QUOTA_EXCEEDED,
-                                                                              GAPI.TEAMDRIVE_FILE_LIMIT_EXCEEDED, GAPI.TEAMDRIVE_HIERARCHY_TOO_DEEP],
-                                  body=body,
-                                  media_body=googleapiclient.http.MediaIoBaseUpload(io.BytesIO(csvFile.getvalue().encode()), mimetype='text/csv', resumable=True),
-                                  fields=fields, supportsAllDrives=True)
+                result = callGAPIResumableUpload(drive.files(), 'create',
+                                                 bailOnInternalError=True,
+                                                 throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.FORBIDDEN, GAPI.INSUFFICIENT_PERMISSIONS, GAPI.INSUFFICIENT_PARENT_PERMISSIONS,
+                                                                                             GAPI.FILE_NOT_FOUND, GAPI.UNKNOWN_ERROR, GAPI.INTERNAL_ERROR, GAPI.STORAGE_QUOTA_EXCEEDED,
+                                                                                             GAPI.TEAMDRIVE_FILE_LIMIT_EXCEEDED, GAPI.TEAMDRIVE_HIERARCHY_TOO_DEEP],
+                                                 body=body, media_body=media_body,
+                                                 fields=fields, supportsAllDrives=True)
               else:
                 Act.Set(Act.UPDATE)
-                result = callGAPI(drive.files(), 'update',
-                                  bailOnInternalError=True,
-                                  throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INSUFFICIENT_PERMISSIONS, GAPI.INSUFFICIENT_PARENT_PERMISSIONS,
-                                                                              GAPI.FILE_NOT_FOUND, GAPI.UNKNOWN_ERROR, GAPI.INTERNAL_ERROR],
-                                  fileId=self.todrive['fileId'],
-                                  body=body,
-                                  media_body=googleapiclient.http.MediaIoBaseUpload(io.BytesIO(csvFile.getvalue().encode()), mimetype='text/csv', resumable=True),
-                                  fields=fields, supportsAllDrives=True)
+                result = callGAPIResumableUpload(drive.files(), 'update',
+                                                 bailOnInternalError=True,
+                                                 throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INSUFFICIENT_PERMISSIONS, GAPI.INSUFFICIENT_PARENT_PERMISSIONS,
+                                                                                             GAPI.FILE_NOT_FOUND, GAPI.UNKNOWN_ERROR, GAPI.INTERNAL_ERROR],
+                                                 fileId=self.todrive['fileId'],
+                                                 body=body, media_body=media_body,
+                                                 fields=fields, supportsAllDrives=True)
               spreadsheetId = result['id']
             except GAPI.internalError as e:
               entityActionFailedWarning([Ent.DRIVE_FILE, body['name']], Msg.UPLOAD_CSV_FILE_INTERNAL_ERROR.format(str(e), str(numRows)))
@@ -9186,7 +10355,16 @@ class CSVPrintFile():
                                                       self.zeroBlankMimeTypeCounts)))
       if clearRowFilters:
         GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE].put((GM.REDIRECT_QUEUE_CLEAR_ROW_FILTERS, clearRowFilters))
-      GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE].put((GM.REDIRECT_QUEUE_DATA, self.rows))
+      spoolRange = finishCSVSpoolRows(self.GetRows())
+      if self.spillFile is not None:
+        self.spillFile.close()
+        self.spillFile = None
+        self.spillCount = 0
+      self.rows = []
+      GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE].put((GM.REDIRECT_QUEUE_SPOOL, spoolRange))
+      return
+    if self.streamWriter is not None:
+      self.FinishStreaming()
       return
     if self.zeroBlankMimeTypeCounts:
       self.ZeroBlankMimeTypeCounts()
@@ -9210,7 +10388,7 @@ class CSVPrintFile():
           self.FixPathsTitles(self.titlesList)
         if self.showPermissionsLast:
           self.MovePermsToEnd()
-        if not self.rows and self.nodataFields is not None:
+        if not self.NumRows() and self.nodataFields is not None:
           self.FixNodataTitles()
       else:
         self.titlesList = self.headerForce
@@ -9234,7 +10412,7 @@ class CSVPrintFile():
             self.AddJSONTitles(self.headerRequired)
         if self.fixPaths:
           self.FixPathsTitles(self.JSONtitlesList)
-        if not self.rows and self.nodataFields is not None:
+        if not self.NumRows() and self.nodataFields is not None:
           self.FixNodataTitles()
       else:
         self.JSONtitlesList = self.headerForce
@@ -9251,6 +10429,7 @@ class CSVPrintFile():
       titlesList = self.JSONtitlesList
     normalizeSortHeaders()
     if self.outputTranspose:
+      self.LoadSpilledRows()
       newRows = []
       newTitlesList = list(range(len(self.rows) + 1))
       for title in titlesList:
@@ -9319,49 +10498,61 @@ def cleanJSON(topStructure, listLimit=None, skipObjects=None, timeObjects=None):
   return _clean(topStructure, '', DEFAULT_SKIP_OBJECTS.union(skipObjects or set()))
 
 # Flatten a JSON object
+# API results are homogeneous so the sorted keys and child paths of each object are cached by (path, keys) for lists (path, length)
+# The cache is keyed by subfield delimiter and is cleared when it gets too large
+FLATTEN_JSON_CHILD_PATHS_CACHE = {}
+FLATTEN_JSON_CHILD_PATHS_CACHE_LIMIT = 100000
+
 def flattenJSON(topStructure, flattened=None,
                 listLimit=None, skipObjects=None, timeObjects=None, noLenObjects=None, simpleLists=None, delimiter=None):
-  def _flatten(structure, key, path):
-    if not isinstance(structure, (dict, list)):
-      if key not in timeObjects:
-        if isinstance(structure, str):
-          if GC.Values[GC.CSV_OUTPUT_CONVERT_CR_NL] and (structure.find('\n') >= 0 or structure.find('\r') >= 0):
-            flattened[path] = escapeCRsNLs(structure)
-          else:
-            flattened[path] = structure
-        else:
-          flattened[path] = structure
-      else:
-        if isinstance(structure, str) and not structure.isdigit():
-          flattened[path] = formatLocalTime(structure)
-        else:
-          flattened[path] = formatLocalTimestamp(structure)
+  flattened = flattened or {}
+  allSkipObjects = DEFAULT_SKIP_OBJECTS.union(skipObjects or set())
+  timeObjects = timeObjects or set()
+  noLenObjects = noLenObjects or set()
+  simpleLists = simpleLists or set()
+  subfieldDelimiter = GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER]
+  convertCRsNLs = GC.Values[GC.CSV_OUTPUT_CONVERT_CR_NL]
+  childPathsCache = FLATTEN_JSON_CHILD_PATHS_CACHE.setdefault(subfieldDelimiter, {})
+  if len(childPathsCache) > FLATTEN_JSON_CHILD_PATHS_CACHE_LIMIT:
+    childPathsCache.clear()
+# Items are (structure, key, path); children are pushed in reverse order so they are popped in sorted order
+  stack = [(topStructure[k], k, k) for k in sorted(topStructure, reverse=True) if k not in allSkipObjects]
+  while stack:
+    structure, key, path = stack.pop()
+    if isinstance(structure, dict):
+      if not structure:
+        flattened[path] = ''
+        continue
+      cacheKey = (path, tuple(structure))
+      childPaths = childPathsCache.get(cacheKey)
+      if childPaths is None:
+        childPaths = childPathsCache[cacheKey] = [(k, f'{path}{subfieldDelimiter}{k}')
+                                                  for k in sorted(structure, reverse=True) if k not in DEFAULT_SKIP_OBJECTS]
+      for k, childPath in childPaths:
+        stack.append((structure[k], k, childPath))
     elif isinstance(structure, list):
       listLen = len(structure)
       listLen = min(listLen, listLimit or listLen)
       if key in simpleLists:
         flattened[path] = delimiter.join(structure[:listLen])
+        continue
+      if key not in noLenObjects:
+        flattened[path] = listLen
+      cacheKey = (path, listLen)
+      childPaths = childPathsCache.get(cacheKey)
+      if childPaths is None:
+        childPaths = childPathsCache[cacheKey] = [(i, f'{path}{subfieldDelimiter}{i}') for i in range(listLen-1, -1, -1)]
+      for i, childPath in childPaths:
+        stack.append((structure[i], '', childPath))
+    elif key not in timeObjects:
+      if convertCRsNLs and isinstance(structure, str) and (structure.find('\n') >= 0 or structure.find('\r') >= 0):
+        flattened[path] = escapeCRsNLs(structure)
       else:
-        if key not in noLenObjects:
-          flattened[path] = listLen
-        for i in range(listLen):
-          _flatten(structure[i], '', f'{path}{GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER]}{i}')
-    else:
-      if structure:
-        for k, v in sorted(structure.items()):
-          if k not in DEFAULT_SKIP_OBJECTS:
-            _flatten(v, k, f'{path}{GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER]}{k}')
-      else:
-        flattened[path] = ''
-
-  flattened = flattened or {}
-  allSkipObjects = DEFAULT_SKIP_OBJECTS.union(skipObjects or set())
-  timeObjects = timeObjects or set()
-  noLenObjects = noLenObjects or set()
-  simpleLists = simpleLists or set()
-  for k, v in sorted(topStructure.items()):
-    if k not in allSkipObjects:
-      _flatten(v, k, k)
+        flattened[path] = structure
+    elif isinstance(structure, str) and not structure.isdigit():
+      flattened[path] = formatLocalTime(structure)
+    else:
+      flattened[path] = formatLocalTimestamp(structure)
   return flattened
 
 # Show a json object
@@ -9555,7 +10746,7 @@ def _getServerTLSUsed(location):
   url = 'https://'+location
   _, netloc, _, _, _, _ = urlparse(url)
   conn = 'https:'+netloc
-  httpObj = getHttpObj()
+  httpObj = getHttpObj(transport=HTTP_TRANSPORT_HTTPLIB2)
   triesLimit = 5
   for n in range(1, triesLimit+1):
     try:
@@ -9845,7 +11036,7 @@ def restoreNonPickleableValues(savedValues):
   GM.Globals[GM.CMDLOG_HANDLER] = savedValues[GM.CMDLOG_HANDLER]
   GM.Globals[GM.CMDLOG_LOGGER] = savedValues[GM.CMDLOG_LOGGER]
 
-def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNow, tzinfo, output_timeformat):
+def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, spoolDir, datetimeNow, tzinfo, output_timeformat):
   global Cmd
 
   def reopenSTDFile(stdtype):
@@ -9863,6 +11054,30 @@ def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNo
     else:
       GM.Globals[stdtype][GM.REDIRECT_MULTI_FD] = GM.Globals[stdtype][GM.REDIRECT_FD] if not GM.Globals[stdtype][GM.REDIRECT_MULTIPROCESS] else StringIOobject()
 
+# Merge the rows between start and end, end=None is end of file; returns the offset following the rows read
+  def mergeSpoolRows(spoolFile, start, end):
+    rows = []
+    try:
+      with open(spoolFile, 'rb') as f:
+        f.seek(start)
+        while end is None or start < end:
+          line = f.readline()
+          if not line:
+            break
+          start += len(line)
+          try:
+            rows.append(json.loads(line))
+          except ValueError:
+# Partial row written by a terminated command
+            continue
+          if len(rows) >= CSV_STREAMING_SPOOL_BLOCK_SIZE:
+            csvPF.ExtendRows(rows)
+            rows = []
+    except IOError as e:
+      stderrErrorMsg(fileErrorMessage('read', spoolFile, e))
+    csvPF.ExtendRows(rows)
+    return start
+
   GM.Globals[GM.DATETIME_NOW] = datetimeNow
   GC.Values[GC.TIMEZONE] = tzinfo
   GC.Values[GC.OUTPUT_TIMEFORMAT] = output_timeformat
@@ -9882,6 +11097,7 @@ def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNo
     csvPF.SetRowDropFilter(GC.Values[GC.CSV_OUTPUT_ROW_DROP_FILTER], GC.Values[GC.CSV_OUTPUT_ROW_DROP_FILTER_MODE])
     csvPF.SetRowLimit(GC.Values[GC.CSV_OUTPUT_ROW_LIMIT])
   list_type = 'CSV'
+  spoolOffsets = {}
   while True:
     dataType, dataItem = mpQueue.get()
     if dataType == GM.REDIRECT_QUEUE_NAME:
@@ -9903,8 +11119,9 @@ def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNo
       csvPF.SetNodataFields(dataItem[11], dataItem[12], dataItem[13], dataItem[14], dataItem[15])
       csvPF.SetShowPermissionsLast(dataItem[16])
       csvPF.SetZeroBlankMimeTypeCounts(dataItem[17])
-    elif dataType == GM.REDIRECT_QUEUE_DATA:
-      csvPF.rows.extend(dataItem)
+    elif dataType == GM.REDIRECT_QUEUE_SPOOL:
+      spoolFile, start, end = dataItem
+      spoolOffsets[spoolFile] = mergeSpoolRows(spoolFile, start, end)
     elif dataType == GM.REDIRECT_QUEUE_ARGS:
       Cmd.InitializeArguments(dataItem)
     elif dataType == GM.REDIRECT_QUEUE_GLOBALS:
@@ -9932,6 +11149,18 @@ def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNo
       clearRowFilters = dataItem
     else: #GM.REDIRECT_QUEUE_EOF
       break
+# Rows following the last completion notice for a spool file were written by commands that were terminated
+  for spoolFile in sorted(os.listdir(spoolDir)):
+    spoolFile = os.path.join(spoolDir, spoolFile)
+    mergeSpoolRows(spoolFile, spoolOffsets.get(spoolFile, 0), None)
+    try:
+      os.remove(spoolFile)
+    except OSError:
+      pass
+  try:
+    os.rmdir(spoolDir)
+  except OSError:
+    pass
   if GC.Values[GC.DEBUG_LEVEL] > 0:
     httplib2.debuglevel = GC.Values[GC.DEBUG_LEVEL]
     sys.stdout = GM.Globals[GM.STDOUT][GM.REDIRECT_MULTI_FD]
@@ -9945,11 +11174,15 @@ def CSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr, csvPF, datetimeNo
   else:
     flushStderr()
 
-def initializeCSVFileQueueHandler(mpManager, mpQueueStdout, mpQueueStderr):
-  mpQueue = mpManager.Queue()
+def initializeCSVFileQueueHandler(mpQueue, mpQueueStdout, mpQueueStderr):
+  try:
+    spoolDir = mkdtemp(prefix='gamcsv')
+  except OSError as e:
+    systemErrorExit(FILE_ERROR_RC, e)
+  GM.Globals[GM.CSVFILE][GM.REDIRECT_SPOOL_DIR] = spoolDir
   mpQueueHandler = multiprocessing.Process(target=CSVFileQueueHandler,
                                            args=(mpQueue, mpQueueStdout, mpQueueStderr,
-                                                 GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE_CSVPF],
+                                                 GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE_CSVPF], spoolDir,
                                                  GM.Globals[GM.DATETIME_NOW], GC.Values[GC.TIMEZONE],
                                                  GC.Values[GC.OUTPUT_TIMEFORMAT]))
   mpQueueHandler.start()
@@ -9958,6 +11191,7 @@ def initializeCSVFileQueueHandler(mpManager, mpQueueStdout, mpQueueStderr):
 def terminateCSVFileQueueHandler(mpQueue, mpQueueHandler):
   GM.Globals[GM.PARSER] = None
   GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE] = None
+  GM.Globals[GM.CSVFILE][GM.REDIRECT_SPOOL_DIR] = None
   if multiprocessing.get_start_method() != 'fork':
     mpQueue.put((GM.REDIRECT_QUEUE_ARGS, Cmd.AllArguments()))
     savedValues = saveNonPickleableValues()
@@ -10037,8 +11271,7 @@ def StdQueueHandler(mpQueue, stdtype, gmGlobals, gcValues):
       pass
   GM.Globals[stdtype][GM.REDIRECT_FD] = None
 
-def initializeStdQueueHandler(mpManager, stdtype, gmGlobals, gcValues):
-  mpQueue = mpManager.Queue()
+def initializeStdQueueHandler(mpQueue, stdtype, gmGlobals, gcValues):
   mpQueueHandler = multiprocessing.Process(target=StdQueueHandler, args=(mpQueue, stdtype, gmGlobals, gcValues))
   mpQueueHandler.start()
   return (mpQueue, mpQueueHandler)
@@ -10063,7 +11296,7 @@ def terminateStdQueueHandler(mpQueue, mpQueueHandler):
   mpQueue.put((0, GM.REDIRECT_QUEUE_EOF, None))
   mpQueueHandler.join()
 
-def ProcessGAMCommandMulti(pid, numItems, logCmd, mpQueueCSVFile, mpQueueStdout, mpQueueStderr,
+def ProcessGAMCommandMulti(pid, numItems, logCmd, mpQueueCSVFile, mpQueueStdout, mpQueueStderr, csvSpoolDir,
                            debugLevel, todrive, printAguDomains,
                            printCrosOUs, printCrosOUsAndChildren,
                            output_dateformat, output_timeformat,
@@ -10078,9 +11311,11 @@ def ProcessGAMCommandMulti(pid, numItems, logCmd, mpQueueCSVFile, mpQueueStdout,
   global mplock
 
   with mplock:
-    initializeLogging()
-    if multiprocessing.get_start_method() != 'fork':
-      signal.signal(signal.SIGINT, signal.SIG_IGN)
+# Threaded workers initialize logging and signals once per process
+    if mpthreadlocals is None:
+      initializeLogging()
+      if multiprocessing.get_start_method() != 'fork':
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
     GM.Globals[GM.API_CALLS_RETRY_DATA] = {}
     GM.Globals[GM.CMDLOG_LOGGER] = None
     GM.Globals[GM.CSVFILE] = {}
@@ -10119,9 +11354,10 @@ def ProcessGAMCommandMulti(pid, numItems, logCmd, mpQueueCSVFile, mpQueueStdout,
     GM.Globals[GM.PARSER] = None
     if mpQueueCSVFile:
       GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE] = mpQueueCSVFile
+      GM.Globals[GM.CSVFILE][GM.REDIRECT_SPOOL_DIR] = csvSpoolDir
     if mpQueueStdout:
       GM.Globals[GM.STDOUT] = {GM.REDIRECT_NAME: '', GM.REDIRECT_FD: None, GM.REDIRECT_MULTI_FD: StringIOobject()}
-      if debugLevel:
+      if debugLevel and mpthreadlocals is None:
         sys.stdout = GM.Globals[GM.STDOUT][GM.REDIRECT_MULTI_FD]
       writeStdQueueHandler(mpQueueStdout,(pid, GM.REDIRECT_QUEUE_START, args))
     else:
@@ -10174,11 +11410,243 @@ def checkChildProcessRC(rc):
     return not low <= rc <= high
   return low <= rc <= high
 
-def initGamWorker(l):
-  global mplock
+# Adaptive concurrency: additive increase/multiplicative decrease of the number of active processes/threads
+# When the workers report new throttling errors, the limit is halved, at most once per THROTTLE_DECREASE_INTERVAL seconds
+# When no throttling errors have been reported for THROTTLE_INCREASE_INTERVAL seconds, the limit is increased by one
+THROTTLE_DECREASE_INTERVAL = 5
+THROTTLE_INCREASE_INTERVAL = 15
+
+class ThrottleController():
+  def __init__(self, maxWorkers, numItems, pluralSingular, getErrorCount):
+    self.maxWorkers = self.limit = maxWorkers
+    self.numItems = numItems
+    self.pluralSingular = pluralSingular
+    self.getErrorCount = getErrorCount
+    self.errorCount = 0
+    self.lastError = self.lastDecrease = self.lastIncrease = time.time()
+    self.active = 0
+    self.condition = threading.Condition()
+
+  def _showLimit(self):
+    batchWriteStderr(Msg.THROTTLING_ERRORS_USING_N_PROCESSES.format(currentISOformatTimeStamp(), self.numItems,
+                                                                    self.errorCount, self.limit,
+                                                                    self.pluralSingular[self.limit == 1]))
+
+  def Limit(self):
+    try:
+      errorCount = self.getErrorCount()
+    except (IOError, EOFError):
+      errorCount = self.errorCount
+    current = time.time()
+    if errorCount > self.errorCount:
+      self.errorCount = errorCount
+      self.lastError = current
+      if self.limit > 1 and current-self.lastDecrease >= THROTTLE_DECREASE_INTERVAL:
+        self.limit = max(1, self.limit//2)
+        self.lastDecrease = current
+        self._showLimit()
+    elif self.limit < self.maxWorkers and current-max(self.lastError, self.lastIncrease) >= THROTTLE_INCREASE_INTERVAL:
+      self.limit += 1
+      self.lastIncrease = current
+      self._showLimit()
+    return self.limit
+
+# Used by threads; wait until the number of active threads is below the limit
+  def Acquire(self):
+    with self.condition:
+      while self.active >= self.Limit():
+        self.condition.wait(1)
+      self.active += 1
+
+  def Release(self):
+    with self.condition:
+      self.active -= 1
+      self.condition.notify_all()
+
+# Threaded multiprocessing: each gam batch/csv process runs multiprocess_threads commands as threads
+# The global state (GM.Globals, GC.Values, Act, Cmd, Ent, Ind) is replaced by thread local proxies;
+# each command thread gets its own copy, the caches, discovery documents and HTTP connection pools are shared
+class ThreadLocalObject():
+  def __init__(self, factory):
+    object.__setattr__(self, '_factory', factory)
+    object.__setattr__(self, '_local', threading.local())
+
+  def _getObject(self):
+    try:
+      return self._local.obj
+    except AttributeError:
+      self._local.obj = self._factory()
+      return self._local.obj
+
+  def _setObject(self, obj):
+    self._local.obj = obj
+
+  def __getattr__(self, name):
+    return getattr(self._getObject(), name)
+
+  def __setattr__(self, name, value):
+    setattr(self._getObject(), name, value)
+
+class ThreadLocalDict(ThreadLocalObject):
+  def __getitem__(self, key):
+    return self._getObject()[key]
+
+  def __setitem__(self, key, value):
+    self._getObject()[key] = value
+
+  def __delitem__(self, key):
+    del self._getObject()[key]
+
+  def __contains__(self, key):
+    return key in self._getObject()
+
+  def __iter__(self):
+    return iter(self._getObject())
+
+  def __len__(self):
+    return len(self._getObject())
+
+def initThreadLocalGlobals():
+  global Act, Cmd, Ent, Ind, mpthreadlocals
+
+  def _copyGlobals():
+    threadGlobals = gmGlobals.copy()
+    for key in [GM.CSVFILE, GM.CSV_TODRIVE, GM.STDERR, GM.STDOUT]:
+      threadGlobals[key] = gmGlobals[key].copy()
+    threadGlobals[GM.API_CALLS_RETRY_DATA] = {}
+# httplib2.Http objects are not thread safe
+    threadGlobals[GM.HTTP_OBJECT] = None
+    return threadGlobals
+
+  gmGlobals = GM.Globals
+  GM.Globals = ThreadLocalDict(_copyGlobals)
+  GC.Values = ThreadLocalDict(GC.Values.copy)
+  Act = ThreadLocalObject(glaction.GamAction)
+  Cmd = ThreadLocalObject(glclargs.GamCLArgs)
+  Ent = ThreadLocalObject(glentity.GamEntity)
+  Ind = ThreadLocalObject(glindent.GamIndent)
+  mpthreadlocals = [GM.Globals, GC.Values, Act, Cmd, Ent, Ind]
+
+# Threads started by a command, e.g. concurrent API calls, share the global state of the command
+def inheritThreadState(function):
+  if mpthreadlocals is None:
+    return function
+  state = [(proxy, proxy._getObject()) for proxy in mpthreadlocals]
+
+  def _inheritState(*args, **kwargs):
+    for proxy, obj in state:
+      proxy._setObject(obj)
+    return function(*args, **kwargs)
+
+  return _inheritState
+
+def ThreadedGAMWorker(taskQueue, resultQueue, numThreads, initargs, queues):
+  def _runTasks():
+    while True:
+      task = taskQueue.get()
+      if task is None:
+        break
+      taskId, function, args = task
+# Restore the output queues that were replaced by flags in ThreadedGAMPool.apply_async
+      args[3:6] = [queue if flag else None for queue, flag in zip(queues, args[3:6])]
+      try:
+        result = function(*args)
+      except Exception:
+        print_exc(file=sys.stderr)
+        result = (args[0], UNKNOWN_ERROR_RC, args[2])
+      resultQueue.put((taskId, result))
+
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  initializeLogging()
+  initGamWorker(threading.Lock(), *initargs[1:])
+  initThreadLocalGlobals()
+  threads = [threading.Thread(target=_runTasks) for _ in range(numThreads)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+
+# A multiprocessing.Pool replacement for MultiprocessGAMCommands; numProcesses processes each run numThreads commands as threads.
+# The output queues are plain multiprocessing queues rather than Manager proxies; they can't be pickled with the tasks
+# so they are passed to the processes when they are started
+class ThreadedGAMPool():
+  class AsyncResult():
+    def __init__(self):
+      self.event = threading.Event()
+      self.value = None
+
+    def ready(self):
+      return self.event.is_set()
+
+    def get(self):
+      self.event.wait()
+      return self.value
+
+  def __init__(self, numProcesses, numThreads, initargs, queues):
+    self.numThreads = numProcesses*numThreads
+    self.taskQueue = multiprocessing.Queue()
+    self.resultQueue = multiprocessing.Queue()
+    self.results = {}
+    self.taskId = 0
+    self.terminated = False
+    self.processes = [multiprocessing.Process(target=ThreadedGAMWorker,
+                                              args=(self.taskQueue, self.resultQueue, numThreads, initargs, queues))
+                      for _ in range(numProcesses)]
+    for process in self.processes:
+      process.start()
+    self.collector = threading.Thread(target=self._collectResults, daemon=True)
+    self.collector.start()
+
+  def _collectResults(self):
+    while True:
+      try:
+        item = self.resultQueue.get()
+      except (EOFError, OSError, ValueError):
+        break
+      if item is None:
+        break
+      taskId, value = item
+      result = self.results.pop(taskId)
+      result.value = value
+      result.event.set()
+
+# args are the ProcessGAMCommandMulti arguments
+  def apply_async(self, function, args):
+    args = list(args)
+    args[3:6] = [queue is not None for queue in args[3:6]]
+    self.taskId += 1
+    result = self.results[self.taskId] = ThreadedGAMPool.AsyncResult()
+    self.taskQueue.put((self.taskId, function, args))
+    return result
+
+  def close(self):
+    for _ in range(self.numThreads):
+      self.taskQueue.put(None)
+
+  def terminate(self):
+    self.terminated = True
+    self.taskQueue.cancel_join_thread()
+    for process in self.processes:
+      process.terminate()
+
+  def join(self):
+    for process in self.processes:
+      process.join()
+    if not self.terminated:
+      self.resultQueue.put(None)
+      self.collector.join()
+
+def initGamWorker(l, rll, rlb, tl, tc):
+  global mplock, mprllock, mprlbuckets, mpthrottlelock, mpthrottlecount
   mplock = l
+  mprllock = rll
+  mprlbuckets = rlb
+  mpthrottlelock = tl
+  mpthrottlecount = tc
 
 def MultiprocessGAMCommands(items, showCmds):
+  global mprllock, mprlbuckets, mpthrottlelock, mpthrottlecount
+
   def poolCallback(result):
     poolProcessResults[0] -= 1
     if showCmds:
@@ -10212,30 +11680,52 @@ def MultiprocessGAMCommands(items, showCmds):
     parallelPoolProcesses = numPoolProcesses
   else:
     parallelPoolProcesses = min(numItems, GC.Values[GC.MULTIPROCESS_POOL_LIMIT])
+  if GC.Values[GC.ADAPTIVE_CONCURRENCY] and parallelPoolProcesses == -1:
+    parallelPoolProcesses = numPoolProcesses
+# With multiprocess_threads > 1, numPoolProcesses commands are run by numPoolProcesses/numPoolThreads processes
+  numPoolThreads = min(numPoolProcesses, GC.Values[GC.MULTIPROCESS_THREADS])
+  if numPoolThreads > 1:
+    numPoolProcesses = (numPoolProcesses+numPoolThreads-1)//numPoolThreads
 #  origSigintHandler = signal.signal(signal.SIGINT, signal.SIG_IGN)
   signal.signal(signal.SIGINT, signal.SIG_IGN)
   mpManager = multiprocessing.Manager()
   l = mpManager.Lock()
-  try:
-    if multiprocessing.get_start_method() != 'fork':
-      pool = mpManager.Pool(processes=numPoolProcesses, initializer=initGamWorker, initargs=(l,), maxtasksperchild=200)
-    else:
-      pool = multiprocessing.Pool(processes=numPoolProcesses, initializer=initGamWorker, initargs=(l,), maxtasksperchild=200)
-  except IOError as e:
-    systemErrorExit(FILE_ERROR_RC, e)
-  except AssertionError as e:
-    Cmd.SetLocation(0)
-    usageErrorExit(str(e))
+  if GC.Values[GC.API_CALLS_RATE_CHECK]:
+    mprllock = mpManager.Lock()
+    mprlbuckets = mpManager.dict()
+  if GC.Values[GC.ADAPTIVE_CONCURRENCY]:
+    mpthrottlelock = mpManager.Lock()
+    mpthrottlecount = mpManager.Value('i', 0)
+    throttle = ThrottleController(parallelPoolProcesses, numItems, [PROCESS_PLURAL_SINGULAR, THREAD_PLURAL_SINGULAR][numPoolThreads > 1],
+                                  lambda: mpthrottlecount.value)
+  else:
+    throttle = None
+  initargs = (l, mprllock, mprlbuckets, mpthrottlelock, mpthrottlecount)
+# The threaded pool is started after the output queue handlers as the queues are passed to its processes
+  if numPoolThreads > 1:
+    mpQueueClass = multiprocessing.Queue
+  else:
+    mpQueueClass = mpManager.Queue
+    try:
+      if multiprocessing.get_start_method() != 'fork':
+        pool = mpManager.Pool(processes=numPoolProcesses, initializer=initGamWorker, initargs=initargs, maxtasksperchild=200)
+      else:
+        pool = multiprocessing.Pool(processes=numPoolProcesses, initializer=initGamWorker, initargs=initargs, maxtasksperchild=200)
+    except IOError as e:
+      systemErrorExit(FILE_ERROR_RC, e)
+    except AssertionError as e:
+      Cmd.SetLocation(0)
+      usageErrorExit(str(e))
   if multiprocessing.get_start_method() != 'fork':
     savedValues = saveNonPickleableValues()
   if GM.Globals[GM.STDOUT][GM.REDIRECT_MULTIPROCESS]:
-    mpQueueStdout, mpQueueHandlerStdout = initializeStdQueueHandler(mpManager, GM.STDOUT, GM.Globals, GC.Values)
+    mpQueueStdout, mpQueueHandlerStdout = initializeStdQueueHandler(mpQueueClass(), GM.STDOUT, GM.Globals, GC.Values)
     mpQueueStdout.put((0, GM.REDIRECT_QUEUE_START, Cmd.AllArguments()))
   else:
     mpQueueStdout = None
   if GM.Globals[GM.STDERR][GM.REDIRECT_MULTIPROCESS]:
     if GM.Globals[GM.STDERR][GM.REDIRECT_NAME] != 'stdout':
-      mpQueueStderr, mpQueueHandlerStderr = initializeStdQueueHandler(mpManager, GM.STDERR, GM.Globals, GC.Values)
+      mpQueueStderr, mpQueueHandlerStderr = initializeStdQueueHandler(mpQueueClass(), GM.STDERR, GM.Globals, GC.Values)
       mpQueueStderr.put((0, GM.REDIRECT_QUEUE_START, Cmd.AllArguments()))
     else:
       mpQueueStderr = mpQueueStdout
@@ -10250,15 +11740,23 @@ def MultiprocessGAMCommands(items, showCmds):
     mpQueueStderr.put((0, GM.REDIRECT_QUEUE_DATA, GM.Globals[GM.STDERR][GM.REDIRECT_MULTI_FD].getvalue()))
     GM.Globals[GM.STDERR][GM.REDIRECT_MULTI_FD].truncate(0)
   if GM.Globals[GM.CSVFILE][GM.REDIRECT_MULTIPROCESS]:
-    mpQueueCSVFile, mpQueueHandlerCSVFile = initializeCSVFileQueueHandler(mpManager, mpQueueStdout, mpQueueStderr)
+    mpQueueCSVFile, mpQueueHandlerCSVFile = initializeCSVFileQueueHandler(mpQueueClass(), mpQueueStdout, mpQueueStderr)
   else:
     mpQueueCSVFile = None
+  if numPoolThreads > 1:
+    pool = ThreadedGAMPool(numPoolProcesses, numPoolThreads, initargs, (mpQueueCSVFile, mpQueueStdout, mpQueueStderr))
 #  signal.signal(signal.SIGINT, origSigintHandler)
   controlC = False
   signal.signal(signal.SIGINT, signal_handler)
-  batchWriteStderr(Msg.USING_N_PROCESSES.format(currentISOformatTimeStamp(),
-                                                numItems, numPoolProcesses,
-                                                PROCESS_PLURAL_SINGULAR[numPoolProcesses == 1]))
+  if numPoolThreads > 1:
+    batchWriteStderr(Msg.USING_N_PROCESSES_M_THREADS.format(currentISOformatTimeStamp(),
+                                                            numItems, numPoolProcesses,
+                                                            PROCESS_PLURAL_SINGULAR[numPoolProcesses == 1],
+                                                            numPoolThreads, Msg.THREADS))
+  else:
+    batchWriteStderr(Msg.USING_N_PROCESSES.format(currentISOformatTimeStamp(),
+                                                  numItems, numPoolProcesses,
+                                                  PROCESS_PLURAL_SINGULAR[numPoolProcesses == 1]))
   try:
     pid = 0
     poolProcessResults = {pid: 0}
@@ -10302,6 +11800,7 @@ def MultiprocessGAMCommands(items, showCmds):
         logCmd = ''
       poolProcessResults[pid] = pool.apply_async(ProcessGAMCommandMulti,
                                                  [pid, numItems, logCmd, mpQueueCSVFile, mpQueueStdout, mpQueueStderr,
+                                                  GM.Globals[GM.CSVFILE].get(GM.REDIRECT_SPOOL_DIR),
                                                   GC.Values[GC.DEBUG_LEVEL], GM.Globals[GM.CSV_TODRIVE],
                                                   GC.Values[GC.PRINT_AGU_DOMAINS],
                                                   GC.Values[GC.PRINT_CROS_OUS], GC.Values[GC.PRINT_CROS_OUS_AND_CHILDREN],
@@ -10325,7 +11824,7 @@ def MultiprocessGAMCommands(items, showCmds):
                                                   item])
       poolProcessResults[0] += 1
       if parallelPoolProcesses > 0:
-        while poolProcessResults[0] == parallelPoolProcesses:
+        while poolProcessResults[0] >= (parallelPoolProcesses if throttle is None else throttle.Limit()):
           completedProcesses = []
           for p, result in poolProcessResults.items():
             if p != 0 and result.ready():
@@ -10334,7 +11833,7 @@ def MultiprocessGAMCommands(items, showCmds):
           if completedProcesses:
             for p in completedProcesses:
               del poolProcessResults[p]
-            break
+            continue
           time.sleep(1)
     processWaitStart = time.time()
     if not controlC:
@@ -10374,6 +11873,7 @@ def MultiprocessGAMCommands(items, showCmds):
   except KeyboardInterrupt:
     handleControlC('KBI')
   pool.join()
+  mprllock = mprlbuckets = mpthrottlelock = mpthrottlecount = None
   batchWriteStderr(Msg.BATCH_CSV_PROCESSING_COMPLETE.format(currentISOformatTimeStamp(), numItems))
   if mpQueueCSVFile:
     terminateCSVFileQueueHandler(mpQueueCSVFile, mpQueueHandlerCSVFile)
@@ -10391,6 +11891,9 @@ def MultiprocessGAMCommands(items, showCmds):
 def threadBatchWorker(showCmds=False, numItems=0):
   while True:
     pid, item, logCmd = GM.Globals[GM.TBATCH_QUEUE].get()
+    throttle = GM.Globals[GM.TBATCH_THROTTLE]
+    if throttle is not None:
+      throttle.Acquire()
     try:
       sysRC = subprocess.call(item, stdout=GM.Globals[GM.STDOUT].get(GM.REDIRECT_MULTI_FD, sys.stdout),
                               stderr=GM.Globals[GM.STDERR].get(GM.REDIRECT_MULTI_FD, sys.stderr))
@@ -10400,6 +11903,8 @@ def threadBatchWorker(showCmds=False, numItems=0):
         GM.Globals[GM.MULTIPROCESS_EXIT_PROCESSING] = True
     except Exception as e:
       batchWriteStderr(f'{currentISOformatTimeStamp()},{pid}/{numItems},Error,{str(e)},{logCmd}\n')
+    if throttle is not None:
+      throttle.Release()
     GM.Globals[GM.TBATCH_QUEUE].task_done()
 
 BATCH_COMMANDS = [Cmd.GAM_CMD, Cmd.COMMIT_BATCH_CMD, Cmd.PRINT_CMD, Cmd.SLEEP_CMD, Cmd.DATETIME_CMD, Cmd.SET_CMD, Cmd.CLEAR_CMD]
@@ -10415,6 +11920,12 @@ def ThreadBatchGAMCommands(items, showCmds):
   numWorkerThreads = min(numItems, GC.Values[GC.NUM_TBATCH_THREADS])
 # GM.Globals[GM.TBATCH_QUEUE].put() gets blocked when trying to create more items than there are workers
   GM.Globals[GM.TBATCH_QUEUE] = queue.Queue(maxsize=numWorkerThreads)
+  if GC.Values[GC.ADAPTIVE_CONCURRENCY]:
+    throttleFd, throttleFile = mkstemp(prefix='gamthrottle-')
+    os.close(throttleFd)
+    os.environ[EV_GAMTHROTTLEFILE] = throttleFile
+    GM.Globals[GM.TBATCH_THROTTLE] = ThrottleController(numWorkerThreads, numItems, THREAD_PLURAL_SINGULAR,
+                                                        lambda: os.path.getsize(throttleFile))
   batchWriteStderr(Msg.USING_N_PROCESSES.format(currentISOformatTimeStamp(),
                                                 numItems, numWorkerThreads,
                                                 THREAD_PLURAL_SINGULAR[numWorkerThreads == 1]))
@@ -10458,6 +11969,10 @@ def ThreadBatchGAMCommands(items, showCmds):
       GM.Globals[GM.TBATCH_QUEUE].put((pid, item[1:], logCmd))
     numThreadsInUse += 1
   GM.Globals[GM.TBATCH_QUEUE].join()
+  if GM.Globals[GM.TBATCH_THROTTLE] is not None:
+    GM.Globals[GM.TBATCH_THROTTLE] = None
+    os.environ.pop(EV_GAMTHROTTLEFILE, None)
+    deleteFile(throttleFile, continueOnError=True)
   if showCmds:
     batchWriteStderr(f'{currentISOformatTimeStamp()},0/{numItems},Complete\n')
 
@@ -10748,7 +12263,7 @@ def doLoop(loopCmd):
   multi = GM.Globals[GM.CSVFILE][GM.REDIRECT_MULTIPROCESS]
   if multi:
     mpManager = multiprocessing.Manager()
-    mpQueue, mpQueueHandler = initializeCSVFileQueueHandler(mpManager, None, None)
+    mpQueue, mpQueueHandler = initializeCSVFileQueueHandler(mpManager.Queue(), None, None)
   else:
     mpQueue = None
   GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE] = mpQueue
@@ -10814,6 +12329,168 @@ def doLoop(loopCmd):
     closeGAMCommandLog(LoopGlobals)
   if multi:
     terminateCSVFileQueueHandler(mpQueue, mpQueueHandler)
+# gam daemon [socket <FileName>]
+GAM_DAEMON_SOCKET_FILE = 'gamdaemon.sock'
+GAM_DAEMON_BACKLOG = 128
+GAM_DAEMON_HEADER = struct.Struct('!I')
+# Discovery documents, service account access tokens and HTTP connection pools (http_transport pooled or http2)
+# stay warm between requests; all other globals, including per-domain caches, are reset for each request
+GAM_DAEMON_WARM_GLOBALS = {GM.CURRENT_API_SERVICES, GM.HTTP_CONNECTION_POOLS, GM.SVCACCT_TOKENS}
+
+def _getDaemonRequest(conn):
+  msg, fds, _, _ = socket.recv_fds(conn, GAM_DAEMON_HEADER.size, 3)
+# A connection without a request, e.g. another daemon checking whether this one is running
+  if not msg and not fds:
+    return None
+  try:
+    if len(fds) != 3:
+      raise ValueError(f'expected 3 file descriptors, received {len(fds)}')
+    while len(msg) < GAM_DAEMON_HEADER.size:
+      chunk = conn.recv(GAM_DAEMON_HEADER.size-len(msg))
+      if not chunk:
+        raise ValueError('truncated header')
+      msg += chunk
+    length = GAM_DAEMON_HEADER.unpack(msg)[0]
+    data = bytearray()
+    while len(data) < length:
+      chunk = conn.recv(min(length-len(data), 65536))
+      if not chunk:
+        raise ValueError('truncated request')
+      data.extend(chunk)
+    request = json.loads(data.decode(UTF8))
+    args = request['args']
+    cwd = request['cwd']
+    if not args or not isinstance(args, list) or not all(isinstance(arg, str) for arg in args) or not isinstance(cwd, str):
+      raise ValueError('args must be a non-empty list of strings and cwd a string')
+    return (args, cwd, fds)
+  except (KeyError, TypeError, ValueError):
+    for fd in fds:
+      os.close(fd)
+    raise
+
+def _resetDaemonGlobals(daemonGlobals):
+  for key, value in daemonGlobals.items():
+    if key not in GAM_DAEMON_WARM_GLOBALS:
+      GM.Globals[key] = value.copy() if isinstance(value, (dict, list, set)) else value
+  GM.Globals[GM.CSVFILE] = {}
+  GM.Globals[GM.STDERR] = {}
+  GM.Globals[GM.STDOUT] = {}
+  GM.Globals[GM.PARSER] = None
+  GM.Globals[GM.SAVED_STDOUT] = None
+
+# The client's stdin/stdout/stderr are installed as fds 0/1/2 while its command runs;
+# stdio and the working directory are process wide, so requests are run one at a time
+def _runDaemonRequest(conn, daemonGlobals):
+  request = _getDaemonRequest(conn)
+  if request is None:
+    return
+  args, cwd, fds = request
+  flushStdout()
+  flushStderr()
+  savedFds = [os.dup(fd) for fd in range(3)]
+  savedCwd = os.getcwd()
+  try:
+    for fd, clientFd in enumerate(fds):
+      os.dup2(clientFd, fd)
+      os.close(clientFd)
+    _resetDaemonGlobals(daemonGlobals)
+    try:
+      os.chdir(cwd)
+      try:
+        sysRC = ProcessGAMCommand(args)
+# Errors raised while ProcessGAMCommand handles another error, e.g. SvcAcctAPIDisabledExit, end the command, not the daemon
+      except SystemExit as e:
+        sysRC = e.code
+    except OSError as e:
+      printErrorMessage(FILE_ERROR_RC, fileErrorMessage('chdir', cwd, e, Ent.DIRECTORY))
+      sysRC = FILE_ERROR_RC
+  finally:
+    for f in [sys.stdout, sys.stderr]:
+      try:
+        f.flush()
+      except (OSError, ValueError):
+        pass
+    for fd, savedFd in enumerate(savedFds):
+      os.dup2(savedFd, fd)
+      os.close(savedFd)
+    os.chdir(savedCwd)
+    for key in [GM.CSVFILE, GM.STDERR, GM.STDOUT]:
+      GM.Globals[key] = daemonGlobals[key]
+  if sysRC is None:
+    sysRC = 0
+  elif not isinstance(sysRC, int):
+    sysRC = UNKNOWN_ERROR_RC
+  conn.sendall(json.dumps({'rc': sysRC}).encode(UTF8))
+
+def _daemonPeerIsOwner(conn):
+  if not hasattr(socket, 'SO_PEERCRED'):
+    return True
+  _, uid, _ = struct.unpack('3i', conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+  return uid == os.getuid()
+
+def doDaemon():
+  socketPath = os.path.join(GM.Globals[GM.GAM_CFG_PATH], GAM_DAEMON_SOCKET_FILE)
+  while Cmd.ArgumentsRemaining():
+    myarg = getArgument()
+    if myarg == 'socket':
+      socketPath = os.path.expanduser(getString(Cmd.OB_FILE_NAME))
+    else:
+      unknownArgumentExit()
+  if not hasattr(socket, 'AF_UNIX') or not hasattr(socket, 'recv_fds'):
+    systemErrorExit(USAGE_ERROR_RC, Msg.GAM_DAEMON_NOT_SUPPORTED)
+  if os.path.exists(socketPath):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+      try:
+        probe.connect(socketPath)
+        running = True
+      except OSError:
+        running = False
+    if running:
+      systemErrorExit(USAGE_ERROR_RC, Msg.GAM_DAEMON_ALREADY_RUNNING.format(socketPath))
+# Stale socket from a daemon that did not exit cleanly
+    try:
+      os.remove(socketPath)
+    except OSError as e:
+      systemErrorExit(FILE_ERROR_RC, fileErrorMessage('delete', socketPath, e))
+  server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  oldUmask = os.umask(0o077)
+  try:
+    server.bind(socketPath)
+    server.listen(GAM_DAEMON_BACKLOG)
+  except OSError as e:
+    server.close()
+    systemErrorExit(FILE_ERROR_RC, fileErrorMessage('bind', socketPath, e))
+  finally:
+    os.umask(oldUmask)
+# Each request opens its own command log entry
+  if GM.Globals[GM.CMDLOG_LOGGER]:
+    closeGAMCommandLog(GM.Globals)
+  GM.Globals[GM.SVCACCT_TOKENS] = {}
+  daemonGlobals = {key: value.copy() if isinstance(value, (dict, list, set)) else value for key, value in GM.Globals.items()}
+  writeStderr(Msg.GAM_DAEMON_LISTENING.format(socketPath))
+  try:
+    while True:
+      conn, _ = server.accept()
+      with conn:
+        if not _daemonPeerIsOwner(conn):
+          continue
+        try:
+          _runDaemonRequest(conn, daemonGlobals)
+        except (KeyError, TypeError, ValueError) as e:
+          stderrErrorMsg(Msg.GAM_DAEMON_INVALID_REQUEST.format(str(e)))
+        except OSError as e:
+# Client went away before its exit code could be returned
+          stderrErrorMsg(str(e))
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.close()
+    try:
+      os.remove(socketPath)
+    except OSError:
+      pass
+  setSysExitRC(0)
+  writeStderr(Msg.GAM_DAEMON_STOPPED)
 
 def _doList(entityList, entityType):
   buildGAPIObject(API.DIRECTORY)
@@ -12948,10 +14625,10 @@ def _generatePrivateKeyAndPublicCert(projectId, clientEmail, name, key_size, b64
   # suppress cryptography warnings on service account email length
   with warnings.catch_warnings():
     warnings.filterwarnings('ignore', message='.*Attribute\'s length.*')
-    builder = builder.subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME,
+    builder = builder.subject_name(x509.Name([x509.NameAttribute(x509.oid.NameOID.COMMON_NAME,
                                                                  name,
                                                                  _validate=False)]))
-    builder = builder.issuer_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME,
+    builder = builder.issuer_name(x509.Name([x509.NameAttribute(x509.oid.NameOID.COMMON_NAME,
                                                                 name,
                                                                 _validate=False)]))
   # Gooogle seems to enforce the not before date strictly. Set the not before
@@ -13636,6 +15313,132 @@ def doReportUsageParameters():
     csvPF.WriteRow({'parameter': parameter})
   csvPF.writeCSVfile(f'{report.capitalize()} Report Usage Parameters')
 
+# The email, id, orgUnitPath, suspended/archived state and aliases of all users are indexed in cache_dir/userdirectory.db;
+# the index is refreshed when it is older than user_directory_index_hours. The Directory API has no change feed for users,
+# so a refresh lists all users but only the users whose etag has changed are rewritten.
+USER_DIRECTORY_INDEX_FILE = 'userdirectory.db'
+USER_DIRECTORY_INDEX_FIELDS = 'nextPageToken,users(primaryEmail,id,orgUnitPath,suspended,archived,aliases,etag)'
+
+class UserDirectoryIndex():
+  def __init__(self, dbFile):
+    self.dbFile = dbFile
+    self.refreshed = set()
+
+  def _open(self):
+    conn = sqlite3.connect(self.dbFile, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS users (customer TEXT, email TEXT, id TEXT, orgUnitPath TEXT, orgUnitPathLower TEXT,'
+                 ' suspended INTEGER, archived INTEGER, aliases TEXT, etag TEXT, PRIMARY KEY (customer, email))')
+    conn.execute('CREATE INDEX IF NOT EXISTS usersOrgUnit ON users (customer, orgUnitPathLower)')
+    conn.execute('CREATE TABLE IF NOT EXISTS refreshes (customer TEXT PRIMARY KEY, refreshed REAL)')
+    return conn
+
+# Returns (total, changed, deleted) user counts; raises the same exceptions as users.list
+  def Refresh(self, cd, customer):
+    printGettingAllAccountEntities(Ent.USER)
+    refreshed = time.time()
+    users = callGAPIpages(cd.users(), 'list', 'users',
+                          pageMessage=getPageMessage(),
+                          throwReasons=[GAPI.INVALID_ORGUNIT, GAPI.ORGUNIT_NOT_FOUND,
+                                        GAPI.INVALID_INPUT, GAPI.BAD_REQUEST, GAPI.RESOURCE_NOT_FOUND, GAPI.FORBIDDEN],
+                          retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
+                          customer=customer, orderBy='email',
+                          fields=USER_DIRECTORY_INDEX_FIELDS, maxResults=GC.Values[GC.USER_MAX_RESULTS])
+    conn = self._open()
+    try:
+      with conn:
+        etags = dict(conn.execute('SELECT email, etag FROM users WHERE customer = ?', (customer,)).fetchall())
+        changed = 0
+        for user in users:
+          email = user['primaryEmail']
+          if etags.pop(email, None) != user.get('etag') or not user.get('etag'):
+            orgUnitPath = user.get('orgUnitPath', '/')
+            conn.execute('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (customer, email, user['id'], orgUnitPath, orgUnitPath.lower(),
+                          int(user.get('suspended', False)), int(user.get('archived', False)),
+                          json.dumps(user.get('aliases', [])), user.get('etag')))
+            changed += 1
+        conn.executemany('DELETE FROM users WHERE customer = ? AND email = ?', [(customer, email) for email in etags])
+        conn.execute('INSERT OR REPLACE INTO refreshes VALUES (?, ?)', (customer, refreshed))
+    finally:
+      conn.close()
+    self.refreshed.add(customer)
+    return (len(users), changed, len(etags))
+
+# Returns True if the index for customer is current, refreshing it if necessary; False if the index can't be used
+  def _current(self, cd, customer):
+    if customer in self.refreshed:
+      return True
+    try:
+      conn = self._open()
+      try:
+        row = conn.execute('SELECT refreshed FROM refreshes WHERE customer = ?', (customer,)).fetchone()
+      finally:
+        conn.close()
+      if row and time.time()-row[0] <= GC.Values[GC.USER_DIRECTORY_INDEX_HOURS]*SECONDS_PER_HOUR:
+        self.refreshed.add(customer)
+        return True
+      self.Refresh(cd, customer)
+      return True
+    except (OSError, sqlite3.Error,
+            GAPI.invalidInput, GAPI.invalidOrgunit, GAPI.orgunitNotFound, GAPI.backendError, GAPI.badRequest,
+            GAPI.invalidCustomerId, GAPI.loginRequired, GAPI.resourceNotFound, GAPI.forbidden):
+      return False
+
+# Returns a list of (email, orgUnitPath) of the users in orgUnitPath, and its children if directlyInOU is False,
+# ordered by email; or None if the index can't be used
+  def GetOrgUnitUsers(self, cd, orgUnitPath, directlyInOU=False, isSuspended=None, isArchived=None):
+    customer = GC.Values[GC.CUSTOMER_ID]
+    if not self._current(cd, customer):
+      return None
+    orgUnitPathLower = orgUnitPath.lower()
+    query = 'SELECT email, orgUnitPath FROM users WHERE customer = ?'
+    args = [customer]
+    if directlyInOU:
+      query += ' AND orgUnitPathLower = ?'
+      args.append(orgUnitPathLower)
+    elif orgUnitPath != '/':
+      prefix = orgUnitPathLower+'/'
+      query += ' AND (orgUnitPathLower = ? OR substr(orgUnitPathLower, 1, ?) = ?)'
+      args.extend([orgUnitPathLower, len(prefix), prefix])
+    if isSuspended is not None:
+      query += ' AND suspended = ?'
+      args.append(int(isSuspended))
+    if isArchived is not None:
+      query += ' AND archived = ?'
+      args.append(int(isArchived))
+    try:
+      conn = self._open()
+      try:
+        return conn.execute(query+' ORDER BY email', args).fetchall()
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      return None
+
+def getUserDirectoryIndex():
+  if not GM.Globals[GM.CACHE_DIR] or GC.Values.get(GC.USER_DIRECTORY_INDEX_HOURS, 0) == 0:
+    return None
+  if GM.Globals[GM.USER_DIRECTORY_INDEX] is None:
+    GM.Globals[GM.USER_DIRECTORY_INDEX] = UserDirectoryIndex(os.path.join(GM.Globals[GM.CACHE_DIR], USER_DIRECTORY_INDEX_FILE))
+  return GM.Globals[GM.USER_DIRECTORY_INDEX]
+
+# gam update userdirectoryindex
+def doUpdateUserDirectoryIndex():
+  cd = buildGAPIObject(API.DIRECTORY)
+  checkForExtraneousArguments()
+  udi = getUserDirectoryIndex()
+  if udi is None:
+    systemErrorExit(USAGE_ERROR_RC, Msg.USER_DIRECTORY_INDEX_NOT_ENABLED)
+  try:
+    total, changed, deleted = udi.Refresh(cd, GC.Values[GC.CUSTOMER_ID])
+  except (OSError, sqlite3.Error) as e:
+    systemErrorExit(FILE_ERROR_RC, fileErrorMessage('update', udi.dbFile, e))
+  except (GAPI.invalidInput, GAPI.invalidOrgunit, GAPI.orgunitNotFound, GAPI.backendError, GAPI.badRequest,
+          GAPI.invalidCustomerId, GAPI.loginRequired, GAPI.resourceNotFound, GAPI.forbidden):
+    accessErrorExit(cd)
+  entityActionPerformedMessage([Ent.FILE, udi.dbFile], f'{total} {Ent.Choose(Ent.USER, total)}, {changed} changed, {deleted} deleted')
+
 def getUserOrgUnits(cd, orgUnit, orgUnitId):
   try:
     if orgUnit == orgUnitId:
@@ -13644,6 +15447,12 @@ def getUserOrgUnits(cd, orgUnit, orgUnitId):
                          customerId=GC.Values[GC.CUSTOMER_ID], orgUnitPath=orgUnit, fields='orgUnitPath')['orgUnitPath']
     printGettingAllEntityItemsForWhom(Ent.USER, orgUnit, qualifier=Msg.IN_THE.format(Ent.Singular(Ent.ORGANIZATIONAL_UNIT)),
                                       entityType=Ent.ORGANIZATIONAL_UNIT)
+    udi = getUserDirectoryIndex()
+    if udi is not None:
+      result = udi.GetOrgUnitUsers(cd, orgUnit)
+      if result is not None:
+        printGotEntityItemsForWhom(len(result))
+        return dict(result)
     result = callGAPIpages(cd.users(), 'list', 'users',
                            pageMessage=getPageMessageForWhom(),
                            throwReasons=[GAPI.INVALID_ORGUNIT, GAPI.ORGUNIT_NOT_FOUND,
@@ -14891,7 +16700,7 @@ def doReport():
               eventCounts.setdefault(event['name'], 0)
               eventCounts[event['name']] += 1
     if not countsOnly:
-      if not csvPF.rows and showNoActivities:
+      if not csvPF.rowCount and showNoActivities:
         row = {'name': 'NoActivities'}
         if addCSVData:
           row.update(addCSVData)
@@ -17726,6 +19535,8 @@ def doPrintShowAdmins():
   except (GAPI.forbidden, GAPI.permissionDenied) as e:
     ClientAPIAccessDeniedExit(str(e))
   count = len(admins)
+  prefetchUIDEmailCache(cd, {admin['assignedTo'] for admin in admins if admin.get('assigneeType') == 'user'}, 'user')
+  prefetchUIDEmailCache(cd, {admin['assignedTo'] for admin in admins if admin.get('assigneeType') == 'group'}, 'group')
   groupMembers = {}
   expandedAdmins = []
   i = 0
@@ -19344,41 +21155,45 @@ def doDeleteAliases():
 
 # gam remove aliases|nicknames <EmailAddress> user|group <EmailAddressEntity>
 def doRemoveAliases():
+  def _removeAliasCallback(aliasEmail, i):
+    def _callback(_, exception):
+      if exception is None:
+        entityActionPerformed([targetEntityType, targetEmail, aliasEntityType, aliasEmail], i, count)
+      elif isinstance(exception, GAPI.invalidResource):
+        entityActionFailedWarning([targetEntityType, targetEmail, aliasEntityType, aliasEmail], Msg.DOES_NOT_EXIST, i, count)
+      else:
+        entityActionFailedWarning([targetEntityType, targetEmail, aliasEntityType, aliasEmail], str(exception), i, count)
+    return _callback
+
   cd = buildGAPIObject(API.DIRECTORY)
   targetEmail = getEmailAddress()
   targetType = getChoice(['user', 'group'])
   entityList = getEntityList(Cmd.OB_EMAIL_ADDRESS_ENTITY)
   checkForExtraneousArguments()
-  count = len(entityList)
-  i = 0
   if targetType == 'user':
-    try:
-      for aliasEmail in entityList:
-        i += 1
-        aliasEmail = normalizeEmailAddressOrUID(aliasEmail, noUid=True)
-        callGAPI(cd.users().aliases(), 'delete',
-                 throwReasons=[GAPI.USER_NOT_FOUND, GAPI.BAD_REQUEST, GAPI.INVALID, GAPI.FORBIDDEN, GAPI.INVALID_RESOURCE,
-                               GAPI.CONDITION_NOT_MET],
-                 userKey=targetEmail, alias=aliasEmail)
-        entityActionPerformed([Ent.USER, targetEmail, Ent.USER_ALIAS, aliasEmail], i, count)
-    except (GAPI.userNotFound, GAPI.badRequest, GAPI.invalid, GAPI.forbidden, GAPI.conditionNotMet) as e:
-      entityActionFailedWarning([Ent.USER, targetEmail, Ent.USER_ALIAS, aliasEmail], str(e), i, count)
-    except GAPI.invalidResource:
-      entityActionFailedWarning([Ent.USER, targetEmail, Ent.USER_ALIAS, aliasEmail], Msg.DOES_NOT_EXIST, i, count)
+    targetEntityType = Ent.USER
+    aliasEntityType = Ent.USER_ALIAS
+    service = cd.users().aliases()
+    kwargs = {'userKey': targetEmail}
+    throwReasons = [GAPI.USER_NOT_FOUND, GAPI.BAD_REQUEST, GAPI.INVALID, GAPI.FORBIDDEN, GAPI.INVALID_RESOURCE,
+                    GAPI.CONDITION_NOT_MET]
   else:
-    try:
-      for aliasEmail in entityList:
-        i += 1
-        aliasEmail = normalizeEmailAddressOrUID(aliasEmail, noUid=True)
-        callGAPI(cd.groups().aliases(), 'delete',
-                 throwReasons=[GAPI.GROUP_NOT_FOUND, GAPI.USER_NOT_FOUND, GAPI.BAD_REQUEST, GAPI.INVALID, GAPI.FORBIDDEN, GAPI.INVALID_RESOURCE,
-                               GAPI.CONDITION_NOT_MET],
-                 groupKey=targetEmail, alias=aliasEmail)
-        entityActionPerformed([Ent.GROUP, targetEmail, Ent.GROUP_ALIAS, aliasEmail], i, count)
-    except (GAPI.groupNotFound, GAPI.userNotFound, GAPI.badRequest, GAPI.invalid, GAPI.forbidden, GAPI.conditionNotMet) as e:
-      entityActionFailedWarning([Ent.GROUP, targetEmail, Ent.GROUP_ALIAS, aliasEmail], str(e), i, count)
-    except GAPI.invalidResource:
-      entityActionFailedWarning([Ent.GROUP, targetEmail, Ent.GROUP_ALIAS, aliasEmail], Msg.DOES_NOT_EXIST, i, count)
+    targetEntityType = Ent.GROUP
+    aliasEntityType = Ent.GROUP_ALIAS
+    service = cd.groups().aliases()
+    kwargs = {'groupKey': targetEmail}
+    throwReasons = [GAPI.GROUP_NOT_FOUND, GAPI.USER_NOT_FOUND, GAPI.BAD_REQUEST, GAPI.INVALID, GAPI.FORBIDDEN, GAPI.INVALID_RESOURCE,
+                    GAPI.CONDITION_NOT_MET]
+  batcher = GAPIBatcher(cd)
+  count = len(entityList)
+  i = 0
+  for aliasEmail in entityList:
+    i += 1
+    aliasEmail = normalizeEmailAddressOrUID(aliasEmail, noUid=True)
+    batcher.Add(service, 'delete', _removeAliasCallback(aliasEmail, i),
+                throwReasons=throwReasons,
+                alias=aliasEmail, **kwargs)
+  batcher.Execute()
 
 def _addUserAliases(cd, user, aliasList, i, count):
   jcount = len(aliasList)
@@ -19408,6 +21223,14 @@ def _addUserAliases(cd, user, aliasList, i, count):
 
 # gam <UserTypeEntity> delete alias|aliases
 def deleteUsersAliases(users):
+  def _deleteAliasCallback(an_alias, j):
+    def _callback(_, exception):
+      if exception is None:
+        entityActionPerformed([Ent.USER, user_primary, Ent.ALIAS, an_alias], j, jcount)
+      else:
+        entityActionFailedWarning([Ent.USER, user_primary, Ent.ALIAS, an_alias], Msg.DOES_NOT_EXIST, j, jcount)
+    return _callback
+
   cd = buildGAPIObject(API.DIRECTORY)
   checkForExtraneousArguments()
   i, count, users = getEntityArgument(users)
@@ -19426,16 +21249,14 @@ def deleteUsersAliases(users):
         setSysExitRC(NO_ENTITIES_FOUND_RC)
         continue
       Ind.Increment()
+      batcher = GAPIBatcher(cd)
       j = 0
       for an_alias in user_aliases['aliases']:
         j += 1
-        try:
-          callGAPI(cd.users().aliases(), 'delete',
-                   throwReasons=[GAPI.RESOURCE_ID_NOT_FOUND],
-                   userKey=user_id, alias=an_alias)
-          entityActionPerformed([Ent.USER, user_primary, Ent.ALIAS, an_alias], j, jcount)
-        except GAPI.resourceIdNotFound:
-          entityActionFailedWarning([Ent.USER, user_primary, Ent.ALIAS, an_alias], Msg.DOES_NOT_EXIST, j, jcount)
+        batcher.Add(cd.users().aliases(), 'delete', _deleteAliasCallback(an_alias, j),
+                    throwReasons=[GAPI.RESOURCE_ID_NOT_FOUND],
+                    userKey=user_id, alias=an_alias)
+      batcher.Execute()
       Ind.Decrement()
     except (GAPI.userNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.forbidden,
             GAPI.badRequest, GAPI.backendError, GAPI.systemError):
@@ -20816,14 +22637,16 @@ def _getContactEntityList(unknownAction, printShowCmd):
       checkForExtraneousArguments()
   return (entityList, contactQuery, queriedContacts)
 
+def _getContactsQueryUri(contactsObject, contactQuery, user):
+  if contactQuery['query']:
+    return getContactsQuery(feed=contactsObject.GetContactFeedUri(contact_list=user, projection=contactQuery['projection']),
+                            text_query=contactQuery['query']).ToUri()
+  return contactsObject.GetContactFeedUri(contact_list=user, projection=contactQuery['projection'])
+
 def queryContacts(contactsObject, contactQuery):
   entityType = Ent.DOMAIN
   user = GC.Values[GC.DOMAIN]
-  if contactQuery['query']:
-    uri = getContactsQuery(feed=contactsObject.GetContactFeedUri(contact_list=user, projection=contactQuery['projection']),
-                           text_query=contactQuery['query']).ToUri()
-  else:
-    uri = contactsObject.GetContactFeedUri(contact_list=user, projection=contactQuery['projection'])
+  uri = _getContactsQueryUri(contactsObject, contactQuery, user)
   printGettingAllEntityItemsForWhom(Ent.CONTACT, user, query=contactQuery['query'])
   try:
     entityList = callGDataPages(contactsObject, 'GetContactsFeed',
@@ -20838,6 +22661,23 @@ def queryContacts(contactsObject, contactQuery):
     entityServiceNotApplicableWarning(entityType, user)
   return None
 
+# Streaming version of queryContacts, contacts are parsed and yielded one at a time
+def yieldContacts(contactsObject, contactQuery):
+  entityType = Ent.DOMAIN
+  user = GC.Values[GC.DOMAIN]
+  uri = _getContactsQueryUri(contactsObject, contactQuery, user)
+  printGettingAllEntityItemsForWhom(Ent.CONTACT, user, query=contactQuery['query'])
+  try:
+    yield from yieldGDataPages(contactsObject, 'GetContactsFeedEntries',
+                               pageMessage=getPageMessageForWhom(),
+                               throwErrors=[GDATA.BAD_REQUEST, GDATA.FORBIDDEN],
+                               retryErrors=[GDATA.INTERNAL_SERVER_ERROR],
+                               uri=uri, url_params=contactQuery['url_params'])
+  except GDATA.badRequest as e:
+    entityActionFailedWarning([entityType, user, Ent.CONTACT, ''], str(e))
+  except GDATA.forbidden:
+    entityServiceNotApplicableWarning(entityType, user)
+
 def localContactSelects(contactsManager, contactQuery, fields):
   if contactQuery['emailMatchPattern']:
     emailMatchType = contactQuery['emailMatchType']
@@ -21275,7 +23115,11 @@ def doPrintShowDomainContacts():
     else:
       FJQC.GetFormatJSONQuoteChar(myarg, True)
   user, contactsObject = getContactsObject()
-  contacts = queryContacts(contactsObject, contactQuery)
+# show needs the number of contacts before they are displayed; print and countsonly process them as they are read
+  if csvPF or countsOnly:
+    contacts = yieldContacts(contactsObject, contactQuery)
+  else:
+    contacts = queryContacts(contactsObject, contactQuery)
   if countsOnly:
     jcount = countLocalContactSelects(contactsManager, contacts, contactQuery)
     if csvPF:
@@ -21283,8 +23127,8 @@ def doPrintShowDomainContacts():
     else:
       printEntityKVList([entityType, user], [CSVTitle, jcount])
   elif contacts is not None:
-    jcount = len(contacts)
     if not csvPF:
+      jcount = len(contacts)
       if not FJQC.formatJSON:
         entityPerformActionModifierNumItems([entityType, user], Msg.MAXIMUM_OF, jcount, Ent.CONTACT)
       Ind.Increment()
@@ -21296,7 +23140,7 @@ def doPrintShowDomainContacts():
           continue
         _showContact(contactsManager, fields, displayFieldsList, j, jcount, FJQC)
       Ind.Decrement()
-    elif contacts:
+    else:
       for contact in contacts:
         fields = contactsManager.ContactToFields(contact)
         if not localContactSelects(contactsManager, contactQuery, fields):
@@ -28408,6 +30252,12 @@ def _getChatMemberEmail(cd, member):
     _, memberUid = member['groupMember']['name'].split('/')
     member['groupMember']['email'], _ = convertUIDtoEmailAddressWithType(f'uid:{memberUid}', cd, None, emailTypes=['group'])
 
+def _prefetchChatMemberEmails(cd, members):
+  prefetchUIDEmailCache(cd, {member['member']['name'].split('/')[1] for member in members
+                             if member.get('member', {}).get('type') == 'HUMAN'}, 'user')
+  prefetchUIDEmailCache(cd, {member['groupMember']['name'].split('/')[1] for member in members
+                             if 'groupMember' in member}, 'group')
+
 def _getChatSpaceMembers(cd, chatSpace, ciGroupName):
   if chatSpace.startswith('space/'):
     _, chatSpace = chatSpace.split('/', 1)
@@ -28425,6 +30275,7 @@ def _getChatSpaceMembers(cd, chatSpace, ciGroupName):
                             throwReasons=[GAPI.NOT_FOUND, GAPI.INVALID_ARGUMENT, GAPI.PERMISSION_DENIED],
                             retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
                             parent=chatSpace, fields=fields, pageSize=GC.Values[GC.CHAT_MAX_RESULTS], **kwargsUAA)
+    _prefetchChatMemberEmails(cd, members)
     for member in members:
       _getChatMemberEmail(cd, member)
       gmember = {}
@@ -29097,6 +30948,7 @@ def printShowChatMembers(users):
                                 throwReasons=[GAPI.NOT_FOUND, GAPI.INVALID_ARGUMENT, GAPI.PERMISSION_DENIED],
                                 retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
                                 parent=parentName, fields=fields, pageSize=GC.Values[GC.CHAT_MAX_RESULTS], **kwargs, **kwargsUAA)
+        _prefetchChatMemberEmails(cd, members)
         for member in members:
           _getChatMemberEmail(cd, member)
       except (GAPI.notFound, GAPI.invalidArgument, GAPI.permissionDenied) as e:
@@ -34731,6 +36583,7 @@ def doCreateGroup(ciGroupsAPI=False):
       return
     if not getBeforeUpdate:
       settings = gs_body
+  invalidateUIDEmailCache([groupEmail], 'group')
   duplicateRetries = 0
   while True:
     try:
@@ -35339,6 +37192,8 @@ def doUpdateGroups():
           entityActionFailedWarning([entityType, origGroup], str(e), i, count)
           continue
       if body:
+        if 'email' in body:
+          invalidateUIDEmailCache([origGroup, group, body['email']], 'group')
         try:
           group = callGAPI(cd.groups(), 'update',
                            throwReasons=GAPI.GROUP_UPDATE_THROW_REASONS, retryReasons=GAPI.GROUP_GET_RETRY_REASONS,
@@ -35720,6 +37575,7 @@ def doDeleteGroups(ciGroupsAPI=False):
           continue
         if noActionIfAlias and not verifyGroupPrimaryEmail(cd, groupKey, i, count):
           continue
+        invalidateUIDEmailCache([groupKey], 'group')
         callGAPI(cd.groups(), 'delete',
                  throwReasons=[GAPI.GROUP_NOT_FOUND, GAPI.DOMAIN_NOT_FOUND, GAPI.FORBIDDEN, GAPI.INVALID],
                  groupKey=groupKey)
@@ -35727,6 +37583,7 @@ def doDeleteGroups(ciGroupsAPI=False):
         _, groupKey, groupEmail = convertGroupEmailToCloudID(ci, group, i, count)
         if not groupKey or not groupEmail:
           continue
+        invalidateUIDEmailCache([groupEmail], 'group')
         callGAPI(ci.groups(), 'delete',
                  throwReasons=[GAPI.NOT_FOUND, GAPI.DOMAIN_NOT_FOUND, GAPI.FORBIDDEN, GAPI.INVALID],
                  name=groupKey)
@@ -37120,6 +38977,212 @@ def infoGroupMembers(entityList, ciGroupsAPI=False):
 def doInfoGroupMembers():
   infoGroupMembers(getEntityToModify(defaultEntityType=Cmd.ENTITY_USERS)[1], False)
 
+# Group memberships used for recursive group expansion are cached in cache_dir/groupmembership.db;
+# a group's members are listed again when its entry is older than group_membership_cache_hours.
+# gam update groupmembershipcache loads every group in the customer; with that complete graph,
+# the parents of a group can be found without calling groups.list for each group.
+GROUP_MEMBERSHIP_CACHE_FILE = 'groupmembership.db'
+GROUP_MEMBERSHIP_CACHE_FIELDS = 'nextPageToken,members(delivery_settings,email,id,role,status,type)'
+
+class GroupMembershipCache():
+  def __init__(self, dbFile):
+    self.dbFile = dbFile
+    self.groups = {}
+    self.parents = None
+    self.lock = threading.Lock()
+
+  def _open(self):
+    conn = sqlite3.connect(self.dbFile, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS groups (groupKey TEXT PRIMARY KEY, id TEXT, email TEXT, name TEXT, fetched REAL, members TEXT)')
+    conn.execute('CREATE INDEX IF NOT EXISTS groupsEmail ON groups (email)')
+    conn.execute('CREATE INDEX IF NOT EXISTS groupsId ON groups (id)')
+    conn.execute('CREATE TABLE IF NOT EXISTS builds (customer TEXT PRIMARY KEY, built REAL)')
+    return conn
+
+  @staticmethod
+  def _normalizeKey(groupKey):
+    return groupKey.lower() if '@' in groupKey else groupKey
+
+  @staticmethod
+  def _maxAge():
+    return GC.Values[GC.GROUP_MEMBERSHIP_CACHE_HOURS]*SECONDS_PER_HOUR
+
+  def _read(self, key):
+    try:
+      conn = self._open()
+      try:
+        row = conn.execute('SELECT fetched, members FROM groups WHERE groupKey = ? OR email = ? OR id = ?', (key, key, key)).fetchone()
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      return None
+    if not row:
+      return None
+    try:
+      return {'fetched': row[0], 'members': json.loads(row[1])}
+    except ValueError:
+      return None
+
+  @staticmethod
+  def _writeGroup(conn, groupId, groupEmail, groupName, entry):
+    groupEmail = groupEmail.lower() if groupEmail else None
+    conn.execute('DELETE FROM groups WHERE email = ? OR id = ?', (groupEmail, groupId))
+    conn.execute('INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?, ?, ?)',
+                 (groupId or groupEmail, groupId, groupEmail, groupName, entry['fetched'], json.dumps(entry['members'])))
+
+  def _write(self, key, groupId, entry):
+    try:
+      conn = self._open()
+      try:
+        with conn:
+          if groupId is None and '@' not in key:
+            groupId = key
+          self._writeGroup(conn, groupId, key if '@' in key else None, None, entry)
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      pass
+
+# Returns copies of all of a group's members, listing them if the group is not cached or its entry has expired;
+# raises the same exceptions as members.list
+  def GetMembers(self, cd, groupKey, groupId=None, pageMessage=None):
+    key = self._normalizeKey(groupKey)
+    with self.lock:
+      entry = self.groups.get(key)
+    if entry is None:
+      entry = self._read(key)
+    if entry is None or time.time()-entry['fetched'] > self._maxAge():
+      members = callGAPIpages(cd.members(), 'list', 'members',
+                              pageMessage=pageMessage,
+                              throwReasons=GAPI.MEMBERS_THROW_REASONS, retryReasons=GAPI.MEMBERS_RETRY_REASONS,
+                              groupKey=groupKey, fields=GROUP_MEMBERSHIP_CACHE_FIELDS, maxResults=GC.Values[GC.MEMBER_MAX_RESULTS])
+      entry = {'fetched': time.time(), 'members': members}
+      self._write(key, groupId, entry)
+    with self.lock:
+      self.groups[key] = entry
+      if groupId:
+        self.groups[groupId] = entry
+    return [member.copy() for member in entry['members']]
+
+# Load all groups in a customer and their members; numThreads members.list calls are made concurrently
+  def Build(self, cd, customer, numThreads):
+    def _getMembers(group):
+      if not hasattr(threadData, 'cd'):
+        threadData.cd = _cloneGAPIServiceForThread(cd) if numThreads > 1 else cd
+      try:
+        return callGAPIpages(threadData.cd.members(), 'list', 'members',
+                             throwReasons=GAPI.MEMBERS_THROW_REASONS, retryReasons=GAPI.MEMBERS_RETRY_REASONS,
+                             groupKey=group['id'], fields=GROUP_MEMBERSHIP_CACHE_FIELDS, maxResults=GC.Values[GC.MEMBER_MAX_RESULTS])
+      except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.invalid, GAPI.forbidden, GAPI.serviceNotAvailable):
+        return None
+
+    printGettingAllAccountEntities(Ent.GROUP)
+    groups = callGAPIpages(cd.groups(), 'list', 'groups',
+                           pageMessage=getPageMessage(showFirstLastItems=True), messageAttribute='email',
+                           throwReasons=GAPI.GROUP_LIST_THROW_REASONS, retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
+                           customer=customer, orderBy='email', fields='nextPageToken,groups(id,email,name)')
+    threadData = threading.local()
+    entries = []
+    built = time.time()
+    if numThreads > 1 and len(groups) > 1:
+      with concurrent.futures.ThreadPoolExecutor(max_workers=min(numThreads, len(groups))) as executor:
+        for group, members in zip(groups, executor.map(inheritThreadState(_getMembers), groups)):
+          entries.append((group, members))
+    else:
+      for group in groups:
+        entries.append((group, _getMembers(group)))
+    conn = self._open()
+    try:
+      with conn:
+        conn.execute('DELETE FROM groups')
+        for group, members in entries:
+          if members is not None:
+            entry = {'fetched': time.time(), 'members': members}
+            self._writeGroup(conn, group['id'], group['email'], group.get('name', ''), entry)
+        conn.execute('INSERT OR REPLACE INTO builds VALUES (?, ?)', (customer, built))
+    finally:
+      conn.close()
+    with self.lock:
+      self.groups = {}
+      self.parents = None
+    return sum(1 for _, members in entries if members is not None)
+
+# Returns a list of (email, name) of the groups that have groupEmail as a direct member, ordered by email,
+# or None if the cache has not been fully loaded for the customer within group_membership_cache_hours
+  def GetParents(self, groupEmail, customer):
+    with self.lock:
+      if self.parents is None:
+        self.parents = self._loadParents(customer)
+      if self.parents is False:
+        return None
+      return self.parents.get(groupEmail.lower(), [])
+
+  def _loadParents(self, customer):
+    try:
+      conn = self._open()
+      try:
+        row = conn.execute('SELECT built FROM builds WHERE customer = ?', (customer,)).fetchone()
+        if not row or time.time()-row[0] > self._maxAge():
+          return False
+        rows = conn.execute('SELECT email, name, members FROM groups WHERE email IS NOT NULL').fetchall()
+      finally:
+        conn.close()
+    except (OSError, sqlite3.Error):
+      return False
+    parents = {}
+    for email, name, members in rows:
+      for member in json.loads(members):
+        if member.get('type') == Ent.TYPE_GROUP and member.get('email'):
+          parents.setdefault(member['email'].lower(), []).append((email, name or ''))
+    for parentList in parents.values():
+      parentList.sort()
+    return parents
+
+def getGroupMembershipCache():
+  if not GM.Globals[GM.CACHE_DIR] or GC.Values.get(GC.GROUP_MEMBERSHIP_CACHE_HOURS, 0) == 0:
+    return None
+  if GM.Globals[GM.GROUP_MEMBERSHIP_CACHE] is None:
+    GM.Globals[GM.GROUP_MEMBERSHIP_CACHE] = GroupMembershipCache(os.path.join(GM.Globals[GM.CACHE_DIR], GROUP_MEMBERSHIP_CACHE_FILE))
+  return GM.Globals[GM.GROUP_MEMBERSHIP_CACHE]
+
+# List the members of a group; when groups are being expanded recursively, the group membership cache is used if enabled
+# and listRoles is applied locally as the cache holds members with all roles
+def listGroupMembers(cd, groupKey, listRoles, listFields, includeDerivedMembership, recursive, pageMessage=None, groupId=None):
+  gmc = getGroupMembershipCache() if recursive and not includeDerivedMembership else None
+  if gmc is None:
+    return callGAPIpages(cd.members(), 'list', 'members',
+                         pageMessage=pageMessage,
+                         throwReasons=GAPI.MEMBERS_THROW_REASONS, retryReasons=GAPI.MEMBERS_RETRY_REASONS,
+                         includeDerivedMembership=includeDerivedMembership,
+                         groupKey=groupKey, roles=listRoles, fields=listFields, maxResults=GC.Values[GC.MEMBER_MAX_RESULTS])
+  members = gmc.GetMembers(cd, groupKey, groupId, pageMessage)
+  if listRoles:
+    roles = set(listRoles.split(','))
+    members = [member for member in members if member.get('role', Ent.ROLE_MEMBER) in roles]
+  return members
+
+# gam update groupmembershipcache [threads <Integer>]
+def doUpdateGroupMembershipCache():
+  cd = buildGAPIObject(API.DIRECTORY)
+  numThreads = GC.Values[GC.NUM_THREADS]
+  while Cmd.ArgumentsRemaining():
+    myarg = getArgument()
+    if myarg == 'threads':
+      numThreads = getInteger(minVal=1, maxVal=100)
+    else:
+      unknownArgumentExit()
+  gmc = getGroupMembershipCache()
+  if gmc is None:
+    systemErrorExit(USAGE_ERROR_RC, Msg.GROUP_MEMBERSHIP_CACHE_NOT_ENABLED)
+  try:
+    count = gmc.Build(cd, GC.Values[GC.CUSTOMER_ID], numThreads)
+  except (GAPI.resourceNotFound, GAPI.domainNotFound, GAPI.forbidden, GAPI.badRequest, GAPI.permissionDenied):
+    accessErrorExit(cd)
+  except (OSError, sqlite3.Error) as e:
+    systemErrorExit(FILE_ERROR_RC, fileErrorMessage('update', gmc.dbFile, e))
+  entityActionPerformedMessage([Ent.FILE, gmc.dbFile], f'{count} {Ent.Choose(Ent.GROUP, count)}')
+
 def getGroupMembersEntityList(cd, entityList, matchPatterns, fieldsList, kwargsDict):
   if entityList is None:
     updateFieldsForGroupMatchPatterns(matchPatterns, fieldsList)
@@ -37148,7 +39211,7 @@ def getGroupMembersEntityList(cd, entityList, matchPatterns, fieldsList, kwargsD
   return entityList
 
 def getGroupMembers(cd, groupEmail, memberRoles, membersList, membersSet, i, count,
-                    memberOptions, memberDisplayOptions, level, typesSet):
+                    memberOptions, memberDisplayOptions, level, typesSet, groupId=None, parentGroups=frozenset()):
   def _getMemberDeliverySettings(member):
     if 'delivery_settings' not in member:
       try:
@@ -37167,11 +39230,9 @@ def getGroupMembers(cd, groupEmail, memberRoles, membersList, membersSet, i, cou
   validRoles, listRoles, listFields = _getRoleVerification(memberRoles, 'nextPageToken,members(email,id,role,status,type,delivery_settings)')
   if not groupEmail.startswith('space/'):
     try:
-      groupMembers = callGAPIpages(cd.members(), 'list', 'members',
-                                   pageMessage=getPageMessageForWhom(),
-                                   throwReasons=GAPI.MEMBERS_THROW_REASONS, retryReasons=GAPI.MEMBERS_RETRY_REASONS,
-                                   includeDerivedMembership=memberOptions[MEMBEROPTION_INCLUDEDERIVEDMEMBERSHIP],
-                                   groupKey=groupEmail, roles=listRoles, fields=listFields, maxResults=GC.Values[GC.MEMBER_MAX_RESULTS])
+      groupMembers = listGroupMembers(cd, groupEmail, listRoles, listFields,
+                                      memberOptions[MEMBEROPTION_INCLUDEDERIVEDMEMBERSHIP], memberOptions[MEMBEROPTION_RECURSIVE],
+                                      pageMessage=getPageMessageForWhom(), groupId=groupId)
     except (GAPI.groupNotFound, GAPI.domainNotFound, GAPI.domainCannotUseApis, GAPI.invalid, GAPI.forbidden, GAPI.serviceNotAvailable):
       entityUnknownWarning(Ent.GROUP, groupEmail, i, count)
       return
@@ -37223,11 +39284,12 @@ def getGroupMembers(cd, groupEmail, memberRoles, membersList, membersSet, i, cou
             member['level'] = level
             member['subgroup'] = groupEmail
             membersList.append(member)
-          groupMemberList.append(member['email'])
+          groupMemberList.append(member)
     for member in groupMemberList:
-      getGroupMembers(cd, member, memberRoles, membersList, membersSet, i, count,
-                      memberOptions, memberDisplayOptions, level+1, typesSet)
+      getGroupMembers(cd, member['email'], memberRoles, membersList, membersSet, i, count,
+                      memberOptions, memberDisplayOptions, level+1, typesSet, groupId=member.get('id'))
   else:
+    groupPath = parentGroups.union([groupEmail.lower()])
     for member in groupMembers:
       if member['type'] != Ent.TYPE_GROUP:
         if ((member['type'] in typesSet) and
@@ -37248,8 +39310,11 @@ def getGroupMembers(cd, groupEmail, memberRoles, membersList, membersSet, i, cou
           member['level'] = level
           member['subgroup'] = groupEmail
           membersList.append(member)
-        getGroupMembers(cd, member['email'], memberRoles, membersList, membersSet, i, count,
-                        memberOptions, memberDisplayOptions, level+1, typesSet)
+# A group that contains itself or one of its parent groups is not expanded again
+        if member['email'].lower() not in groupPath:
+          getGroupMembers(cd, member['email'], memberRoles, membersList, membersSet, i, count,
+                          memberOptions, memberDisplayOptions, level+1, typesSet, groupId=member.get('id'),
+                          parentGroups=groupPath)
 
 def getGroupAllowExternalMembers(gs, groupEmail, verifyAllowExternal, kvList, i, count):
   try:
@@ -37745,6 +39810,14 @@ def doShowGroupMembers():
 
 def getGroupParents(cd, groupParents, groupEmail, groupName, kwargs):
   groupParents[groupEmail] = {'name': groupName, 'parents': []}
+  gmc = getGroupMembershipCache() if not kwargs.get('domain') else None
+  parentGroups = gmc.GetParents(groupEmail, kwargs.get('customer', GC.Values[GC.CUSTOMER_ID])) if gmc else None
+  if parentGroups is not None:
+    for parentEmail, parentName in parentGroups:
+      groupParents[groupEmail]['parents'].append(parentEmail)
+      if parentEmail not in groupParents:
+        getGroupParents(cd, groupParents, parentEmail, parentName, kwargs)
+    return
   _setUserGroupArgs(groupEmail, kwargs)
   try:
     entityList = callGAPIpages(cd.groups(), 'list', 'groups',
@@ -43937,7 +46010,22 @@ def md5MatchesFile(filename, expected_md5, j=0, jcount=0):
   except IOError as e:
     systemErrorExit(FILE_ERROR_RC, fileErrorMessage('read', filename, e))
 
-def _getCloudStorageObject(s, bucket, s_object, localFilename, expectedMd5=None, zipToStdout=False, j=0, jcount=0):
+class MD5HashingWriter():
+  """Write to a file while computing the MD5 hash of the data written; saves re-reading the file to verify it"""
+
+  def __init__(self, f):
+    self.f = f
+    self.hashMd5 = hashlib.md5()
+
+  def write(self, data):
+    self.hashMd5.update(data)
+    return self.f.write(data)
+
+  def hexdigest(self):
+    return self.hashMd5.hexdigest()
+
+def _getCloudStorageObject(s, bucket, s_object, localFilename, expectedMd5=None, expectedSize=None, zipToStdout=False,
+                           chunksize=googleapiclient.http.DEFAULT_CHUNK_SIZE, j=0, jcount=0):
   if not zipToStdout:
     localFilename = cleanFilepath(localFilename)
     entityValueList = [Ent.DRIVE_FILE, localFilename]
@@ -43945,19 +46033,20 @@ def _getCloudStorageObject(s, bucket, s_object, localFilename, expectedMd5=None,
       printEntityMessage(entityValueList, Msg.EXISTS)
       if not expectedMd5:
         return # nothing to verify, just assume we're good.
-      if md5MatchesFile(localFilename, expectedMd5):
+# A size mismatch, e.g. from an interrupted download, means that the file has to be downloaded again; don't bother hashing it
+      if (expectedSize is None or os.path.getsize(localFilename) == expectedSize) and md5MatchesFile(localFilename, expectedMd5):
         return
       printEntityMessage(entityValueList, Msg.DOWNLOADING_AGAIN_AND_OVER_WRITING)
     entityPerformAction(entityValueList)
     file_path = os.path.dirname(localFilename)
-    if not os.path.exists(file_path):
-      os.makedirs(file_path)
+    os.makedirs(file_path, exist_ok=True)
     f = openFile(localFilename, 'wb')
   else:
     f = openFile('-', 'wb')
   try:
     request = s.objects().get_media(bucket=bucket, object=s_object)
-    downloader = googleapiclient.http.MediaIoBaseDownload(f, request)
+    writer = MD5HashingWriter(f) if expectedMd5 and not zipToStdout else f
+    downloader = googleapiclient.http.MediaIoBaseDownload(writer, request, chunksize=chunksize)
     done = False
     while not done:
       status, done = downloader.next_chunk()
@@ -43966,11 +46055,136 @@ def _getCloudStorageObject(s, bucket, s_object, localFilename, expectedMd5=None,
     if not zipToStdout:
       entityModifierNewValueActionPerformed([Ent.CLOUD_STORAGE_FILE, s_object], Act.MODIFIER_TO, localFilename, j, jcount)
       closeFile(f, True)
-    if expectedMd5 and not md5MatchesFile(localFilename, expectedMd5):
-      systemErrorExit(FILE_ERROR_RC, fileErrorMessage('write', localFilename, Msg.CORRUPT_FILE))
+    if writer is not f:
+      actualMd5 = writer.hexdigest()
+      if actualMd5 != expectedMd5:
+        entityActionFailedWarning([Ent.FILE, localFilename, Ent.MD5HASH, expectedMd5], Msg.DOES_NOT_MATCH.format(actualMd5), j, jcount)
+        systemErrorExit(FILE_ERROR_RC, fileErrorMessage('write', localFilename, Msg.CORRUPT_FILE))
+  except googleapiclient.http.HttpError as e:
+    mg = HTTP_ERROR_PATTERN.match(str(e))
+    entityModifierNewValueActionFailedWarning([Ent.CLOUD_STORAGE_FILE, s_object], Act.MODIFIER_TO, localFilename, mg.group(1) if mg else str(e), j, jcount)
+
+# Download Cloud Storage objects with a pool of numThreads threads, each with its own copy of the service
+# getObject(service, download) is called for each item in downloads
+# The first exception raised by a download, including SystemExit from systemErrorExit, stops further downloads and is re-raised
+def _getCloudStorageObjects(s, downloads, numThreads, getObject):
+  def _download(download):
+    if stopEvent.is_set():
+      return
+    if not hasattr(threadData, 'service'):
+      threadData.service = _cloneGAPIServiceForThread(s)
+    try:
+      getObject(threadData.service, download)
+    except BaseException:
+      stopEvent.set()
+      raise
+
+  if numThreads <= 1 or len(downloads) <= 1:
+    for download in downloads:
+      getObject(s, download)
+    return
+  threadData = threading.local()
+  stopEvent = threading.Event()
+  with concurrent.futures.ThreadPoolExecutor(max_workers=min(numThreads, len(downloads))) as executor:
+    futures = [executor.submit(inheritThreadState(_download), download) for download in downloads]
+    try:
+      for future in futures:
+        future.result()
+    except BaseException:
+      stopEvent.set()
+      raise
+
+class CloudStorageDownloadManifest():
+  """Record of completed and partially downloaded Cloud Storage objects, saved as JSON so that downloads can be resumed"""
+
+  def __init__(self, filename):
+    self.filename = filename
+    self.lock = threading.Lock()
+    self.objects = {}
+    if os.path.isfile(filename):
+      try:
+        with open(filename, 'r', encoding=UTF8) as f:
+          self.objects = json.load(f).get('objects', {})
+      except (IOError, ValueError, AttributeError):
+        self.objects = {}
+
+  def Get(self, bucket, s_object):
+    with self.lock:
+      return self.objects.get(f'{bucket}/{s_object}', {}).copy()
+
+  def Update(self, bucket, s_object, **kwargs):
+    with self.lock:
+      self.objects.setdefault(f'{bucket}/{s_object}', {}).update(kwargs)
+      tmpFilename = f'{self.filename}.tmp'
+      try:
+        with open(tmpFilename, 'w', encoding=UTF8) as f:
+          json.dump({'objects': self.objects}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmpFilename, self.filename)
+      except IOError as e:
+        systemErrorExit(FILE_ERROR_RC, fileErrorMessage('write', self.filename, e))
+
+# Download a Cloud Storage object with HTTP Range requests of chunksize bytes, recording the offset in the manifest after each chunk
+# A partially downloaded object is resumed from the recorded offset; the MD5 hash is computed as the data is written
+# Returns True if the object has been downloaded and verified
+def _getCloudStorageObjectRanges(s, bucket, s_object, localFilename, expectedMd5, expectedSize, chunksize, manifest, j=0, jcount=0):
+  localFilename = cleanFilepath(localFilename)
+  entityValueList = [Ent.DRIVE_FILE, localFilename]
+  entry = manifest.Get(bucket, s_object)
+  if entry.get('md5Hash') != expectedMd5 or entry.get('filename') != localFilename:
+    entry = {}
+  if entry.get('complete') and (entry.get('extracted') or
+                                (os.path.isfile(localFilename) and os.path.getsize(localFilename) == entry.get('size'))):
+    printEntityMessage(entityValueList, Msg.EXISTS)
+    return True
+  offset = entry.get('offset', 0)
+  if offset and (not os.path.isfile(localFilename) or os.path.getsize(localFilename) < offset):
+    offset = 0
+  if expectedSize is None:
+    expectedSize = int(callGAPI(s.objects(), 'get',
+                                bucket=bucket, object=s_object, fields='size')['size'])
+  os.makedirs(os.path.dirname(localFilename), exist_ok=True)
+  hashMd5 = hashlib.md5() if expectedMd5 else None
+  if offset:
+    f = openFile(localFilename, 'r+b')
+    f.truncate(offset)
+    if hashMd5:
+      for chunk in iter(lambda: f.read(ONE_MEGA_BYTES), b''):
+        hashMd5.update(chunk)
+    f.seek(offset)
+    printEntityMessage(entityValueList, Msg.RESUMING_DOWNLOAD_AT_BYTE.format(offset))
+  else:
+    f = openFile(localFilename, 'wb')
+    entityPerformAction(entityValueList)
+  try:
+    while offset < expectedSize:
+      request = s.objects().get_media(bucket=bucket, object=s_object)
+      request.headers['range'] = f'bytes={offset}-{min(offset+chunksize, expectedSize)-1}'
+      data = request.execute(num_retries=GC.Values[GC.API_CALLS_TRIES_LIMIT]-1)
+      if not data:
+        break
+      f.write(data)
+      f.flush()
+      if hashMd5:
+        hashMd5.update(data)
+      offset += len(data)
+      manifest.Update(bucket, s_object, filename=localFilename, md5Hash=expectedMd5, size=expectedSize, offset=offset, complete=False)
+      if offset < expectedSize:
+        entityActionPerformedMessage([Ent.CLOUD_STORAGE_FILE, s_object], f'{offset/expectedSize:>7.2%}', j, jcount)
   except googleapiclient.http.HttpError as e:
+    closeFile(f)
     mg = HTTP_ERROR_PATTERN.match(str(e))
     entityModifierNewValueActionFailedWarning([Ent.CLOUD_STORAGE_FILE, s_object], Act.MODIFIER_TO, localFilename, mg.group(1) if mg else str(e), j, jcount)
+    return False
+  closeFile(f, True)
+  entityModifierNewValueActionPerformed([Ent.CLOUD_STORAGE_FILE, s_object], Act.MODIFIER_TO, localFilename, j, jcount)
+  if hashMd5:
+    actualMd5 = hashMd5.hexdigest()
+    if actualMd5 != expectedMd5:
+      manifest.Update(bucket, s_object, filename=localFilename, md5Hash=expectedMd5, size=expectedSize, offset=0, complete=False)
+      entityActionFailedWarning([Ent.FILE, localFilename, Ent.MD5HASH, expectedMd5], Msg.DOES_NOT_MATCH.format(actualMd5), j, jcount)
+      systemErrorExit(FILE_ERROR_RC, fileErrorMessage('write', localFilename, Msg.CORRUPT_FILE))
+  manifest.Update(bucket, s_object, filename=localFilename, md5Hash=expectedMd5, size=expectedSize, offset=offset, complete=True)
+  return True
 
 TAKEOUT_EXPORT_PATTERN = re.compile(r'(takeout-export-[a-f,0-9,-]*)')
 
@@ -44013,16 +46227,26 @@ def doCopyCloudStorageBucket():
   _copyStorageObjects(objects, target_bucket, target_prefix)
 
 # gam download storagebucket <TakeoutBucketName>
-#	[targetfolder <FilePath>]
+#	[targetfolder <FilePath>] [threads <Integer>] [chunksize <Integer>]
 def doDownloadCloudStorageBucket():
+  def _getObject(service, kwargs):
+    printGettingEntityItem(Ent.FILE, kwargs['s_object'], kwargs['j'], kwargs['jcount'])
+    _getCloudStorageObject(service, chunksize=chunksize, **kwargs)
+
   bucket_url = getString(Cmd.OB_STRING)
   targetFolder = GC.Values[GC.DRIVE_DIR]
+  numThreads = GC.Values[GC.NUM_THREADS]
+  chunksize = googleapiclient.http.DEFAULT_CHUNK_SIZE
   while Cmd.ArgumentsRemaining():
     myarg = getArgument()
     if myarg == 'targetfolder':
       targetFolder = setFilePath(getString(Cmd.OB_FILE_PATH), GC.DRIVE_DIR)
       if not os.path.isdir(targetFolder):
         os.makedirs(targetFolder)
+    elif myarg == 'threads':
+      numThreads = getInteger(minVal=1, maxVal=100)
+    elif myarg == 'chunksize':
+      chunksize = getInteger(minVal=1, maxVal=1024)*ONE_MEGA_BYTES
     else:
       unknownArgumentExit()
   bucket_match = re.search(TAKEOUT_EXPORT_PATTERN, bucket_url)
@@ -44036,19 +46260,22 @@ def doDownloadCloudStorageBucket():
     objects = callGAPIpages(s.objects(), 'list', 'items',
                             pageMessage=pageMessage,
                             throwReasons=[GAPI.NOT_FOUND, GAPI.FORBIDDEN],
-                            bucket=bucket, projection='noAcl', fields='nextPageToken,items(name,md5Hash)')
+                            bucket=bucket, projection='noAcl', fields='nextPageToken,items(name,md5Hash,size)')
   except GAPI.notFound:
     entityDoesNotExistExit(Ent.CLOUD_STORAGE_BUCKET, bucket)
   except GAPI.forbidden as e:
     entityActionFailedExit([Ent.CLOUD_STORAGE_BUCKET, bucket], str(e))
   count = len(objects)
   i = 0
+  downloads = []
   for s_object in objects:
     i += 1
-    printGettingEntityItem(Ent.FILE, s_object['name'], i, count)
-    expectedMd5 = base64.b64decode(s_object['md5Hash']).hex()
-    _getCloudStorageObject(s, bucket, s_object['name'], os.path.join(targetFolder, s_object['name']),
-                           expectedMd5=expectedMd5)
+    downloads.append({'bucket': bucket, 's_object': s_object['name'],
+                      'localFilename': os.path.join(targetFolder, s_object['name']),
+                      'expectedMd5': base64.b64decode(s_object['md5Hash']).hex(),
+                      'expectedSize': int(s_object['size']) if 'size' in s_object else None,
+                      'j': i, 'jcount': count})
+  _getCloudStorageObjects(s, downloads, numThreads, _getObject)
 
 # gam download storagefile <StorageBucketObjectName>
 #	[targetfolder <FilePath>] [overwrite [<Boolean>]] [nogcspath [Boolean>]]
@@ -44843,10 +47070,12 @@ ZIP_EXTENSION_PATTERN = re.compile(r'^.*\.zip$', re.IGNORECASE)
 #	[targetfolder <FilePath>] [targetname <FileName>] [noverify] [noextract] [ziptostdout]
 #	[bucketmatchpattern <REMatchPattern>] [objectmatchpattern <REMatchPattern>]
 #	[downloadattempts <Integer>] [retryinterval <Integer>]
+#	[threads <Integer>] [chunksize <Integer>] [resume [<Boolean>]]
 # gam download vaultexport|export <MatterItem> <ExportItem>
 #	[targetfolder <FilePath>] [targetname <FileName>] [noverify] [noextract] [ziptostdout]
 #	[bucketmatchpattern <REMatchPattern>] [objectmatchpattern <REMatchPattern>]
 #	[downloadattempts <Integer>] [retryinterval <Integer>]
+#	[threads <Integer>] [chunksize <Integer>] [resume [<Boolean>]]
 def doDownloadVaultExport():
   def extract_nested_zip(zippedFile):
     """ Extract a zip file including any nested zip files
@@ -44869,6 +47098,13 @@ def doDownloadVaultExport():
     except OSError as e:
       stderrWarningMsg(e)
 
+  def _getExportFile(service, download):
+    j, bucket, s_object, filename, s_file = download
+    performAction(Ent.CLOUD_STORAGE_FILE, s_object, j, jcount)
+    _getCloudStorageObjectRanges(service, bucket, s_object, filename,
+                                 s_file['md5Hash'] if verifyFiles else None, int(s_file['size']) if 'size' in s_file else None,
+                                 chunksize, manifest, j, jcount)
+
   v = buildGAPIObject(API.VAULT)
   s = buildGAPIObject(API.STORAGEREAD)
   verifyFiles = extractFiles = True
@@ -44883,6 +47119,9 @@ def doDownloadVaultExport():
   bucketMatchPattern = objectMatchPattern = None
   downloadAttempts = 1
   retryInterval = 30
+  numThreads = 1
+  chunksize = googleapiclient.http.DEFAULT_CHUNK_SIZE
+  resume = False
   while Cmd.ArgumentsRemaining():
     myarg = getArgument()
     if myarg == 'matter':
@@ -44909,8 +47148,16 @@ def doDownloadVaultExport():
       downloadAttempts = getInteger(minVal=1)
     elif myarg == 'retryinterval':
       retryInterval = getInteger(minVal=10)
+    elif myarg == 'threads':
+      numThreads = getInteger(minVal=1, maxVal=100)
+    elif myarg == 'chunksize':
+      chunksize = getInteger(minVal=1, maxVal=1024)*ONE_MEGA_BYTES
+    elif myarg == 'resume':
+      resume = getBoolean()
     else:
       unknownArgumentExit()
+# Parallel and resumable downloads record their progress in a manifest file beside the target folder
+  useManifest = (numThreads > 1 or resume) and not zipToStdout
   attempts = 0
   while True:
     try:
@@ -44937,6 +47184,7 @@ def doDownloadVaultExport():
   Ind.Increment()
   j = 0
   extCounts = {}
+  downloads = []
   for s_file in export['cloudStorageSink']['files']:
     j += 1
     bucket = s_file['bucketName']
@@ -44963,6 +47211,9 @@ def doDownloadVaultExport():
       else:
         filename = targetName.replace('#objectname#', s_object).replace('#filename#', s_objectFilename).replace('#extension#', s_objectExtension)
       filename = os.path.join(targetFolder, cleanFilename(filename))
+    if useManifest:
+      downloads.append((j, bucket, s_object, filename, s_file))
+      continue
     Act.Set(Act.DOWNLOAD)
     if not zipToStdout:
       performAction(Ent.CLOUD_STORAGE_FILE, s_object, j, jcount)
@@ -44975,6 +47226,20 @@ def doDownloadVaultExport():
       extract_nested_zip(filename)
       Act.Set(Act.DOWNLOAD)
     Ind.Decrement()
+  if downloads:
+    manifest = CloudStorageDownloadManifest(f'{os.path.normpath(targetFolder)}.{cleanFilename(exportId)}.manifest.json')
+    Act.Set(Act.DOWNLOAD)
+    _getCloudStorageObjects(s, downloads, numThreads, _getExportFile)
+# Extract after all of the downloads have completed so that the extraction messages don't interleave with the download messages
+    if extractFiles:
+      for _, bucket, s_object, filename, _ in downloads:
+        if ZIP_EXTENSION_PATTERN.match(filename):
+          entry = manifest.Get(bucket, s_object)
+          if entry.get('complete') and not entry.get('extracted') and os.path.isfile(filename):
+            Act.Set(Act.EXTRACT)
+            extract_nested_zip(filename)
+            manifest.Update(bucket, s_object, extracted=True)
+      Act.Set(Act.DOWNLOAD)
   Ind.Decrement()
 
 def _cleanVaultHold(hold, cd):
@@ -46436,7 +48701,7 @@ class PasswordOptions():
     if not self.notifyPasswordSet:
       notify[up] = body[up] if self.clearPassword else Msg.CONTACT_ADMINISTRATOR_FOR_PASSWORD
     if self.hashPassword:
-      body[up] = sha512_crypt.hash(body[up], rounds=10000)
+      body[up] = passlib.hash.sha512_crypt.hash(body[up], rounds=10000)
       body['hashFunction'] = 'crypt'
     elif self.b64DecryptPassword:
       if body[up].lower()[:5] in ['{md5}', '{sha}']:
@@ -47153,6 +49418,7 @@ def doCreateUser():
       if isInvitableUser:
         entityActionNotPerformedWarning([Ent.USER, user], Msg.EMAIL_ADDRESS_IS_UNMANAGED_ACCOUNT)
         return
+    invalidateUIDEmailCache([user])
     try:
       result = callGAPI(cd.users(), 'insert',
                         throwReasons=[GAPI.DUPLICATE, GAPI.DOMAIN_NOT_FOUND,
@@ -47342,6 +49608,8 @@ def updateUsers(entityList):
             continue
         if PwdOpts.makeUniqueRandomPassword or PwdOpts.promptForUniquePassword:
           PwdOpts.AssignPassword(body, notify, notFoundBody, parameters['createIfNotFound'], userKey)
+        if 'primaryEmail' in body:
+          invalidateUIDEmailCache([userKey, body['primaryEmail']])
         retry = 0
         while True:
           try:
@@ -47377,6 +49645,7 @@ def updateUsers(entityList):
                 if parameters['setChangePasswordOnCreate']:
                   body['changePasswordAtNextLogin'] = True
                 Act.Set(Act.CREATE)
+                invalidateUIDEmailCache([body['primaryEmail']])
                 try:
                   result = callGAPI(cd.users(), 'insert',
                                     throwReasons=[GAPI.DUPLICATE, GAPI.DOMAIN_NOT_FOUND, GAPI.FORBIDDEN,
@@ -47439,6 +49708,7 @@ def deleteUsers(entityList):
     user = normalizeEmailAddressOrUID(user)
     if noActionIfAlias and not verifyUserPrimaryEmail(cd, user, False, i, count):
       continue
+    invalidateUIDEmailCache([user])
     try:
       callGAPI(cd.users(), 'delete',
                throwReasons=[GAPI.USER_NOT_FOUND, GAPI.DOMAIN_NOT_FOUND,
@@ -47521,6 +49791,7 @@ def undeleteUsers(entityList):
       user_uid = matching_users[0]['id']
     if userOrgUnitLists:
       orgUnitPaths = userOrgUnitLists[origUser]
+    invalidateUIDEmailCache([user, user_uid])
     try:
       callGAPI(cd.users(), 'undelete',
                throwReasons=[GAPI.DELETED_USER_NOT_FOUND, GAPI.INVALID_ORGUNIT,
@@ -60236,6 +62507,7 @@ class DriveListParameters():
     self.minimumFileSize = None
     self.onlySharedDrives = False
     self.queryTimes = {}
+    self.querySet = False
     self.showOwnedBy = True
     self.showSharedByMe = None
 
@@ -60271,14 +62543,19 @@ class DriveListParameters():
     elif noFileSelectFileIdEntity(fileIdEntity):
       if self.myargOptions['allowQuery'] and myarg == 'query':
         self.AppendToQuery(getString(Cmd.OB_QUERY))
+        self.querySet = True
       elif self.myargOptions['allowQuery'] and myarg.startswith('query:'):
         self.AppendToQuery(Cmd.Previous().strip()[6:])
+        self.querySet = True
       elif self.myargOptions['allowQuery'] and myarg == 'fullquery':
         self.SetQuery(getString(Cmd.OB_QUERY, minLen=0))
+        self.querySet = True
       elif self.myargOptions['allowQuery'] and myarg in QUERY_SHORTCUTS_MAP:
         self.UpdateAnyOwnerQuery()
         self.AppendToQuery(QUERY_SHORTCUTS_MAP[myarg])
+        self.querySet = True
       elif self.myargOptions['allowChoose'] and myarg == 'choose':
+        self.querySet = True
         myarg = checkGetArgument()
         if myarg in DRIVE_BY_NAME_CHOICE_MAP:
           self.SetQuery(DRIVE_BY_NAME_CHOICE_MAP[myarg].format(getEscapedDriveFileName()))
@@ -60475,6 +62752,172 @@ def _getGettingEntity(user, fileIdEntity):
     return user
   return f"{user} on {Ent.Singular(Ent.SHAREDDRIVE_ID)}: {driveId}"
 
+# Drive file inventories for print filelist/filecounts incremental are kept in cache_dir/driveinventory.db.
+# An inventory holds the files listed for a user/corpus and a Changes API page token; later runs
+# apply the changes since the token rather than listing all of the files again.
+DRIVE_INVENTORY_FILE = 'driveinventory.db'
+DRIVE_INVENTORY_REQUIRED_FIELDS = ['id', 'mimeType', 'ownedByMe', 'trashed']
+DRIVE_INVENTORY_CHANGES_KWARGS = ['driveId', 'includeItemsFromAllDrives', 'supportsAllDrives', 'includeLabels', 'includePermissionsForView']
+
+def _splitDriveFieldsList(fields):
+  fieldsList = []
+  depth = start = 0
+  for k, c in enumerate(fields):
+    if c == '(':
+      depth += 1
+    elif c == ')':
+      depth -= 1
+    elif c == ',' and depth == 0:
+      fieldsList.append(fields[start:k])
+      start = k+1
+  fieldsList.append(fields[start:])
+  return [field.strip() for field in fieldsList if field.strip()]
+
+class DriveInventory():
+  def __init__(self, DLP, pagesFields, kwargs):
+    self.DLP = DLP
+    self.kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    self.changesKwargs = {k: v for k, v in self.kwargs.items() if k in DRIVE_INVENTORY_CHANGES_KWARGS}
+    self.tokenKwargs = {k: v for k, v in self.kwargs.items() if k in {'driveId', 'supportsAllDrives'}}
+    self.query = {True: ME_IN_OWNERS, False: NOT_ME_IN_OWNERS}.get(DLP.showOwnedBy, '')
+    self.corpus = json.dumps([self.query, sorted(self.kwargs.items())])
+    if pagesFields == '*':
+      self.fields = '*'
+      self.extraFields = set()
+      self.listFields = 'nextPageToken,files'
+      self.changesFields = 'nextPageToken,newStartPageToken,changes(changeType,fileId,removed,file)'
+    else:
+      fieldsList = _splitDriveFieldsList(pagesFields[pagesFields.index('files(')+6:-1]) if pagesFields else []
+      topFields = {field.split('/')[0].split('(')[0] for field in fieldsList}
+      self.extraFields = set(DRIVE_INVENTORY_REQUIRED_FIELDS)-topFields
+      self.fields = ','.join(sorted(set(fieldsList).union(self.extraFields)))
+      self.listFields = f'nextPageToken,files({self.fields})'
+      self.changesFields = f'nextPageToken,newStartPageToken,changes(changeType,fileId,removed,file({self.fields}))'
+    self.dbFile = os.path.join(GM.Globals[GM.CACHE_DIR], DRIVE_INVENTORY_FILE)
+
+  def _open(self):
+    conn = sqlite3.connect(self.dbFile, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS inventories (user TEXT, corpus TEXT, fields TEXT, pageToken TEXT, updated TEXT, PRIMARY KEY (user, corpus))')
+    conn.execute('CREATE TABLE IF NOT EXISTS files (user TEXT, corpus TEXT, fileId TEXT, seq INTEGER, data TEXT, PRIMARY KEY (user, corpus, fileId))')
+    conn.execute('CREATE INDEX IF NOT EXISTS filesSeq ON files (user, corpus, seq)')
+    return conn
+
+# Files that no longer match the ownership of the inventory are dropped when changes are applied
+  def _checkChangedFile(self, f_file):
+    if self.DLP.showOwnedBy is not None and f_file.get('ownedByMe', False) != self.DLP.showOwnedBy:
+      return False
+    return self.kwargs.get('includeItemsFromAllDrives', False) or not f_file.get('driveId')
+
+# Filters that are applied by the files.list query when there is no inventory
+  def _checkFile(self, f_file):
+    return (self.DLP.CheckShowOwnedBy(f_file) and
+            self.DLP.CheckExcludeTrashed(f_file) and
+            self.DLP.CheckMimeType(f_file))
+
+  def _listFiles(self, conn, drive, user):
+    pageToken = callGAPI(drive.changes(), 'getStartPageToken',
+                         throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
+                         retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS,
+                         fields='startPageToken', **self.tokenKwargs)['startPageToken']
+    with conn:
+      conn.execute('DELETE FROM inventories WHERE user = ? AND corpus = ?', (user, self.corpus))
+      conn.execute('DELETE FROM files WHERE user = ? AND corpus = ?', (user, self.corpus))
+    seq = 0
+    for files in yieldGAPIpages(drive.files(), 'list', 'files',
+                                throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID,
+                                                                            GAPI.BAD_REQUEST, GAPI.FILE_NOT_FOUND,
+                                                                            GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
+                                retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS+[GAPI.UNKNOWN_ERROR],
+                                q=self.query,
+                                fields=self.listFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **self.kwargs):
+      with conn:
+        conn.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                         [(user, self.corpus, f_file['id'], seq+k, json.dumps(f_file)) for k, f_file in enumerate(files)])
+      seq += len(files)
+    with conn:
+      conn.execute('INSERT INTO inventories VALUES (?, ?, ?, ?, ?)',
+                   (user, self.corpus, self.fields, pageToken, ISOformatTimeStamp(todaysTime())))
+
+# Changes are collected before the store is updated so that the database is not locked during API calls;
+# a later change to a file replaces an earlier one
+  def _applyChanges(self, conn, drive, user, pageToken):
+    changedFiles = {}
+    while True:
+      result = callGAPI(drive.changes(), 'list',
+                        throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID, GAPI.BAD_REQUEST,
+                                                                    GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
+                        retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS+[GAPI.UNKNOWN_ERROR],
+                        pageToken=pageToken, includeRemoved=True, spaces='drive',
+                        fields=self.changesFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **self.changesKwargs)
+      for change in result.get('changes', []):
+        if change.get('changeType', 'file') != 'file':
+          continue
+        f_file = change.get('file')
+        if change.get('removed', False) or not f_file or not self._checkChangedFile(f_file):
+          changedFiles[change['fileId']] = None
+        else:
+          changedFiles[change['fileId']] = f_file
+      if 'newStartPageToken' in result:
+        pageToken = result['newStartPageToken']
+        break
+      pageToken = result['nextPageToken']
+    with conn:
+      seq = conn.execute('SELECT COALESCE(MAX(seq), -1) FROM files WHERE user = ? AND corpus = ?', (user, self.corpus)).fetchone()[0]
+      for fileId, f_file in changedFiles.items():
+        if f_file is None:
+          conn.execute('DELETE FROM files WHERE user = ? AND corpus = ? AND fileId = ?', (user, self.corpus, fileId))
+        elif conn.execute('UPDATE files SET data = ? WHERE user = ? AND corpus = ? AND fileId = ?',
+                          (json.dumps(f_file), user, self.corpus, fileId)).rowcount == 0:
+          seq += 1
+          conn.execute('INSERT INTO files VALUES (?, ?, ?, ?, ?)', (user, self.corpus, fileId, seq, json.dumps(f_file)))
+      conn.execute('UPDATE inventories SET pageToken = ?, updated = ? WHERE user = ? AND corpus = ?',
+                   (pageToken, ISOformatTimeStamp(todaysTime()), user, self.corpus))
+
+# Yield pages of files from the user's inventory, as yieldGAPIpages would from files.list;
+# the inventory is built on the first run, or if it was built with different fields, and updated from the Changes API afterwards
+  def YieldFilePages(self, drive, user, maxItems=0):
+    try:
+      conn = self._open()
+    except (OSError, sqlite3.Error) as e:
+      systemErrorExit(FILE_ERROR_RC, fileErrorMessage('open', self.dbFile, e))
+    try:
+      row = conn.execute('SELECT fields, pageToken FROM inventories WHERE user = ? AND corpus = ?', (user, self.corpus)).fetchone()
+      if row and row[0] == self.fields:
+        try:
+          self._applyChanges(conn, drive, user, row[1])
+        except (GAPI.invalid, GAPI.badRequest):
+          row = None
+      else:
+        row = None
+      if row is None:
+        self._listFiles(conn, drive, user)
+      cursor = conn.execute('SELECT data FROM files WHERE user = ? AND corpus = ? ORDER BY seq', (user, self.corpus))
+      totalItems = 0
+      while True:
+        rows = cursor.fetchmany(GC.Values[GC.DRIVE_MAX_RESULTS])
+        if not rows:
+          break
+        files = []
+        for data in rows:
+          f_file = json.loads(data[0])
+          if not self._checkFile(f_file):
+            continue
+          for field in self.extraFields:
+            f_file.pop(field, None)
+          files.append(f_file)
+        if maxItems and totalItems+len(files) > maxItems:
+          del files[maxItems-totalItems:]
+        totalItems += len(files)
+        yield files
+        if maxItems and totalItems >= maxItems:
+          break
+      printGotEntityItemsForWhom(totalItems)
+    except sqlite3.Error as e:
+      systemErrorExit(FILE_ERROR_RC, fileErrorMessage('update', self.dbFile, e))
+    finally:
+      conn.close()
+
 OWNED_BY_ME_FIELDS_TITLES = ['ownedByMe']
 FILELIST_FIELDS_TITLES = ['id', 'name', 'mimeType', 'parents']
 DRIVE_INDEXED_TITLES = ['parents', 'path', 'permissions']
@@ -60497,7 +62940,7 @@ SIZE_FIELD_CHOICE_MAP = {
 
 # gam <UserTypeEntity> print filelist [todrive <ToDriveAttribute>*]
 #	[((query <QueryDriveFile>) | (fullquery <QueryDriveFile>) | <DriveFileQueryShortcut>) (querytime<String> <Time>)*]
-#	[continueoninvalidquery [<Boolean>]]
+#	[continueoninvalidquery [<Boolean>]] [incremental [<Boolean>]]
 #	[choose <DriveFileNameEntity>|<DriveFileEntityShortcut>]
 #	[corpora <CorporaAttribute>]
 #	[select <DriveFileEntity> [selectsubquery <QueryDriveFile>]
@@ -60754,7 +63197,7 @@ def printFileList(users):
   FJQC = FormatJSONQuoteChar(csvPF)
   addPathsToJSON = continueOnInvalidQuery = countsRowFilter = buildTree = countsOnly = filepath = fullpath = folderPathOnly = parentPathOnly = \
     getPermissionDetailsForMyDrive = getPermissionsForSharedDrives = mimeTypeInQuery = noRecursion = oneItemPerRow = stripCRsFromName = \
-    showParentsIdsAsList = showDepth = showParent = showSize = showSizeUnits = showMimeTypeSize = showSource = False
+    showParentsIdsAsList = showDepth = showParent = showSize = showSizeUnits = showMimeTypeSize = showSource = incremental = False
   sizeField = 'quotaBytesUsed'
   pathDelimiter = '/'
   pmselect = True
@@ -60862,6 +63305,8 @@ def printFileList(users):
       includeCSVDataInJSON = getBoolean()
     elif myarg == 'continueoninvalidquery':
       continueOnInvalidQuery = getBoolean()
+    elif myarg == 'incremental':
+      incremental = getBoolean()
     else:
       FJQC.GetFormatJSONQuoteChar(myarg)
   if countsOnly:
@@ -60895,6 +63340,17 @@ def printFileList(users):
                  and not fileIdEntity['shareddrivefilequery']
                  and _simpleFileIdEntityList(fileIdEntity['list']))
   incrementalPrint = buildTree and (not filepath) and noSelect and not DLP.locationSet and not showParent
+  if incremental:
+    if not buildTree:
+      usageErrorExit(Msg.ARE_MUTUALLY_EXCLUSIVE.format('incremental', 'select'))
+    if DLP.querySet:
+      usageErrorExit(Msg.ARE_MUTUALLY_EXCLUSIVE.format('incremental', 'query'))
+# New and changed files are added to the inventory in the order they are received from the Changes API
+    if DFF.orderBy:
+      usageErrorExit(Msg.ARE_MUTUALLY_EXCLUSIVE.format('incremental', 'orderby'))
+# Without a cache directory, e.g. no_cache, there is no inventory; list all of the files
+    if not GM.Globals[GM.CACHE_DIR]:
+      incremental = False
   if buildTree and ((not filepath) or mimeTypeInQuery) and noSelect and not DLP.locationSet and not showParent:
     DLP.AddMimeTypeToQuery()
   if buildTree:
@@ -60947,6 +63403,8 @@ def printFileList(users):
     csvPF.SetFixPaths(True)
   includeLabels = _finalizeIncludeLabels(DFF.includeLabels)
   includePermissionsForView = _finalizeIncludePermissionsForView(DFF.includePermissionsForView)
+  if incremental:
+    driveInventory = DriveInventory(DLP, pagesFields, dict(btkwargs, includeLabels=includeLabels, includePermissionsForView=includePermissionsForView))
   csvPF.RemoveTitles(['capabilities'])
   if DLP.queryTimes and selectSubQuery:
     for queryTimeName, queryTimeValue in DLP.queryTimes.items():
@@ -61013,15 +63471,18 @@ def printFileList(users):
         if not status:
           continue
       try:
-        feed = yieldGAPIpages(drive.files(), 'list', 'files',
-                              pageMessage=getPageMessageForWhom(), maxItems=DLP.maxItems,
-                              throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID,
-                                                                          GAPI.BAD_REQUEST, GAPI.FILE_NOT_FOUND,
-                                                                          GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
-                              retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS+[GAPI.UNKNOWN_ERROR],
-                              q=DLP.fileIdEntity['query'], orderBy=DFF.orderBy,
-                              includeLabels=includeLabels, includePermissionsForView=includePermissionsForView,
-                              fields=pagesFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **btkwargs)
+        if incremental:
+          feed = driveInventory.YieldFilePages(drive, user, maxItems=DLP.maxItems)
+        else:
+          feed = yieldGAPIpages(drive.files(), 'list', 'files',
+                                pageMessage=getPageMessageForWhom(), maxItems=DLP.maxItems,
+                                throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID,
+                                                                            GAPI.BAD_REQUEST, GAPI.FILE_NOT_FOUND,
+                                                                            GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
+                                retryReasons=GAPI.SERVICE_NOT_AVAILABLE_RETRY_REASONS+[GAPI.UNKNOWN_ERROR],
+                                q=DLP.fileIdEntity['query'], orderBy=DFF.orderBy,
+                                includeLabels=includeLabels, includePermissionsForView=includePermissionsForView,
+                                fields=pagesFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **btkwargs)
         for files in feed:
           if showLabels is not None:
             for f_file in files:
@@ -61141,7 +63602,7 @@ def printFileList(users):
           writeMimeTypeCountsRow(user, 'Various', 'Various', mimeTypeInfo)
   titlePrefix = f'{Cmd.Argument(GM.Globals[GM.ENTITY_CL_START])} {Cmd.Argument(GM.Globals[GM.ENTITY_CL_START]+1)} ' if GM.Globals[GM.CSVFILE][GM.REDIRECT_QUEUE] is None else ''
   if not countsOnly:
-    if not csvPF.rows:
+    if not csvPF.rowCount:
       setSysExitRC(NO_ENTITIES_FOUND_RC)
     sortTitles = ['Owner']
     if addCSVData:
@@ -61641,7 +64102,7 @@ def _updateLastModificationRow(row, lastModification):
 
 # gam <UserTypeEntity> print filecounts [todrive <ToDriveAttribute>*]
 #	[((query <QueryDriveFile>) | (fullquery <QueryDriveFile>) | <DriveFileQueryShortcut>) (querytime<String> <Time>)*]
-#	[continueoninvalidquery [<Boolean>]]
+#	[continueoninvalidquery [<Boolean>]] [incremental [<Boolean>]]
 #	[corpora <CorporaAttribute>]
 #	[select <SharedDriveEntity>]
 #	[anyowner|(showownedby any|me|others)]
@@ -61656,7 +64117,7 @@ def _updateLastModificationRow(row, lastModification):
 #	[summary none|only|plus] [summaryuser <String>]
 # gam <UserTypeEntity> show filecounts
 #	[((query <QueryDriveFile>) | (fullquery <QueryDriveFile>) | <DriveFileQueryShortcut>) (querytime<String> <Time>)*]
-#	[continueoninvalidquery [<Boolean>]]
+#	[continueoninvalidquery [<Boolean>]] [incremental [<Boolean>]]
 #	[corpora <CorporaAttribute>]
 #	[select <SharedDriveEntity>]
 #	[anyowner|(showownedby any|me|others)]
@@ -61746,7 +64207,7 @@ def printShowFileCounts(users):
   DLP = DriveListParameters({'allowChoose': False, 'allowCorpora': True, 'allowQuery': True, 'mimeTypeInQuery': True})
   pathDelimiter = '/'
   sharedDriveId = sharedDriveName = ''
-  continueOnInvalidQuery = showSize = showSizeUnits = showLastModification = showMimeTypeSize = False
+  continueOnInvalidQuery = incremental = showSize = showSizeUnits = showLastModification = showMimeTypeSize = False
   sizeField = 'quotaBytesUsed'
   summary = FILECOUNT_SUMMARY_NONE
   summaryUser = FILECOUNT_SUMMARY_USER
@@ -61784,8 +64245,16 @@ def printShowFileCounts(users):
       getAddCSVData(addCSVData)
     elif myarg == 'continueoninvalidquery':
       continueOnInvalidQuery = getBoolean()
+    elif myarg == 'incremental':
+      incremental = getBoolean()
     else:
       unknownArgumentExit()
+  if incremental:
+    if DLP.querySet:
+      usageErrorExit(Msg.ARE_MUTUALLY_EXCLUSIVE.format('incremental', 'query'))
+# Without a cache directory, e.g. no_cache, there is no inventory; list all of the files
+    if not GM.Globals[GM.CACHE_DIR]:
+      incremental = False
   if not fileIdEntity:
     fileIdEntity = DLP.GetFileIdEntity()
   if not fileIdEntity.get('shareddrive'):
@@ -61816,6 +64285,8 @@ def printShowFileCounts(users):
     csvPF.SetTitles(sortTitles)
     csvPF.SetSortAllTitles()
   pagesFields = getItemFieldsFromFieldsList('files', fieldsList)
+  if incremental:
+    driveInventory = DriveInventory(DLP, pagesFields, btkwargs)
   i, count, users = getEntityArgument(users)
   for user in users:
     i += 1
@@ -61829,14 +64300,17 @@ def printShowFileCounts(users):
     gettingEntity = _getGettingEntity(user, fileIdEntity)
     printGettingAllEntityItemsForWhom(Ent.DRIVE_FILE_OR_FOLDER, gettingEntity, i, count, query=DLP.fileIdEntity['query'])
     try:
-      feed = yieldGAPIpages(drive.files(), 'list', 'files',
-                            pageMessage=getPageMessageForWhom(),
-                            throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID,
-                                                                        GAPI.BAD_REQUEST, GAPI.FILE_NOT_FOUND,
-                                                                        GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
-                            retryReasons=[GAPI.UNKNOWN_ERROR],
-                            q=DLP.fileIdEntity['query'],
-                            fields=pagesFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **btkwargs)
+      if incremental:
+        feed = driveInventory.YieldFilePages(drive, user)
+      else:
+        feed = yieldGAPIpages(drive.files(), 'list', 'files',
+                              pageMessage=getPageMessageForWhom(),
+                              throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID,
+                                                                          GAPI.BAD_REQUEST, GAPI.FILE_NOT_FOUND,
+                                                                          GAPI.NOT_FOUND, GAPI.TEAMDRIVE_MEMBERSHIP_REQUIRED],
+                              retryReasons=[GAPI.UNKNOWN_ERROR],
+                              q=DLP.fileIdEntity['query'],
+                              fields=pagesFields, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], **btkwargs)
       for files in feed:
         for f_file in files:
           driveId = f_file.get('driveId')
@@ -61997,6 +64471,104 @@ def printShowDrivelastModifications(users):
   if csvPF:
     csvPF.writeCSVfile('Drive File Last Modification')
 
+DRIVE_FOLDER_WALK_THROW_REASONS = GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID]
+
+# Walk Drive folders, each files.list call listing the children of up to parentsPerQuery folders with an or'd parents query.
+# With numThreads = 1, folders are walked depth first, in the order of a recursive walk;
+# with numThreads > 1, folders are walked breadth-first, keeping up to numThreads files.list calls in flight.
+# processChildren(folderId, children) is called in the calling thread with the children of each folder
+# in the order returned by the API and returns the IDs of the child folders to walk.
+# onError(folderIds, q, e) is called in the calling thread when a listing fails with one of DRIVE_FOLDER_WALK_THROW_REASONS.
+# With parentsPerQuery > 1, fields must include parents so that the children can be assigned to their folders.
+def walkDriveFolders(drive, folderIds, processChildren, onError, numThreads=1, parentsPerQuery=1, subQuery='', **kwargs):
+  def _makeQuery(parentIds):
+    if len(parentIds) == 1:
+      q = WITH_PARENTS.format(parentIds[0])
+    else:
+      q = '('+' or '.join(WITH_PARENTS.format(parentId) for parentId in parentIds)+')'
+    if subQuery:
+      q += ' and ('+subQuery+')'
+    return q
+
+  def _listChildren(q):
+    if numThreads > 1:
+      if not hasattr(threadData, 'service'):
+        threadData.service = _cloneGAPIServiceForThread(drive)
+      service = threadData.service
+    else:
+      service = drive
+    return callGAPIpages(service.files(), 'list', 'files',
+                         throwReasons=DRIVE_FOLDER_WALK_THROW_REASONS,
+                         retryReasons=[GAPI.UNKNOWN_ERROR],
+                         q=q, pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], supportsAllDrives=True, includeItemsFromAllDrives=True,
+                         **kwargs)
+
+  def _processChildren(parentIds, children):
+    if len(parentIds) == 1:
+      childrenByParent = {parentIds[0]: children}
+    else:
+      childrenByParent = {parentId: [] for parentId in parentIds}
+      for child in children:
+        assigned = False
+        for parentId in child.get('parents', []):
+          if parentId in childrenByParent:
+            childrenByParent[parentId].append(child if not assigned else child.copy())
+            assigned = True
+    childIdsByParent = []
+    for parentId in parentIds:
+      childIds = []
+      for childId in processChildren(parentId, childrenByParent[parentId]):
+# A folder is only walked once, even if it is reached through more than one parent
+        if childId not in walked:
+          walked.add(childId)
+          childIds.append(childId)
+      childIdsByParent.append(childIds)
+    if depthFirst:
+# pending is a stack; the first child of the first parent is walked next
+      for childIds in reversed(childIdsByParent):
+        pending.extend(reversed(childIds))
+    else:
+      for childIds in childIdsByParent:
+        pending.extend(childIds)
+
+  def _nextQuery():
+    if depthFirst:
+      parentIds = [pending.pop() for _ in range(min(parentsPerQuery, len(pending)))]
+    else:
+      parentIds = [pending.popleft() for _ in range(min(parentsPerQuery, len(pending)))]
+    return (parentIds, _makeQuery(parentIds))
+
+  throwExceptions = tuple(GAPI.REASON_EXCEPTION_MAP[reason] for reason in DRIVE_FOLDER_WALK_THROW_REASONS)
+  walked = set(folderIds)
+  depthFirst = numThreads <= 1
+  pending = collections.deque(reversed(folderIds) if depthFirst else folderIds)
+  if depthFirst:
+    while pending:
+      parentIds, q = _nextQuery()
+      try:
+        children = _listChildren(q)
+      except throwExceptions as e:
+        onError(parentIds, q, e)
+        continue
+      _processChildren(parentIds, children)
+    return
+  threadData = threading.local()
+  inFlight = {}
+  with concurrent.futures.ThreadPoolExecutor(max_workers=numThreads) as executor:
+    while pending or inFlight:
+      while pending and len(inFlight) < numThreads:
+        parentIds, q = _nextQuery()
+        inFlight[executor.submit(inheritThreadState(_listChildren), q)] = (parentIds, q)
+      done, _ = concurrent.futures.wait(inFlight, return_when=concurrent.futures.FIRST_COMPLETED)
+      for future in done:
+        parentIds, q = inFlight.pop(future)
+        try:
+          children = future.result()
+        except throwExceptions as e:
+          onError(parentIds, q, e)
+          continue
+        _processChildren(parentIds, children)
+
 DISKUSAGE_SHOW_CHOICES = {'all', 'summary', 'summaryandtrash'}
 
 # gam <UserTypeEntity> print diskusage <DriveFileEntity> [todrive <ToDriveAttribute>*]
@@ -62005,33 +64577,26 @@ DISKUSAGE_SHOW_CHOICES = {'all', 'summary', 'summaryandtrash'}
 #	[pathdelimiter <Character>] [excludetrashed] [stripcrsfromname]
 #	(addcsvdata <FieldName> <String>)*
 #	[noprogress] [show all|summary|summaryandtrash]
+#	[threads <Integer>] [parentsperquery <Integer>]
 def printDiskUsage(users):
-  def _getChildDriveFolderInfo(drive, fileEntry, user, i, count, depth):
-    fileEntry['depth'] = depth
-    q = WITH_PARENTS.format(fileEntry['id'])
-    try:
-      children = callGAPIpages(drive.files(), 'list', 'files',
-                               throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID],
-                               retryReasons=[GAPI.UNKNOWN_ERROR],
-                               q=q, orderBy=orderBy, fields=pagesFields,
-                               pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], supportsAllDrives=True, includeItemsFromAllDrives=True)
-    except (GAPI.invalidQuery, GAPI.invalid):
-      entityActionFailedWarning([Ent.USER, user, Ent.DRIVE_FOLDER, None], invalidQuery(q), i, count)
-      return
-    except (GAPI.serviceNotAvailable, GAPI.authError, GAPI.domainPolicy) as e:
-      userDriveServiceNotEnabledWarning(user, str(e), i, count)
-      return
-    Ind.Increment()
+  def _processChildDriveFolders(folderId, children):
+    fileEntry = folderEntries[folderId]
     if showProgress:
+# Progress messages are indented by folder depth
+      for _ in range(fileEntry['depth']+1):
+        Ind.Increment()
       entityActionPerformed([Ent.USER, user, Ent.DRIVE_FOLDER, fileEntry['path']])
+      for _ in range(fileEntry['depth']+1):
+        Ind.Decrement()
+    childFolderIds = []
     for childEntryInfo in children:
+      childEntryInfo.pop('parents', None)
       trashed = childEntryInfo['trashed']
       if trashed and excludeTrashed:
         continue
       mimeType = childEntryInfo.pop('mimeType')
       if mimeType == MIMETYPE_GA_FOLDER:
         fileEntry['directFolderCount'] += 1
-        fileEntry['totalFolderCount'] += 1
         if trashed:
           trashFolder['totalFolderCount'] += 1
           if childEntryInfo['explicitlyTrashed']:
@@ -62046,26 +64611,45 @@ def printDiskUsage(users):
           childEntryInfo['name'] = _stripControlCharsFromName(childEntryInfo['name'])
         childEntryInfo['path'] = fileEntry['path']+pathDelimiter+childEntryInfo['name']
         childEntryInfo.pop(sizeField, None)
-        foldersList.append(childEntryInfo)
-        _getChildDriveFolderInfo(drive, childEntryInfo, user, i, count, depth+1)
-        fileEntry['totalFileCount'] += childEntryInfo['totalFileCount']
-        fileEntry['totalFileSize'] += childEntryInfo['totalFileSize']
-        fileEntry['totalFolderCount'] += childEntryInfo['totalFolderCount']
+        childEntryInfo['depth'] = fileEntry['depth']+1
+        childFolders[folderId].append(childEntryInfo)
+        if childEntryInfo['id'] not in folderEntries:
+          folderEntries[childEntryInfo['id']] = childEntryInfo
+          childFolders[childEntryInfo['id']] = []
+          childFolderIds.append(childEntryInfo['id'])
       elif mimeType != MIMETYPE_GA_SHORTCUT:
         if includeOwner and showOwnedBy is not None and childEntryInfo['ownedByMe'] != showOwnedBy:
           continue
         fsize = int(childEntryInfo.get(sizeField, '0'))
         fileEntry['directFileCount'] += 1
         fileEntry['directFileSize'] += fsize
-        fileEntry['totalFileCount'] += 1
-        fileEntry['totalFileSize'] += fsize
         if trashed:
           trashFolder['totalFileCount'] += 1
           trashFolder['totalFileSize'] += fsize
           if childEntryInfo['explicitlyTrashed']:
             trashFolder['directFileCount'] += 1
             trashFolder['directFileSize'] += fsize
-    Ind.Decrement()
+    return childFolderIds
+
+  def _walkDriveFoldersError(_, q, e):
+    if isinstance(e, (GAPI.invalidQuery, GAPI.invalid)):
+      entityActionFailedWarning([Ent.USER, user, Ent.DRIVE_FOLDER, None], invalidQuery(q), i, count)
+    else:
+      userDriveServiceNotEnabledWarning(user, str(e), i, count)
+
+# Folders are listed in depth first order with totals that include all subfolders
+  def _addDriveFolderTotals(fileEntry):
+    foldersList.append(fileEntry)
+    fileEntry['totalFileCount'] = fileEntry['directFileCount']
+    fileEntry['totalFileSize'] = fileEntry['directFileSize']
+    fileEntry['totalFolderCount'] = fileEntry['directFolderCount']
+    for childEntry in childFolders.get(fileEntry['id'], []):
+      if childEntry is not folderEntries.get(childEntry['id']):
+        continue
+      _addDriveFolderTotals(childEntry)
+      fileEntry['totalFileCount'] += childEntry['totalFileCount']
+      fileEntry['totalFileSize'] += childEntry['totalFileSize']
+      fileEntry['totalFolderCount'] += childEntry['totalFolderCount']
 
   csvPF = CSVPrintFile(['User', 'Owner', 'id', 'name', 'ownedByMe', 'trashed', 'explicitlyTrashed',
                         'directFileCount', 'directFileSize', 'directFolderCount',
@@ -62081,6 +64665,8 @@ def printDiskUsage(users):
   fileIdEntity = getDriveFileEntity()
   addCSVData = {}
   showResults = 'all'
+  numThreads = 1
+  parentsPerQuery = 1
   while Cmd.ArgumentsRemaining():
     myarg = getArgument()
     if myarg == 'todrive':
@@ -62103,14 +64689,20 @@ def printDiskUsage(users):
       showResults = getChoice(DISKUSAGE_SHOW_CHOICES)
     elif myarg == 'noprogress':
       showProgress = False
+    elif myarg == 'threads':
+      numThreads = getInteger(minVal=1, maxVal=100)
+    elif myarg == 'parentsperquery':
+      parentsPerQuery = getInteger(minVal=1, maxVal=50)
     else:
       unknownArgumentExit()
   if addCSVData:
     csvPF.AddTitles(sorted(addCSVData.keys()))
   fieldsList = ['id', 'name', 'mimeType', sizeField, 'trashed', 'explicitlyTrashed', 'owners(emailAddress)', 'ownedByMe']
-  pagesFields = getItemFieldsFromFieldsList('files', fieldsList)
   topFieldsList = fieldsList[:]
   topFieldsList.extend(['driveId', 'parents'])
+  if parentsPerQuery > 1:
+    fieldsList.append('parents')
+  pagesFields = getItemFieldsFromFieldsList('files', fieldsList)
   topFields = getFieldsFromFieldsList(topFieldsList)
   i, count, users = getEntityArgument(users)
   i = 0
@@ -62168,8 +64760,15 @@ def printDiskUsage(users):
         topFolder.pop('parents', None)
         topFolder.update(zeroFolderInfo)
         topFolder.pop(sizeField, None)
-        foldersList.append(topFolder)
-        _getChildDriveFolderInfo(drive, topFolder, user, i, count, -1)
+        topFolder['depth'] = -1
+        folderEntries = {topFolder['id']: topFolder}
+        childFolders = {topFolder['id']: []}
+        Ind.Increment()
+        walkDriveFolders(drive, [topFolder['id']], _processChildDriveFolders, _walkDriveFoldersError,
+                         numThreads=numThreads, parentsPerQuery=parentsPerQuery,
+                         orderBy=orderBy, fields=pagesFields)
+        Ind.Decrement()
+        _addDriveFolderTotals(topFolder)
       except GAPI.fileNotFound:
         entityActionFailedWarning([Ent.USER, user, Ent.DRIVE_FOLDER, fileId], Msg.NOT_FOUND, j, jcount)
         continue
@@ -62358,6 +64957,7 @@ FILETREE_FIELDS_PRINT_ORDER = ['id', 'parents', 'owners', 'mimeType', 'size', 'e
 #	[fields <FileTreeFieldNameList>]
 #	(orderby <DriveFileOrderByFieldName> [ascending|descending])* [delimiter <Character>]
 #	[noindent] [stripcrsfromname]
+#	[threads <Integer>] [parentsperquery <Integer>]
 # gam <UserTypeEntity> show filetree
 #	[select <DriveFileEntity> [selectsubquery <QueryDriveFile>] [depth <Number>]]
 #	[anyowner|(showownedby any|me|others)]
@@ -62369,6 +64969,7 @@ FILETREE_FIELDS_PRINT_ORDER = ['id', 'parents', 'owners', 'mimeType', 'size', 'e
 #	[fields <FileTreeFieldNameList>]
 #	(orderby <DriveFileOrderByFieldName> [ascending|descending])* [delimiter <Character>]
 #	[stripcrsfromname]
+#	[threads <Integer>] [parentsperquery <Integer>]
 def printShowFileTree(users):
   def _showFileInfo(fileEntry, depth, j=0, jcount=0):
     if not DLP.CheckExcludeTrashed(fileEntry):
@@ -62431,25 +65032,25 @@ def printShowFileTree(users):
           _showDriveFolderContents(childEntry, depth+1)
           Ind.Decrement()
 
-  def _showChildDriveFolderContents(drive, fileEntry, user, i, count, depth):
-    if not DLP.CheckExcludeTrashed(fileEntry):
-      return
-    q = WITH_PARENTS.format(fileEntry['id'])
-    if selectSubQuery:
-      q += ' and ('+selectSubQuery+')'
-    try:
-      children = callGAPIpages(drive.files(), 'list', 'files',
-                               throwReasons=GAPI.DRIVE_USER_THROW_REASONS+[GAPI.INVALID_QUERY, GAPI.INVALID],
-                               retryReasons=[GAPI.UNKNOWN_ERROR],
-                               q=q, orderBy=OBY.orderBy, fields=pagesFields,
-                               pageSize=GC.Values[GC.DRIVE_MAX_RESULTS], supportsAllDrives=True, includeItemsFromAllDrives=True)
-    except (GAPI.invalidQuery, GAPI.invalid):
+  def _getChildDriveFolderContents(folderId, children):
+    childrenTree[folderId] = children
+    depth = folderDepths[folderId]
+    childFolderIds = []
+    if maxdepth == -1 or depth < maxdepth:
+      for childEntryInfo in children:
+        if childEntryInfo['mimeType'] == MIMETYPE_GA_FOLDER and DLP.CheckExcludeTrashed(childEntryInfo):
+          folderDepths[childEntryInfo['id']] = depth+1
+          childFolderIds.append(childEntryInfo['id'])
+    return childFolderIds
+
+  def _walkDriveFoldersError(_, q, e):
+    if isinstance(e, (GAPI.invalidQuery, GAPI.invalid)):
       entityActionFailedWarning([Ent.USER, user, Ent.DRIVE_FILE, None], invalidQuery(selectSubQuery), i, count)
-      return
-    except (GAPI.serviceNotAvailable, GAPI.authError, GAPI.domainPolicy) as e:
+    else:
       userDriveServiceNotEnabledWarning(user, str(e), i, count)
-      return
-    for childEntryInfo in children:
+
+  def _showChildDriveFolderContents(fileEntry, depth):
+    for childEntryInfo in childrenTree.get(fileEntry['id'], []):
       if not DLP.CheckExcludeTrashed(childEntryInfo):
         continue
       if (DLP.CheckShowOwnedBy(childEntryInfo) and
@@ -62460,7 +65061,7 @@ def printShowFileTree(users):
         _showFileInfo(childEntryInfo, depth)
       if childEntryInfo['mimeType'] == MIMETYPE_GA_FOLDER and (maxdepth == -1 or depth < maxdepth):
         Ind.Increment()
-        _showChildDriveFolderContents(drive, childEntryInfo, user, i, count, depth+1)
+        _showChildDriveFolderContents(childEntryInfo, depth+1)
         Ind.Decrement()
 
   csvPF = CSVPrintFile(['User', 'index', 'depth', 'name']) if Act.csvFormat() else None
@@ -62475,6 +65076,8 @@ def printShowFileTree(users):
   delimiter = GC.Values[GC.CSV_OUTPUT_FIELD_DELIMITER]
   OBY = OrderBy(DRIVEFILE_ORDERBY_CHOICE_MAP)
   DLP = DriveListParameters({'allowChoose': False, 'allowCorpora': False, 'allowQuery': False, 'mimeTypeInQuery': False})
+  numThreads = 1
+  parentsPerQuery = 1
   while Cmd.ArgumentsRemaining():
     myarg = getArgument()
     if csvPF and myarg == 'todrive':
@@ -62507,6 +65110,10 @@ def printShowFileTree(users):
       noindent = True
     elif myarg == 'stripcrsfromname':
       stripCRsFromName = True
+    elif myarg == 'threads':
+      numThreads = getInteger(minVal=1, maxVal=100)
+    elif myarg == 'parentsperquery':
+      parentsPerQuery = getInteger(minVal=1, maxVal=50)
     else:
       unknownArgumentExit()
   fieldsList = ['driveId', 'id', 'name', 'parents', 'mimeType', 'ownedByMe', 'owners(emailAddress)',
@@ -62603,8 +65210,13 @@ def printShowFileTree(users):
       Ind.Increment()
       if buildTree:
         _showDriveFolderContents(fileEntry, 0)
-      else:
-        _showChildDriveFolderContents(drive, fileEntryInfo, user, i, count, 0)
+      elif DLP.CheckExcludeTrashed(fileEntryInfo):
+        childrenTree = {}
+        folderDepths = {fileEntryInfo['id']: 0}
+        walkDriveFolders(drive, [fileEntryInfo['id']], _getChildDriveFolderContents, _walkDriveFoldersError,
+                         numThreads=numThreads, parentsPerQuery=parentsPerQuery, subQuery=selectSubQuery,
+                         orderBy=OBY.orderBy, fields=pagesFields)
+        _showChildDriveFolderContents(fileEntryInfo, 0)
       Ind.Decrement()
     Ind.Decrement()
   if csvPF:
@@ -68339,7 +70951,7 @@ def _checkFileIdEntityDomainAccess(fileIdEntity, useDomainAdminAccess):
 #	[sendemail|sendnotification] [emailmessage <String>]
 #	[showtitles] [nodetails|(csv [todrive <ToDriveAttribute>*] [formatjson [quotechar <Character>]])]
 def createDriveFileACL(users, useDomainAdminAccess=False):
-  def _showResult(permission, showAction):
+  def _showResult(permission, showAction, fileId, fileName, entityType, mimeType, j):
     if updateSheetProtectedRanges and mimeType == MIMETYPE_GA_SPREADSHEET:
       _updateSheetProtectedRangesACLchange(sheet, user, i, count, j, jcount, fileId, fileName, True, permission)
     if csvPF:
@@ -68362,6 +70974,55 @@ def createDriveFileACL(users, useDomainAdminAccess=False):
       if showDetails:
         _showDriveFilePermission(permission, printKeys, timeObjects)
 
+  def _processResult(permission, exception, fileId, fileName, entityType, mimeType, j):
+    nonlocal driveDisabled
+    try:
+      try:
+        if exception is not None:
+          raise exception
+        _showResult(permission, True, fileId, fileName, entityType, mimeType, j)
+      except GAPI.invalidSharingRequest  as e:
+        errMsg = str(e)
+        if ('successfully shared but emails could not be sent' not in errMsg) or ('emailAddress' not in body):
+          entityActionFailedWarning([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], errMsg, j, jcount)
+        else:
+          if not csvPF:
+            entityActionPerformedMessage([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], errMsg, j, jcount)
+          tempPermId = getPermissionIdForEmail(user, i, count, body['emailAddress'])
+          permission = callGAPI(drive.permissions(), 'get',
+                                throwReasons=GAPI.DRIVE_ACCESS_THROW_REASONS+[GAPI.BAD_REQUEST, GAPI.PERMISSION_NOT_FOUND, GAPI.INSUFFICIENT_ADMINISTRATOR_PRIVILEGES],
+                                useDomainAdminAccess=useDomainAdminAccess,
+                                fileId=fileId, permissionId=tempPermId, fields='*', supportsAllDrives=True)
+          _showResult(permission, False, fileId, fileName, entityType, mimeType, j)
+    except (GAPI.badRequest, GAPI.invalid, GAPI.fileNotFound, GAPI.forbidden, GAPI.internalError,
+            GAPI.permissionNotFound, GAPI.cannotSetExpiration, GAPI.cannotSetExpirationOnAnyoneOrDomain,
+            GAPI.expirationDateNotAllowedForSharedDriveMembers, GAPI.expirationDatesMustBeInTheFuture,
+            GAPI.insufficientFilePermissions, GAPI.unknownError, GAPI.ownershipChangeAcrossDomainNotPermitted,
+            GAPI.teamDriveDomainUsersOnlyRestriction, GAPI.teamDriveTeamMembersOnlyRestriction,
+            GAPI.targetUserRoleLimitedByLicenseRestriction, GAPI.insufficientAdministratorPrivileges, GAPI.sharingRateLimitExceeded,
+            GAPI.publishOutNotPermitted, GAPI.shareInNotPermitted, GAPI.shareOutNotPermitted, GAPI.shareOutNotPermittedToUser,
+            GAPI.cannotShareTeamDriveTopFolderWithAnyoneOrDomains, GAPI.cannotShareTeamDriveWithNonGoogleAccounts,
+            GAPI.ownerOnTeamDriveItemNotSupported,
+            GAPI.organizerOnNonTeamDriveNotSupported, GAPI.organizerOnNonTeamDriveItemNotSupported,
+            GAPI.fileOrganizerNotYetEnabledForThisTeamDrive,
+            GAPI.fileOrganizerOnFoldersInSharedDriveOnly,
+            GAPI.fileOrganizerOnNonTeamDriveNotSupported,
+            GAPI.cannotModifyInheritedPermission,
+            GAPI.teamDrivesFolderSharingNotSupported, GAPI.invalidLinkVisibility,
+            GAPI.fileNeverWritable, GAPI.abusiveContentRestriction) as e:
+      entityActionFailedWarning([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], str(e), j, jcount)
+    except GAPI.notFound as e:
+      entityActionFailedWarning([Ent.USER, user, Ent.SHAREDDRIVE, fileName], str(e), j, jcount)
+    except (GAPI.serviceNotAvailable, GAPI.authError, GAPI.domainPolicy) as e:
+      userDriveServiceNotEnabledWarning(user, str(e), i, count)
+      driveDisabled = True
+
+  def _createACLCallback(fileId, fileName, entityType, mimeType, j):
+    def _callback(permission, exception):
+      if not driveDisabled:
+        _processResult(permission, exception, fileId, fileName, entityType, mimeType, j)
+    return _callback
+
   moveToNewOwnersRoot = False
   sendNotificationEmail = showTitles = _transferOwnership = updateSheetProtectedRanges = False
   roleLocation = withLinkLocation = expirationLocation = None
@@ -68459,62 +71120,38 @@ def createDriveFileACL(users, useDomainAdminAccess=False):
     sheet = None
     Ind.Increment()
     j = 0
+    batcher = GAPIBatcher(drive)
+    driveDisabled = False
     for fileId in fileIdEntity['list']:
       j += 1
-      try:
-        fileName = fileId
-        entityType = Ent.DRIVE_FILE_OR_FOLDER_ID
-        if showTitles or updateSheetProtectedRanges:
+      fileName = fileId
+      entityType = Ent.DRIVE_FILE_OR_FOLDER_ID
+      mimeType = None
+      if showTitles or updateSheetProtectedRanges:
+        try:
           fileName, entityType, mimeType = _getDriveFileNameFromId(drive, fileId, combineTitleId=not csvPF)
-          if updateSheetProtectedRanges and mimeType == MIMETYPE_GA_SPREADSHEET:
+        except (GAPI.serviceNotAvailable, GAPI.authError, GAPI.domainPolicy,
+                GAPI.fileNotFound, GAPI.forbidden, GAPI.internalError, GAPI.insufficientFilePermissions,
+                GAPI.unknownError, GAPI.invalid) as e:
+          _processResult(None, e, fileId, fileName, entityType, mimeType, j)
+          if driveDisabled:
+            break
+          continue
+        if updateSheetProtectedRanges and mimeType == MIMETYPE_GA_SPREADSHEET:
+          if not sheet:
+            _, sheet = buildGAPIServiceObject(API.SHEETS, user, i, count)
             if not sheet:
-              _, sheet = buildGAPIServiceObject(API.SHEETS, user, i, count)
-              if not sheet:
-                break
-        try:
-          permission = callGAPI(drive.permissions(), 'create',
-                                bailOnInternalError=True,
-                                throwReasons=GAPI.DRIVE_ACCESS_THROW_REASONS+GAPI.DRIVE3_CREATE_ACL_THROW_REASONS+[GAPI.FILE_NEVER_WRITABLE],
-                                moveToNewOwnersRoot=moveToNewOwnersRoot,
-                                useDomainAdminAccess=useDomainAdminAccess,
-                                fileId=fileId, sendNotificationEmail=sendNotificationEmail, emailMessage=emailMessage,
-                                transferOwnership=_transferOwnership, body=body, fields='*', supportsAllDrives=True)
-          _showResult(permission, True)
-        except GAPI.invalidSharingRequest  as e:
-          errMsg = str(e)
-          if ('successfully shared but emails could not be sent' not in errMsg) or ('emailAddress' not in body):
-            entityActionFailedWarning([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], errMsg, j, jcount)
-          else:
-            if not csvPF:
-              entityActionPerformedMessage([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], errMsg, j, jcount)
-            tempPermId = getPermissionIdForEmail(user, i, count, body['emailAddress'])
-            permission = callGAPI(drive.permissions(), 'get',
-                                  throwReasons=GAPI.DRIVE_ACCESS_THROW_REASONS+[GAPI.BAD_REQUEST, GAPI.PERMISSION_NOT_FOUND, GAPI.INSUFFICIENT_ADMINISTRATOR_PRIVILEGES],
-                                  useDomainAdminAccess=useDomainAdminAccess,
-                                  fileId=fileId, permissionId=tempPermId, fields='*', supportsAllDrives=True)
-            _showResult(permission, False)
-      except (GAPI.badRequest, GAPI.invalid, GAPI.fileNotFound, GAPI.forbidden, GAPI.internalError,
-              GAPI.permissionNotFound, GAPI.cannotSetExpiration, GAPI.cannotSetExpirationOnAnyoneOrDomain,
-              GAPI.expirationDateNotAllowedForSharedDriveMembers, GAPI.expirationDatesMustBeInTheFuture,
-              GAPI.insufficientFilePermissions, GAPI.unknownError, GAPI.ownershipChangeAcrossDomainNotPermitted,
-              GAPI.teamDriveDomainUsersOnlyRestriction, GAPI.teamDriveTeamMembersOnlyRestriction,
-              GAPI.targetUserRoleLimitedByLicenseRestriction, GAPI.insufficientAdministratorPrivileges, GAPI.sharingRateLimitExceeded,
-              GAPI.publishOutNotPermitted, GAPI.shareInNotPermitted, GAPI.shareOutNotPermitted, GAPI.shareOutNotPermittedToUser,
-              GAPI.cannotShareTeamDriveTopFolderWithAnyoneOrDomains, GAPI.cannotShareTeamDriveWithNonGoogleAccounts,
-              GAPI.ownerOnTeamDriveItemNotSupported,
-              GAPI.organizerOnNonTeamDriveNotSupported, GAPI.organizerOnNonTeamDriveItemNotSupported,
-              GAPI.fileOrganizerNotYetEnabledForThisTeamDrive,
-              GAPI.fileOrganizerOnFoldersInSharedDriveOnly,
-              GAPI.fileOrganizerOnNonTeamDriveNotSupported,
-              GAPI.cannotModifyInheritedPermission,
-              GAPI.teamDrivesFolderSharingNotSupported, GAPI.invalidLinkVisibility,
-              GAPI.fileNeverWritable, GAPI.abusiveContentRestriction) as e:
-        entityActionFailedWarning([Ent.USER, user, entityType, fileName, Ent.PERMISSION_ID, permissionId], str(e), j, jcount)
-      except GAPI.notFound as e:
-        entityActionFailedWarning([Ent.USER, user, Ent.SHAREDDRIVE, fileName], str(e), j, jcount)
-      except (GAPI.serviceNotAvailable, GAPI.authError, GAPI.domainPolicy) as e:
-        userDriveServiceNotEnabledWarning(user, str(e), i, count)
+              break
+      batcher.Add(drive.permissions(), 'create', _createACLCallback(fileId, fileName, entityType, mimeType, j),
+                  bailOnInternalError=True,
+                  throwReasons=GAPI.DRIVE_ACCESS_THROW_REASONS+GAPI.DRIVE3_CREATE_ACL_THROW_REASONS+[GAPI.FILE_NEVER_WRITABLE],
+                  moveToNewOwnersRoot=moveToNewOwnersRoot,
+                  useDomainAdminAccess=useDomainAdminAccess,
+                  fileId=fileId, sendNotificationEmail=sendNotificationEmail, emailMessage=emailMessage,
+                  transferOwnership=_transferOwnership, body=body, fields='*', supportsAllDrives=True)
+      if driveDisabled:
         break
+    batcher.Execute()
     Ind.Decrement()
   if csvPF:
     csvPF.writeCSVfile('Drive File ACLs')
@@ -81244,6 +83881,16 @@ def doPrintShowCAALevels():
 CMD_ACTION = 0
 CMD_FUNCTION = 1
 
+# A command table function may be given by name, 'function' or 'module.function';
+# it is resolved, and its module imported, only when the command is run
+def getCommandFunction(function):
+  if isinstance(function, str):
+    moduleName, _, functionName = function.rpartition('.')
+    if moduleName:
+      return getattr(importlib.import_module(moduleName), functionName)
+    return globals()[functionName]
+  return function
+
 # Batch commands
 BATCH_CSV_COMMANDS = {
   Cmd.BATCH_CMD: 		(Act.PERFORM, doBatch),
@@ -81257,6 +83904,7 @@ MAIN_COMMANDS = {
   'checkconn':			(Act.CHECK, doCheckConnection),
   'checkconnection':		(Act.CHECK, doCheckConnection),
   'comment':			(Act.COMMENT, doComment),
+  'daemon':			(Act.PERFORM, doDaemon),
   'help': 			(Act.PERFORM, doUsage),
   'list': 			(Act.LIST, doListType),
   'report': 			(Act.REPORT, doReport),
@@ -81816,6 +84464,7 @@ MAIN_COMMANDS_WITH_OBJECTS = {
       Cmd.ARG_DRIVEFILEACL:	doUpdateDriveFileACLs,
       Cmd.ARG_FEATURE:		doUpdateFeature,
       Cmd.ARG_GROUP:		doUpdateGroups,
+      Cmd.ARG_GROUPMEMBERSHIPCACHE:	doUpdateGroupMembershipCache,
       Cmd.ARG_INBOUNDSSOASSIGNMENT:	doUpdateInboundSSOAssignment,
       Cmd.ARG_INBOUNDSSOPROFILE:	doUpdateInboundSSOProfile,
       Cmd.ARG_MOBILE:		doUpdateMobileDevices,
@@ -81835,6 +84484,7 @@ MAIN_COMMANDS_WITH_OBJECTS = {
       Cmd.ARG_SVCACCT:		doCheckUpdateSvcAcct,
       Cmd.ARG_USER:		doUpdateUser,
       Cmd.ARG_USERS:		doUpdateUsers,
+      Cmd.ARG_USERDIRECTORYINDEX:	doUpdateUserDirectoryIndex,
       Cmd.ARG_VAULTHOLD:	doUpdateVaultHold,
       Cmd.ARG_VAULTMATTER:	doUpdateVaultMatter,
       Cmd.ARG_VERIFY:		doUpdateSiteVerification,
@@ -82026,7 +84676,7 @@ def processAuditCommands():
   CL_subCommand = getChoice(list(AUDIT_SUBCOMMANDS_WITH_OBJECTS))
   CL_objectName = getChoice(AUDIT_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand])
   Act.Set(AUDIT_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CL_objectName][CMD_ACTION])
-  AUDIT_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CL_objectName][CMD_FUNCTION]()
+  getCommandFunction(AUDIT_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CL_objectName][CMD_FUNCTION])()
 
 # Oauth command sub-commands
 OAUTH2_SUBCOMMANDS = {
@@ -82050,7 +84700,7 @@ def processOauthCommands():
   Act.Set(OAUTH2_SUBCOMMANDS[CL_subCommand][CMD_ACTION])
   if GC.Values[GC.ENABLE_DASA]:
     systemErrorExit(USAGE_ERROR_RC, Msg.COMMAND_NOT_COMPATIBLE_WITH_ENABLE_DASA.format('oauth', CL_subCommand))
-  OAUTH2_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION]()
+  getCommandFunction(OAUTH2_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION])()
 
 # Calendar command sub-commands
 CALENDAR_SUBCOMMANDS = {
@@ -82167,21 +84817,21 @@ def processCalendarsCommands():
   CL_subCommand = getChoice(CALENDAR_SUBCOMMANDS, defaultChoice=None)
   if CL_subCommand:
     Act.Set(CALENDAR_SUBCOMMANDS[CL_subCommand][CMD_ACTION])
-    CALENDAR_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION](calendarList)
+    getCommandFunction(CALENDAR_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION])(calendarList)
     return
   CL_subCommand = getChoice(CALENDAR_OLDACL_SUBCOMMANDS, choiceAliases=CALENDAR_OLDACL_SUBCOMMAND_ALIASES, defaultChoice=None)
   if CL_subCommand:
     Act.Set(CALENDAR_OLDACL_SUBCOMMANDS[CL_subCommand][CMD_ACTION])
     CL_objectName = getChoice([Cmd.ARG_CALENDARACL, Cmd.ARG_EVENT], choiceAliases=CALENDARS_SUBCOMMANDS_OBJECT_ALIASES, defaultChoice=None)
     if not CL_objectName:
-      CALENDAR_OLDACL_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION](calendarList)
+      getCommandFunction(CALENDAR_OLDACL_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION])(calendarList)
     else:
-      CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName](calendarList)
+      getCommandFunction(CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName])(calendarList)
     return
   CL_subCommand = getChoice(CALENDARS_SUBCOMMANDS_WITH_OBJECTS)
   Act.Set(CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_ACTION])
   CL_objectName = getChoice(CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION], choiceAliases=CALENDARS_SUBCOMMANDS_OBJECT_ALIASES)
-  CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName](calendarList)
+  getCommandFunction(CALENDARS_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName])(calendarList)
 
 # Course command sub-commands
 COURSE_SUBCOMMANDS = {
@@ -82202,7 +84852,7 @@ COURSE_SUBCOMMAND_ALIASES = {
 def executeCourseCommands(courseIdList, getEntityListArg):
   CL_subCommand = getChoice(COURSE_SUBCOMMANDS, choiceAliases=COURSE_SUBCOMMAND_ALIASES)
   Act.Set(COURSE_SUBCOMMANDS[CL_subCommand][CMD_ACTION])
-  COURSE_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION](courseIdList, getEntityListArg)
+  getCommandFunction(COURSE_SUBCOMMANDS[CL_subCommand][CMD_FUNCTION])(courseIdList, getEntityListArg)
 
 def processCourseCommands():
   executeCourseCommands(getStringReturnInList(Cmd.OB_COURSE_ID), False)
@@ -82264,7 +84914,7 @@ def executeResourceCommands(resourceEntity):
   CL_subCommand = getChoice(RESOURCE_SUBCOMMANDS_WITH_OBJECTS, choiceAliases=RESOURCE_SUBCOMMAND_ALIASES)
   Act.Set(RESOURCE_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_ACTION])
   CL_objectName = getChoice(RESOURCE_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION], choiceAliases=RESOURCE_SUBCOMMANDS_OBJECT_ALIASES)
-  RESOURCE_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName](resourceEntity)
+  getCommandFunction(RESOURCE_SUBCOMMANDS_WITH_OBJECTS[CL_subCommand][CMD_FUNCTION][CL_objectName])(resourceEntity)
 
 def processResourceCommands():
   executeResourceCommands(getStringReturnInList(Cmd.OB_RESOURCE_ID))
@@ -83165,6 +85815,8 @@ def closeSTDFilesIfNotMultiprocessing(closeSTD):
 # Process GAM command
 def ProcessGAMCommand(args, processGamCfg=True, inLoop=False, closeSTD=True):
   setSysExitRC(0)
+# In-memory user/group ID mappings, especially not found entries, are not carried from one command to the next
+  GM.Globals[GM.UID_EMAIL_CACHE] = None
   Cmd.InitializeArguments(args)
   Ind.Reset()
   try:
@@ -83187,25 +85839,25 @@ def ProcessGAMCommand(args, processGamCfg=True, inLoop=False, closeSTD=True):
       Act.Set(BATCH_CSV_COMMANDS[CL_command][CMD_ACTION])
       if GM.Globals[GM.CMDLOG_LOGGER]:
         writeGAMCommandLog(GM.Globals, logCmd, '*')
-      BATCH_CSV_COMMANDS[CL_command][CMD_FUNCTION]()
+      getCommandFunction(BATCH_CSV_COMMANDS[CL_command][CMD_FUNCTION])()
       sys.exit(GM.Globals[GM.SYSEXITRC])
     CL_command = getChoice(MAIN_COMMANDS, defaultChoice=None)
     if CL_command:
       adjustRedirectedSTDFilesIfNotMultiprocessing()
       Act.Set(MAIN_COMMANDS[CL_command][CMD_ACTION])
-      MAIN_COMMANDS[CL_command][CMD_FUNCTION]()
+      getCommandFunction(MAIN_COMMANDS[CL_command][CMD_FUNCTION])()
       sys.exit(GM.Globals[GM.SYSEXITRC])
     CL_command = getChoice(MAIN_COMMANDS_WITH_OBJECTS, defaultChoice=None)
     if CL_command:
       adjustRedirectedSTDFilesIfNotMultiprocessing()
       Act.Set(MAIN_COMMANDS_WITH_OBJECTS[CL_command][CMD_ACTION])
       CL_objectName = getChoice(MAIN_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION], choiceAliases=MAIN_COMMANDS_OBJ_ALIASES)
-      MAIN_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName]()
+      getCommandFunction(MAIN_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName])()
       sys.exit(GM.Globals[GM.SYSEXITRC])
     CL_command = getChoice(COMMANDS_MAP, choiceAliases=COMMANDS_ALIASES, defaultChoice=None)
     if CL_command:
       adjustRedirectedSTDFilesIfNotMultiprocessing()
-      COMMANDS_MAP[CL_command]()
+      getCommandFunction(COMMANDS_MAP[CL_command])()
       sys.exit(GM.Globals[GM.SYSEXITRC])
     GM.Globals[GM.ENTITY_CL_START] = Cmd.Location()
     entityType, entityList = getEntityToModify(crosAllowed=True, delayGet=True)
@@ -83221,12 +85873,12 @@ def ProcessGAMCommand(args, processGamCfg=True, inLoop=False, closeSTD=True):
       adjustRedirectedSTDFilesIfNotMultiprocessing()
       if CL_command in USER_COMMANDS:
         Act.Set(USER_COMMANDS[CL_command][CMD_ACTION])
-        USER_COMMANDS[CL_command][CMD_FUNCTION](entityList)
+        getCommandFunction(USER_COMMANDS[CL_command][CMD_FUNCTION])(entityList)
       else:
         Act.Set(USER_COMMANDS_WITH_OBJECTS[CL_command][CMD_ACTION])
         CL_objectName = getChoice(USER_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION], choiceAliases=USER_COMMANDS_OBJ_ALIASES,
                                   defaultChoice=[Cmd.ARG_USER, NO_DEFAULT][CL_command != 'print'])
-        USER_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName](entityList)
+        getCommandFunction(USER_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName])(entityList)
     else:
       CL_command = getChoice(list(CROS_COMMANDS)+list(CROS_COMMANDS_WITH_OBJECTS))
       if (CL_command != 'list') and (GC.Values[GC.AUTO_BATCH_MIN] > 0):
@@ -83239,12 +85891,12 @@ def ProcessGAMCommand(args, processGamCfg=True, inLoop=False, closeSTD=True):
       adjustRedirectedSTDFilesIfNotMultiprocessing()
       if CL_command in CROS_COMMANDS:
         Act.Set(CROS_COMMANDS[CL_command][CMD_ACTION])
-        CROS_COMMANDS[CL_command][CMD_FUNCTION](entityList)
+        getCommandFunction(CROS_COMMANDS[CL_command][CMD_FUNCTION])(entityList)
       else:
         Act.Set(CROS_COMMANDS_WITH_OBJECTS[CL_command][CMD_ACTION])
         CL_objectName = getChoice(CROS_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION], choiceAliases=CROS_COMMANDS_OBJ_ALIASES,
                                   defaultChoice=NO_DEFAULT)
-        CROS_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName](entityList)
+        getCommandFunction(CROS_COMMANDS_WITH_OBJECTS[CL_command][CMD_FUNCTION][CL_objectName])(entityList)
     sys.exit(GM.Globals[GM.SYSEXITRC])
   except KeyboardInterrupt:
     batchWriteStderr('\nControl-C\n')
@@ -23,6 +23,19 @@ import sys
 
 import gam
 
+def setMultiprocessingStartMethod(force=False):
+  if platform.system() == 'Linux' and not getattr(sys, 'frozen', False):
+    # set explictly since it's not default in Python < 3.14, forkserver should
+    # be safer than fork and less likely to see bulk command hangs.
+    # The server preloads the gam package so that the gam batch/csv worker and
+    # output processes are forked from it rather than importing gam, googleapiclient, etc.
+    multiprocessing.set_start_method('forkserver', force=force)
+    multiprocessing.set_forkserver_preload(['gam'])
+  else:
+    # Python 3.14.4 and PyInstaller 6.19.0 don't play nice with forkserver
+    # on Linux. For the time being use spawn for frozen executables and other platforms.
+    multiprocessing.set_start_method('spawn', force=force)
+
 def main():
   gam.initializeLogging()
   rc = gam.ProcessGAMCommand(sys.argv)
@@ -36,13 +49,5 @@ def main():
 if __name__ == '__main__':
   if getattr(sys, 'frozen', False): # we're frozen:
     multiprocessing.freeze_support()
-  #if platform.system() == 'Linux':
-    # set explictly since it's not default in Python < 3.14, forkserver should
-    # be safer than fork and less likely to see bulk command hangs.
-    #multiprocessing.set_start_method('forkserver')
-  #else:
-  
-  # Python 3.14.4 and PyInstaller 6.19.0 don't play nice with forkserver
-  # on Linux. For the time being use spawn everywhere.
-  multiprocessing.set_start_method('spawn')
+  setMultiprocessingStartMethod()
   main()
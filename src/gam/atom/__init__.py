@@ -31,6 +31,7 @@
       turned into ExtensionElements as well.
 """
 from functools import wraps
+import io
 
 # __author__ = 'api.jscudder (Jeffrey Scudder)'
 
@@ -112,6 +113,67 @@ CreateClassFromXMLString = v1_deprecated(
     CreateClassFromXMLString)
 
 
+def IterateEntriesFromXMLString(target_class, xml_string, string_encoding=None):
+    """Creates an instance of a feed class whose entries are parsed incrementally.
+
+    CreateClassFromXMLString holds the whole element tree and the whole object
+    tree; here the XML is read with iterparse and each entry element is
+    discarded as soon as it has been converted, so only one entry is in memory
+    at a time.
+
+    Args:
+      target_class: class The feed class which will be instantiated. Its
+          _children must map the entry element to a list member named entry,
+          e.g. ('entry', [ContactEntry]).
+      xml_string: str A string which contains a valid XML feed.
+      string_encoding: str See CreateClassFromXMLString.
+
+    Returns:
+      A tuple (feed, entries): feed is an instance of the target class and
+      entries is a generator of instances of the entry class. The members of
+      feed other than entry are filled in as entries are read and are complete
+      once the generator is exhausted; feed.entry remains empty. No entries are
+      generated if the root XML tag and namespace do not match those of the
+      target class.
+    """
+    encoding = string_encoding or XML_STRING_ENCODING
+    if encoding and isinstance(xml_string, str):
+        xml_string = xml_string.encode(encoding)
+    entry_tag = entry_class = None
+    for tag, (member_name, member_class) in target_class._children.items():
+        if member_name == 'entry':
+            entry_tag = tag
+            entry_class = member_class[0]
+    feed = target_class()
+    return (feed, _IterateEntriesFromXMLString(feed, entry_tag, entry_class, xml_string))
+
+
+def _IterateEntriesFromXMLString(feed, entry_tag, entry_class, xml_string):
+    root = None
+    depth = 0
+    for event, element in ElementTree.iterparse(io.BytesIO(xml_string), events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if depth == 1:
+                root = element
+                if root.tag != '{%s}%s' % (feed._namespace, feed._tag):
+                    return
+                for attribute, value in root.attrib.items():
+                    feed._ConvertElementAttributeToMember(attribute, value)
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if element.tag == entry_tag:
+            yield _CreateClassFromElementTree(entry_class, element)
+        else:
+            feed._ConvertElementTreeToMember(element)
+        # Discard the converted element and its predecessors
+        element.clear()
+        while element.getprevious() is not None:
+            del root[0]
+
+
 def _CreateClassFromElementTree(target_class, tree, namespace=None, tag=None):
     """Instantiates the class and populates members according to the tree.
 
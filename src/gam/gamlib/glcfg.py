@@ -44,6 +44,8 @@ FN_OAUTH2SERVICE_JSON = 'oauth2service.json'
 # The following XXX constants are the names of the items in gam.cfg
 # When retrieving lists of Google Drive activities from API, how many should be retrieved in each chunk
 ACTIVITY_MAX_RESULTS = 'activity_max_results'
+# Adjust number of active processes/threads in gam batch/csv/tbatch based on throttling errors
+ADAPTIVE_CONCURRENCY = 'adaptive_concurrency'
 # Admin email address, required when enable_dasa is true, overrides oauth2.txt value otherwise
 ADMIN_EMAIL = 'admin_email'
 # Check if API calls rate exceeds limit
@@ -52,6 +54,9 @@ API_CALLS_RATE_CHECK = 'api_calls_rate_check'
 API_CALLS_RATE_LIMIT = 'api_calls_rate_limit'
 # API calls tries limit
 API_CALLS_TRIES_LIMIT = 'api_calls_tries_limit'
+# Number of pages of API results to fetch in the background while the current page is processed
+# Default: 0, do not prefetch pages
+API_PAGES_PREFETCH_DEPTH = 'api_pages_prefetch_depth'
 # Automatically generate gam batch command if number of users specified in gam users xxx command exceeds this number
 # Default: 0, do not automatically generate gam batch commands
 AUTO_BATCH_MIN = 'auto_batch_min'
@@ -141,6 +146,11 @@ CSV_OUTPUT_ROW_DROP_FILTER_MODE = 'csv_output_row_drop_filter_mode'
 CSV_OUTPUT_ROW_LIMIT = 'csv_output_row_limit'
 # Output sort headers
 CSV_OUTPUT_SORT_HEADERS = 'csv_output_sort_headers'
+# Save CSV rows in a temporary file when the number of rows in memory reaches this value
+# Default: 0, keep all rows in memory
+CSV_OUTPUT_SPILL_ROWS = 'csv_output_spill_rows'
+# Write CSV rows as they are generated rather than saving them until the command completes
+CSV_OUTPUT_STREAMING = 'csv_output_streaming'
 # Column header subfield name delimiter in CSV output file
 CSV_OUTPUT_SUBFIELD_DELIMITER = 'csv_output_subfield_delimiter'
 # Add timestamp column to CSV output file
@@ -159,6 +169,10 @@ DEVELOPER_PREVIEW_APIS = 'developer_preview_apis'
 DEVELOPER_PREVIEW_API_KEY = 'developer_preview_api_key'
 # When retrieving lists of ChromeOS devices from API, how many should be retrieved in each chunk
 DEVICE_MAX_RESULTS = 'device_max_results'
+# Hours before a cached downloaded discovery document is refreshed; 0 disables the discovery cache
+DISCOVERY_CACHE_HOURS = 'discovery_cache_hours'
+# APIs whose cached discovery documents are never refreshed
+DISCOVERY_CACHE_PINNED_APIS = 'discovery_cache_pinned_apis'
 # Domain obtained from gam.cfg or oauth2.txt
 DOMAIN = 'domain'
 # directory for file output
@@ -181,6 +195,10 @@ GCP_ORG_ID = 'gcp_org_id'
 GMAIL_CSE_INCERT_DIR = 'gmail_cse_incert_dir'
 # Gmail CSE KACL wrapped key files
 GMAIL_CSE_INKEY_DIR = 'gmail_cse_inkey_dir'
+# Hours that cached group memberships are used for recursive group expansion
+GROUP_MEMBERSHIP_CACHE_HOURS = 'group_membership_cache_hours'
+# HTTP transport: httplib2, pooled (shared keep-alive connection pool) or http2 (shared HTTP/2 connection pool)
+HTTP_TRANSPORT = 'http_transport'
 # directory for file input
 INPUT_DIR = 'input_dir'
 # When processing items in batches, how many seconds should GAM wait between batches
@@ -203,6 +221,8 @@ MESSAGE_MAX_RESULTS = 'message_max_results'
 MOBILE_MAX_RESULTS = 'mobile_max_results'
 # Number of parallel multiprocess pool.apply_async calls; -1: no limit, 0: NUM_THREADS, >0: specific limit
 MULTIPROCESS_POOL_LIMIT = 'multiprocess_pool_limit'
+# Number of threads in each gam batch/csv process; the num_threads commands are run by num_threads/multiprocess_threads processes
+MULTIPROCESS_THREADS = 'multiprocess_threads'
 # Value to substitute for NEVER_TIME
 NEVER_TIME = 'never_time'
 # If no_browser is False, writeCSVfile won't open a browser when todrive is set
@@ -272,12 +292,18 @@ SMTP_HOST = 'smtp_host'
 SMTP_USERNAME = 'smtp_username'
 # SMTP password
 SMTP_PASSWORD = 'smtp_password'
+# Cache service account access tokens in cache_dir
+SVCACCT_TOKEN_CACHE = 'svcacct_token_cache'
+# Cached service account access tokens expiring within this many seconds are refreshed
+SVCACCT_TOKEN_CACHE_MARGIN = 'svcacct_token_cache_margin'
 # Time Zone
 TIMEZONE = 'timezone'
 ## Minimum TLS Version required for HTTPS connections
 TLS_MIN_VERSION = 'tls_min_version'
 ## Maximum TLS Version used for HTTPS connections
 TLS_MAX_VERSION = 'tls_max_version'
+# Size in megabytes of the chunks of a resumable todrive upload
+TODRIVE_CHUNK_SIZE = 'todrive_chunk_size'
 # Clear basic filter when updating an existing sheet
 TODRIVE_CLEARFILTER = 'todrive_clearfilter'
 # Use client access for todrive
@@ -312,6 +338,12 @@ TODRIVE_UPLOAD_NODATA = 'todrive_upload_nodata'
 TODRIVE_USER = 'todrive_user'
 # Truncate Client ID
 TRUNCATE_CLIENT_ID  = 'truncate_client_id'
+# Hours that user/group ID to email address mappings are saved in cache_dir; 0 keeps them in memory only
+UID_CACHE_HOURS = 'uid_cache_hours'
+# Resolve this many uncached IDs with one list of all users/groups; 0 disables prefetching
+UID_CACHE_PREFETCH_THRESHOLD = 'uid_cache_prefetch_threshold'
+# Maximum number of user/group ID to email address mappings kept in memory; 0 disables the cache
+UID_CACHE_SIZE = 'uid_cache_size'
 # Update CrOS org unit with orgUnitId
 UPDATE_CROS_OU_WITH_ID = 'update_cros_ou_with_id'
 # Use admin access for chat where possible
@@ -320,6 +352,8 @@ USE_CHAT_ADMIN_ACCESS = 'use_chat_admin_access'
 USE_COURSE_OWNER_ACCESS = 'use_course_owner_access'
 # Use Project ID as Project Name and App Name
 USE_PROJECTID_AS_NAME = 'use_projectid_as_name'
+# Hours that the user directory index is used before it is refreshed
+USER_DIRECTORY_INDEX_HOURS = 'user_directory_index_hours'
 # When retrieving lists of Users from API, how many should be retrieved in each chunk
 USER_MAX_RESULTS = 'user_max_results'
 # User service account access only, no client access
@@ -338,10 +372,12 @@ CSV_OUTPUT_ROW_FILTER_ITEMS = {CSV_OUTPUT_HEADER_FILTER, CSV_OUTPUT_HEADER_DROP_
 
 Defaults = {
   ACTIVITY_MAX_RESULTS: '100',
+  ADAPTIVE_CONCURRENCY: FALSE,
   ADMIN_EMAIL: '',
   API_CALLS_RATE_CHECK: FALSE,
   API_CALLS_RATE_LIMIT: '100',
   API_CALLS_TRIES_LIMIT: '10',
+  API_PAGES_PREFETCH_DEPTH: '0',
   AUTO_BATCH_MIN: '0',
   BAIL_ON_INTERNAL_ERROR_TRIES: '2',
   BATCH_SIZE: '50',
@@ -385,6 +421,8 @@ Defaults = {
   CSV_OUTPUT_ROW_DROP_FILTER_MODE: 'anymatch',
   CSV_OUTPUT_ROW_LIMIT: '0',
   CSV_OUTPUT_SORT_HEADERS: '',
+  CSV_OUTPUT_SPILL_ROWS: '0',
+  CSV_OUTPUT_STREAMING: FALSE,
   CSV_OUTPUT_SUBFIELD_DELIMITER: '.',
   CSV_OUTPUT_TIMESTAMP_COLUMN: '',
   CSV_OUTPUT_USERS_AUDIT: FALSE,
@@ -394,6 +432,8 @@ Defaults = {
   DEVELOPER_PREVIEW_APIS: '',
   DEVELOPER_PREVIEW_API_KEY: '',
   DEVICE_MAX_RESULTS: '200',
+  DISCOVERY_CACHE_HOURS: '24',
+  DISCOVERY_CACHE_PINNED_APIS: '',
   DOMAIN: '',
   DRIVE_DIR: '',
   DRIVE_MAX_RESULTS: '1000',
@@ -405,6 +445,8 @@ Defaults = {
   GCP_ORG_ID: '',
   GMAIL_CSE_INCERT_DIR: '',
   GMAIL_CSE_INKEY_DIR: '',
+  GROUP_MEMBERSHIP_CACHE_HOURS: '0',
+  HTTP_TRANSPORT: 'httplib2',
   INPUT_DIR: '.',
   INTER_BATCH_WAIT: '0',
   LICENSE_MAX_RESULTS: '100',
@@ -416,6 +458,7 @@ Defaults = {
   MESSAGE_MAX_RESULTS: '500',
   MOBILE_MAX_RESULTS: '100',
   MULTIPROCESS_POOL_LIMIT: '0',
+  MULTIPROCESS_THREADS: '1',
   NEVER_TIME: NEVER,
   NO_BROWSER: FALSE,
   NO_CACHE: FALSE,
@@ -450,9 +493,12 @@ Defaults = {
   SMTP_HOST: '',
   SMTP_USERNAME: '',
   SMTP_PASSWORD: '',
+  SVCACCT_TOKEN_CACHE: FALSE,
+  SVCACCT_TOKEN_CACHE_MARGIN: '300',
   TIMEZONE: 'utc',
   TLS_MIN_VERSION: 'TLSv1_3',
   TLS_MAX_VERSION: '',
+  TODRIVE_CHUNK_SIZE: '10',
   TODRIVE_CLEARFILTER: FALSE,
   TODRIVE_CLIENTACCESS: FALSE,
   TODRIVE_CONVERSION: TRUE,
@@ -470,10 +516,14 @@ Defaults = {
   TODRIVE_UPLOAD_NODATA: TRUE,
   TODRIVE_USER: '',
   TRUNCATE_CLIENT_ID: FALSE,
+  UID_CACHE_HOURS: '0',
+  UID_CACHE_PREFETCH_THRESHOLD: '0',
+  UID_CACHE_SIZE: '10000',
   UPDATE_CROS_OU_WITH_ID: FALSE,
   USE_CHAT_ADMIN_ACCESS: FALSE,
   USE_COURSE_OWNER_ACCESS: FALSE,
   USE_PROJECTID_AS_NAME: FALSE,
+  USER_DIRECTORY_INDEX_HOURS: '0',
   USER_MAX_RESULTS: '500',
   USER_SERVICE_ACCOUNT_ACCESS_ONLY: FALSE,
   }
@@ -512,10 +562,12 @@ VAR_ACCESS = 'aces'
 
 VAR_INFO = {
   ACTIVITY_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 500)},
+  ADAPTIVE_CONCURRENCY: {VAR_TYPE: TYPE_BOOLEAN},
   ADMIN_EMAIL: {VAR_TYPE: TYPE_STRING, VAR_ENVVAR: 'GA_ADMIN_EMAIL', VAR_LIMITS: (0, None)},
   API_CALLS_RATE_CHECK: {VAR_TYPE: TYPE_BOOLEAN},
   API_CALLS_RATE_LIMIT: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (50, None)},
   API_CALLS_TRIES_LIMIT: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (3, 30)},
+  API_PAGES_PREFETCH_DEPTH: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, 10)},
   AUTO_BATCH_MIN: {VAR_TYPE: TYPE_INTEGER, VAR_ENVVAR: 'GAM_AUTOBATCH', VAR_LIMITS: (0, 100)},
   BAIL_ON_INTERNAL_ERROR_TRIES: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 10)},
   BATCH_SIZE: {VAR_TYPE: TYPE_INTEGER, VAR_ENVVAR: 'GAM_BATCH_SIZE', VAR_LIMITS: (1, 1000)},
@@ -559,6 +611,8 @@ VAR_INFO = {
   CSV_OUTPUT_ROW_DROP_FILTER_MODE: {VAR_TYPE: TYPE_CHOICE, VAR_CHOICES: {'allmatch': True, 'anymatch': False}},
   CSV_OUTPUT_ROW_LIMIT: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
   CSV_OUTPUT_SORT_HEADERS: {VAR_TYPE: TYPE_STRINGLIST},
+  CSV_OUTPUT_SPILL_ROWS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
+  CSV_OUTPUT_STREAMING: {VAR_TYPE: TYPE_BOOLEAN},
   CSV_OUTPUT_SUBFIELD_DELIMITER: {VAR_TYPE: TYPE_CHARACTER},
   CSV_OUTPUT_TIMESTAMP_COLUMN: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   CSV_OUTPUT_USERS_AUDIT: {VAR_TYPE: TYPE_BOOLEAN},
@@ -568,6 +622,8 @@ VAR_INFO = {
   DEVELOPER_PREVIEW_APIS: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   DEVELOPER_PREVIEW_API_KEY: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   DEVICE_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 200)},
+  DISCOVERY_CACHE_HOURS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
+  DISCOVERY_CACHE_PINNED_APIS: {VAR_TYPE: TYPE_STRINGLIST},
   DOMAIN: {VAR_TYPE: TYPE_STRING, VAR_ENVVAR: 'GA_DOMAIN', VAR_LIMITS: (0, None)},
   DRIVE_DIR: {VAR_TYPE: TYPE_DIRECTORY, VAR_ENVVAR: 'GAMDRIVEDIR'},
   DRIVE_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 1000)},
@@ -579,6 +635,8 @@ VAR_INFO = {
   GCP_ORG_ID: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   GMAIL_CSE_INCERT_DIR: {VAR_TYPE: TYPE_DIRECTORY},
   GMAIL_CSE_INKEY_DIR: {VAR_TYPE: TYPE_DIRECTORY},
+  GROUP_MEMBERSHIP_CACHE_HOURS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
+  HTTP_TRANSPORT: {VAR_TYPE: TYPE_CHOICE, VAR_CHOICES: {'httplib2': 'httplib2', 'pooled': 'pooled', 'http2': 'http2'}},
   INPUT_DIR: {VAR_TYPE: TYPE_DIRECTORY},
   INTER_BATCH_WAIT: {VAR_TYPE: TYPE_FLOAT, VAR_LIMITS: (0.0, 60.0)},
   LICENSE_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (10, 1000)},
@@ -590,6 +648,7 @@ VAR_INFO = {
   MESSAGE_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 10000)},
   MOBILE_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 100)},
   MULTIPROCESS_POOL_LIMIT: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (-1, None)},
+  MULTIPROCESS_THREADS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 100)},
   NEVER_TIME: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   NO_BROWSER: {VAR_TYPE: TYPE_BOOLEAN, VAR_SIGFILE: 'nobrowser.txt', VAR_SFFT: (FALSE, TRUE)},
   NO_CACHE: {VAR_TYPE: TYPE_BOOLEAN, VAR_SIGFILE: 'nocache.txt', VAR_SFFT: (FALSE, TRUE)},
@@ -624,9 +683,12 @@ VAR_INFO = {
   SMTP_HOST: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   SMTP_USERNAME: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   SMTP_PASSWORD: {VAR_TYPE: TYPE_PASSWORD, VAR_LIMITS: (0, None)},
+  SVCACCT_TOKEN_CACHE: {VAR_TYPE: TYPE_BOOLEAN},
+  SVCACCT_TOKEN_CACHE_MARGIN: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (60, 1800)},
   TIMEZONE: {VAR_TYPE: TYPE_TIMEZONE},
   TLS_MIN_VERSION: {VAR_TYPE: TYPE_CHOICE, VAR_ENVVAR: 'GAM_TLS_MIN_VERSION', VAR_CHOICES: TLS_CHOICE_MAP},
   TLS_MAX_VERSION: {VAR_TYPE: TYPE_CHOICE, VAR_ENVVAR: 'GAM_TLS_MAX_VERSION', VAR_CHOICES: TLS_CHOICE_MAP},
+  TODRIVE_CHUNK_SIZE: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 1024)},
   TODRIVE_CLEARFILTER: {VAR_TYPE: TYPE_BOOLEAN},
   TODRIVE_CLIENTACCESS: {VAR_TYPE: TYPE_BOOLEAN},
   TODRIVE_CONVERSION: {VAR_TYPE: TYPE_BOOLEAN},
@@ -644,10 +706,14 @@ VAR_INFO = {
   TODRIVE_UPLOAD_NODATA: {VAR_TYPE: TYPE_BOOLEAN},
   TODRIVE_USER: {VAR_TYPE: TYPE_STRING, VAR_LIMITS: (0, None)},
   TRUNCATE_CLIENT_ID: {VAR_TYPE: TYPE_BOOLEAN},
+  UID_CACHE_HOURS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
+  UID_CACHE_PREFETCH_THRESHOLD: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
+  UID_CACHE_SIZE: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
   UPDATE_CROS_OU_WITH_ID: {VAR_TYPE: TYPE_BOOLEAN},
   USE_CHAT_ADMIN_ACCESS: {VAR_TYPE: TYPE_BOOLEAN},
   USE_COURSE_OWNER_ACCESS: {VAR_TYPE: TYPE_BOOLEAN},
   USE_PROJECTID_AS_NAME: {VAR_TYPE: TYPE_BOOLEAN},
+  USER_DIRECTORY_INDEX_HOURS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (0, None)},
   USER_MAX_RESULTS: {VAR_TYPE: TYPE_INTEGER, VAR_LIMITS: (1, 500)},
   USER_SERVICE_ACCOUNT_ACCESS_ONLY: {VAR_TYPE: TYPE_BOOLEAN},
   }
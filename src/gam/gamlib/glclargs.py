@@ -1025,6 +1025,7 @@ class GamCLArgs():
   ARG_GROUPLIST = 'grouplist'
   ARG_GROUPSLIST = 'groupslist'
   ARG_GROUPMEMBERS = 'groupmembers'
+  ARG_GROUPMEMBERSHIPCACHE = 'groupmembershipcache'
   ARG_GROUPSMEMBERS = 'groupsmembers'
   ARG_GROUPTREE = 'grouptree'
   ARG_GUARDIAN = 'guardian'
@@ -1210,6 +1211,7 @@ class GamCLArgs():
   ARG_TRUSTEDAPPS = 'trustedapps'
   ARG_USER = 'user'
   ARG_USERS = 'users'
+  ARG_USERDIRECTORYINDEX = 'userdirectoryindex'
   ARG_USERCOUNTSBYORGUNIT = 'usercountsbyorgunit'
   ARG_USERINVITATION = 'userinvitation'
   ARG_USERINVITATIONS = 'userinvitations'
@@ -46,6 +46,7 @@ TOKEN_INVALID = 403
 UNKNOWN_ERROR = 600
 #
 NON_TERMINATING_ERRORS = [API_DEPRECATED, BAD_GATEWAY, GATEWAY_TIMEOUT, QUOTA_EXCEEDED, SERVICE_UNAVAILABLE, TOKEN_EXPIRED]
+THROTTLE_ERRORS = [QUOTA_EXCEEDED, SERVICE_UNAVAILABLE]
 EMAILSETTINGS_THROW_LIST = [INVALID_DOMAIN, DOES_NOT_EXIST, SERVICE_NOT_APPLICABLE, BAD_REQUEST, NAME_NOT_VALID, INTERNAL_SERVER_ERROR, INVALID_VALUE]
 #
 class apiDeprecated(Exception):
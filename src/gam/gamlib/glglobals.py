@@ -129,6 +129,10 @@ GAM_CFG_SECTION_NAME = 'gcsn'
 GAM_PATH = 'gpth'
 # Python source, PyInstaller or StaticX?
 GAM_TYPE = 'gtyp'
+# Group membership graph cache
+GROUP_MEMBERSHIP_CACHE = 'gmsc'
+# Shared HTTP connection pools for http_transport pooled|http2
+HTTP_CONNECTION_POOLS = 'hcpl'
 # Shared Service Account HTTP Object
 HTTP_OBJECT = 'http'
 # Are we on Global Compute Engine
@@ -182,9 +186,8 @@ PRINT_AGU_DOMAINS = 'pagu'
 PRINT_CROS_OUS = 'pcou'
 # OrgUnits and children for print cros
 PRINT_CROS_OUS_AND_CHILDREN = 'pcoc'
-# Check API calls rate
-RATE_CHECK_COUNT = 'rccn'
-RATE_CHECK_START = 'rcst'
+# Check API calls rate; token buckets keyed by API/user
+RATE_CHECK_BUCKETS = 'rcbk'
 # Section name from outer gam, passed to inner gams
 SECTION = 'sect'
 # Enable/disable "Getting ... " messages
@@ -199,6 +202,11 @@ STDOUT = 'stdo'
 SVCACCT_SCOPES = 'sasc'
 # Were scopes values retrieved from oauth2service.json
 SVCACCT_SCOPES_DEFINED = 'sasd'
+# Service account access token cache hits/misses
+SVCACCT_TOKEN_CACHE_HITS = 'satch'
+SVCACCT_TOKEN_CACHE_MISSES = 'satcm'
+# Service account access tokens kept in memory between commands by gam daemon
+SVCACCT_TOKENS = 'satk'
 # Most errors print a message and bail out with a return code
 # Some commands want to set a non-zero return code but not bail
 SYSEXITRC = 'sxrc'
@@ -206,6 +214,12 @@ SYSEXITRC = 'sxrc'
 SYS_ENCODING = 'syen'
 # Shared by threadBatchWorker and threadBatchGAMCommands
 TBATCH_QUEUE = 'batq'
+# Adaptive concurrency controller shared by threadBatchWorker and threadBatchGAMCommands
+TBATCH_THROTTLE = 'batt'
+# User/group ID to email address cache
+UID_EMAIL_CACHE = 'uidc'
+# User directory index
+USER_DIRECTORY_INDEX = 'udix'
 # redirected file fields: name, mode, encoding, write header, multiproces, queue
 REDIRECT_NAME = 'rdfn'
 REDIRECT_MODE = 'rdmo'
@@ -216,11 +230,13 @@ REDIRECT_ENCODING = 'rden'
 REDIRECT_WRITE_HEADER = 'rdwh'
 REDIRECT_MULTIPROCESS = 'rdmp'
 REDIRECT_QUEUE = 'rdq'
+REDIRECT_SPOOL_DIR = 'rdsd'
 REDIRECT_QUEUE_NAME = 'name'
 REDIRECT_QUEUE_CLEAR_ROW_FILTERS = 'clearRowFilters'
 REDIRECT_QUEUE_TODRIVE = 'todrive'
 REDIRECT_QUEUE_CSVPF = 'csvpf'
 REDIRECT_QUEUE_DATA = 'rows'
+REDIRECT_QUEUE_SPOOL = 'spool'
 REDIRECT_QUEUE_ARGS = 'args'
 REDIRECT_QUEUE_GLOBALS = 'globals'
 REDIRECT_QUEUE_VALUES = 'values'
@@ -286,6 +302,8 @@ Globals = {
   GAM_CFG_SECTION_NAME: '',
   GAM_PATH: '.',
   GAM_TYPE: '',
+  GROUP_MEMBERSHIP_CACHE: None,
+  HTTP_CONNECTION_POOLS: {},
   HTTP_OBJECT: None,
   IS_ON_GCE: False,
   LAST_GOT_MSG_LEN: 0,
@@ -313,8 +331,7 @@ Globals = {
   PRINT_AGU_DOMAINS: '',
   PRINT_CROS_OUS: '',
   PRINT_CROS_OUS_AND_CHILDREN: '',
-  RATE_CHECK_COUNT: 0,
-  RATE_CHECK_START: 0,
+  RATE_CHECK_BUCKETS: {},
   SECTION: None,
   SHOW_GETTINGS: True,
   SHOW_GETTINGS_GOT_NL: False,
@@ -323,7 +340,13 @@ Globals = {
   STDOUT: {},
   SVCACCT_SCOPES: {},
   SVCACCT_SCOPES_DEFINED: False,
+  SVCACCT_TOKEN_CACHE_HITS: 0,
+  SVCACCT_TOKEN_CACHE_MISSES: 0,
+  SVCACCT_TOKENS: None,
   SYSEXITRC: 0,
   SYS_ENCODING: 'utf-8',
-  TBATCH_QUEUE: None
+  TBATCH_QUEUE: None,
+  TBATCH_THROTTLE: None,
+  UID_EMAIL_CACHE: None,
+  USER_DIRECTORY_INDEX: None,
   }
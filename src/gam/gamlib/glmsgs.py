@@ -231,6 +231,7 @@ CREATE_USER_NOTIFY_MESSAGE = 'Hello #givenname# #familyname#,\n\nYou have a new
 CREATE_USER_NOTIFY_SUBJECT = 'Welcome to #domain#'
 CSV_DATA_ALREADY_SAVED = 'CSV data already saved'
 CSV_FILE_HEADERS = 'The CSV file ({0}) has the following headers:\n'
+CSV_OUTPUT_STREAMING_ROWS_NOT_SORTED = '{0} is True, rows written before the command completed are not sorted'
 CSV_SAMPLE_COMMANDS = 'Here are the first {0} commands {1} will run\n'
 DATA_FIELD_MISMATCH = 'datafield {0} does not match saved datafield {1}'
 DATA_TRANSFER_COMPLETED = 'Data Transfer completed: {0}\n'
@@ -287,6 +288,11 @@ FROM = 'From'
 FROM_LC = 'from'
 FULL_PATH_MUST_START_WITH_DRIVE = 'fullpath must start with {0} or {1}'
 GAM_BATCH_FILE_WRITTEN = 'GAM batch file {0} written\n'
+GAM_DAEMON_ALREADY_RUNNING = 'GAM daemon already running on socket {0}'
+GAM_DAEMON_INVALID_REQUEST = 'GAM daemon invalid request: {0}'
+GAM_DAEMON_LISTENING = 'GAM daemon listening on socket {0}\n'
+GAM_DAEMON_NOT_SUPPORTED = 'GAM daemon requires Unix domain sockets with file descriptor passing (Python 3.9+ on Linux/macOS)'
+GAM_DAEMON_STOPPED = 'GAM daemon stopped\n'
 GAM_LATEST_VERSION_NOT_AVAILABLE = 'GAM Latest Version information not available'
 GAM_OUT_OF_MEMORY = 'GAM has run out of memory. If this is a large Google Workspace instance, you should use a 64-bit version of GAM on Windows or a 64-bit version of Python on other systems.'
 GENERATING_NEW_PRIVATE_KEY = 'Generating new private key'
@@ -297,12 +303,14 @@ GOOGLE_DELEGATION_ERROR = 'Google delegation error, delegator and delegate both
 GOT = 'Got'
 GROUP_MAPS_TO_MULTIPLE_OUS = 'File: {0}, Group: {1} references multiple OUs: {2}'
 GROUP_MAPS_TO_OU_INVALID_ROW = 'File: {0}, Invalid row, must contain non-blank <EmailAddress> and <OrgUnitPath>: <{1}> <{2}>'
+GROUP_MEMBERSHIP_CACHE_NOT_ENABLED = 'The group membership cache is not enabled; set group_membership_cache_hours to a value greater than 0 and no_cache to False'
 GUARDIAN_INVITATION_STATUS_NOT_PENDING = 'Guardian invitation status is not PENDING'
 HAS_CHILD_ORGS = 'Has child {0}'
 HAS_INVALID_FORMAT = '{0}: {1}, Has invalid format'
 HEADER_NOT_FOUND_IN_CSV_HEADERS = 'Header "{0}" not found in CSV headers of "{1}".'
 HELP_SYNTAX = 'Help: Syntax in file {0}\n'
 HELP_WIKI = 'Help: Documentation is at {0}\n'
+HTTP_TRANSPORT_HTTP2_NOT_AVAILABLE = 'http_transport = http2 requires the httpx package with HTTP/2 support: pip install httpx[http2]'
 IGNORED = 'Ignored'
 INSTRUCTIONS_CLIENT_SECRETS_JSON = 'Please run\n\ngam create|use project\ngam oauth create\n\nto create and authorize a Client account.\n'
 INSTRUCTIONS_OAUTH2SERVICE_JSON = 'Please run\n\ngam create|use project\ngam user <user> update serviceaccount\n\nto create and authorize a Service account.\n'
@@ -489,6 +497,7 @@ See: https://github.com/GAM-team/GAM/wiki/Authorization#advanced-use
 RESOURCE_CAPACITY_FLOOR_REQUIRED = 'Options "capacity <Number>" (<Number> > 0) and "floor <String>" required'
 RESOURCE_FLOOR_REQUIRED = 'Option "floor <String>" required'
 RESULTS_TOO_LARGE_FOR_GOOGLE_SPREADSHEET = 'Results are too large for Google Spreadsheets. Uploading as a regular CSV file.'
+RESUMING_DOWNLOAD_AT_BYTE = 'Resuming download at byte {0}'
 RETRIES_EXHAUSTED = 'Retries {0} exhausted'
 RETRYING_GOOGLE_SHEET_EXPORT_SLEEPING = 'Retrying Google Sheet export {0}/{1}. Sleeping {2} seconds\n'
 ROLE_MUST_BE_ORGANIZER = 'Role must be organizer'
@@ -515,6 +524,7 @@ SUFFIX_NOT_ALLOWED_WITH_CUSTOMLANGUAGE = 'Suffix {0} not allowed with customLang
 TASKLIST_TITLE_NOT_FOUND = 'Task list title not found'
 THREAD = 'thread'
 THREADS = 'threads'
+THROTTLING_ERRORS_USING_N_PROCESSES = '{0},0/{1},Throttling errors: {2}, using {3} {4}\n'
 TO = 'To'
 TO_LC = 'to'
 TO_MAXIMUM_OF = 'to maximum of'
@@ -549,6 +559,7 @@ USE_MIMETYPE_TO_SPECIFY_GOOGLE_FORMAT = 'Use "mimetype <MimeType>" to specify Go
 USED = 'Used'
 USER_BELONGS_TO_N_GROUPS_THAT_MAP_TO_ORGUNITS = 'User belongs to {0} groups ({1}) that map to OUs'
 USER_CANCELLED = 'User cancelled'
+USER_DIRECTORY_INDEX_NOT_ENABLED = 'The user directory index is not enabled; set user_directory_index_hours to a value greater than 0 and no_cache to False'
 USER_HAS_MULTIPLE_DIRECT_OR_INHERITED_MEMBERSHIPS_IN_GROUP = 'User has multiple direct or inherited memberships in group'
 USER_IN_OTHER_DOMAIN = '{0}: {1} in other domain.'
 USER_IS_NOT_ORGANIZER = 'User is not organizer, use anyorganizer option to override'
@@ -556,6 +567,7 @@ USER_NOT_IN_MATCHUSERS = 'User not in matchusers'
 USER_SUBS_NOT_ALLOWED_TAG_REPLACEMENT = 'user substitutions not allowed in replace <Tag> <String>'
 USE_DOIT_ARGUMENT_TO_PERFORM_ACTION = 'Use the "doit" argument to perform action'
 USING_N_PROCESSES = '{0},0/{1},Using {2} {3}...\n'
+USING_N_PROCESSES_M_THREADS = '{0},0/{1},Using {2} {3} with {4} {5} each...\n'
 VALUES_ARE_NOT_CONSISTENT = 'Values are not consistent'
 VERSION_UPDATE_AVAILABLE = 'Version update available'
 WAITING_FOR_DATA_TRANSFER_TO_COMPLETE_SLEEPING = 'Waiting for Data Transfer to complete. Sleeping {0} seconds\n'
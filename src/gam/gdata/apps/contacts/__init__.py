@@ -837,6 +837,9 @@ class ContactsFeed(gdata.BatchFeed, gdata.LinkFinder):
 def ContactsFeedFromString(xml_string):
   return atom.CreateClassFromXMLString(ContactsFeed, xml_string)
 
+def ContactsFeedEntriesFromString(xml_string):
+  return atom.IterateEntriesFromXMLString(ContactsFeed, xml_string)
+
 class GroupEntry(gdata.BatchEntry):
   """Represents a contact group."""
   _children = gdata.BatchEntry._children.copy()
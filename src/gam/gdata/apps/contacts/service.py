@@ -94,6 +94,17 @@ class ContactsService(gdata.service.GDataService):
     except gdata.service.RequestError as e:
       raise gdata.apps.service.AppsForYourDomainException(e.args[0])
 
+  def GetContactsFeedEntries(self, uri=None,
+                             extra_headers=None, url_params=None, escape_params=True):
+    """Like GetContactsFeed, but returns (feed, entries) with the entries parsed as they are iterated."""
+    uri = uri or self.GetContactFeedUri()
+    try:
+      return self.Get(uri,
+                      url_params=url_params, extra_headers=extra_headers, escape_params=escape_params,
+                      converter=gdata.apps.contacts.ContactsFeedEntriesFromString)
+    except gdata.service.RequestError as e:
+      raise gdata.apps.service.AppsForYourDomainException(e.args[0])
+
   def GetContact(self, uri):
     try:
       return self.Get(uri, converter=gdata.apps.contacts.ContactEntryFromString)
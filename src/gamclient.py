@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Thin client that runs a GAM command in a resident gam daemon
+
+Usage: python3 gamclient.py [socket <FileName>] <GAM argument list>
+
+Start the daemon with: gam daemon [socket <FileName>]
+The default socket is gamdaemon.sock in the GAM configuration directory,
+$GAMCFGDIR or ~/.gam. The client's stdin, stdout and stderr are passed to the
+daemon, the command runs in the client's current directory and the client
+exits with the command's return code.
+Only the Python standard library is used; the gam package is not imported.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+
+GAM_DAEMON_SOCKET_FILE = 'gamdaemon.sock'
+GAM_DAEMON_HEADER = struct.Struct('!I')
+SOCKET_ERROR_RC = 3
+KEYBOARD_INTERRUPT_RC = 8
+
+def main():
+  args = sys.argv[1:]
+  if len(args) >= 2 and args[0] == 'socket':
+    socketPath = os.path.expanduser(args[1])
+    args = args[2:]
+  else:
+    socketPath = os.path.join(os.path.expanduser(os.environ.get('GAMCFGDIR', '~/.gam')), GAM_DAEMON_SOCKET_FILE)
+  request = json.dumps({'args': ['gam']+args, 'cwd': os.getcwd()}).encode('utf-8')
+  sys.stdout.flush()
+  sys.stderr.flush()
+  response = bytearray()
+  try:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+      sock.connect(socketPath)
+      socket.send_fds(sock, [GAM_DAEMON_HEADER.pack(len(request))], [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+      sock.sendall(request)
+      while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+          break
+        response.extend(chunk)
+  except OSError as e:
+    sys.stderr.write(f'ERROR: gam daemon socket {socketPath}: {str(e)}\n')
+    sys.exit(SOCKET_ERROR_RC)
+  except KeyboardInterrupt:
+    sys.exit(KEYBOARD_INTERRUPT_RC)
+  try:
+    sys.exit(json.loads(response)['rc'])
+  except (KeyError, TypeError, ValueError):
+    sys.stderr.write(f'ERROR: gam daemon socket {socketPath}: no return code received\n')
+    sys.exit(SOCKET_ERROR_RC)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark: flattenJSON vs the previous recursive implementation
+
+Usage: python tools/bench_flattenjson.py [payloads.json|payloads.jsonl] [repeat]
+
+The script adds its parent directory to sys.path so that the gam package can be imported;
+it can be run from any directory.
+Payloads are a JSON list of objects or one JSON object per line, e.g. the
+JSON column of gam print users allfields formatjson quotechar "'";
+without a file, synthetic Directory user objects are used.
+The script exits non-zero if the two implementations produce different output,
+including the order of the flattened keys.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gam
+from gam.gamlib import glcfg as GC
+
+GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER] = '.'
+GC.Values[GC.CSV_OUTPUT_CONVERT_CR_NL] = False
+
+TIME_OBJECTS = {'creationTime', 'deletionTime', 'lastLoginTime'}
+
+# The recursive flattenJSON that was replaced, kept for comparison
+def referenceFlattenJSON(topStructure, flattened=None,
+                         listLimit=None, skipObjects=None, timeObjects=None, noLenObjects=None, simpleLists=None, delimiter=None):
+  def _flatten(structure, key, path):
+    if not isinstance(structure, (dict, list)):
+      if key not in timeObjects:
+        if isinstance(structure, str):
+          if GC.Values[GC.CSV_OUTPUT_CONVERT_CR_NL] and (structure.find('\n') >= 0 or structure.find('\r') >= 0):
+            flattened[path] = gam.escapeCRsNLs(structure)
+          else:
+            flattened[path] = structure
+        else:
+          flattened[path] = structure
+      else:
+        if isinstance(structure, str) and not structure.isdigit():
+          flattened[path] = gam.formatLocalTime(structure)
+        else:
+          flattened[path] = gam.formatLocalTimestamp(structure)
+    elif isinstance(structure, list):
+      listLen = len(structure)
+      listLen = min(listLen, listLimit or listLen)
+      if key in simpleLists:
+        flattened[path] = delimiter.join(structure[:listLen])
+      else:
+        if key not in noLenObjects:
+          flattened[path] = listLen
+        for i in range(listLen):
+          _flatten(structure[i], '', f'{path}{GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER]}{i}')
+    else:
+      if structure:
+        for k, v in sorted(structure.items()):
+          if k not in gam.DEFAULT_SKIP_OBJECTS:
+            _flatten(v, k, f'{path}{GC.Values[GC.CSV_OUTPUT_SUBFIELD_DELIMITER]}{k}')
+      else:
+        flattened[path] = ''
+
+  flattened = flattened or {}
+  allSkipObjects = gam.DEFAULT_SKIP_OBJECTS.union(skipObjects or set())
+  timeObjects = timeObjects or set()
+  noLenObjects = noLenObjects or set()
+  simpleLists = simpleLists or set()
+  for k, v in sorted(topStructure.items()):
+    if k not in allSkipObjects:
+      _flatten(v, k, k)
+  return flattened
+
+def makeUsers(count):
+  rnd = random.Random(42)
+  users = []
+  for i in range(count):
+    email = f'user{i}@example.com'
+    user = {'kind': 'admin#directory#user', 'id': f'{100000000000000000000+i}', 'etag': f'"{i:032x}"',
+            'primaryEmail': email, 'name': {'givenName': f'Given{i}', 'familyName': f'Family{i}', 'fullName': f'Given{i} Family{i}'},
+            'isAdmin': rnd.random() < 0.01, 'isDelegatedAdmin': False, 'agreedToTerms': True, 'suspended': rnd.random() < 0.05,
+            'archived': False, 'changePasswordAtNextLogin': False, 'ipWhitelisted': False,
+            'emails': [{'address': email, 'primary': True}]+[{'address': f'alias{i}.{j}@example.com'} for j in range(rnd.randrange(3))],
+            'phones': [{'value': f'+1 555 {i:07d}', 'type': 'work'}] if rnd.random() < 0.5 else [],
+            'organizations': [{'title': 'Engineer', 'primary': True, 'customType': '', 'department': f'Dept{rnd.randrange(20)}'}],
+            'languages': [{'languageCode': 'en', 'preference': 'preferred'}],
+            'aliases': [f'alias{i}.{j}@example.com' for j in range(rnd.randrange(3))],
+            'nonEditableAliases': [f'user{i}@example.test-google-a.com'],
+            'customerId': 'C01234567', 'orgUnitPath': f'/Dept{rnd.randrange(20)}', 'isMailboxSetup': True,
+            'isEnrolledIn2Sv': rnd.random() < 0.5, 'isEnforcedIn2Sv': False, 'includeInGlobalAddressList': True,
+            'thumbnailPhotoUrl': f'https://www.google.com/s2/photos/private/{i:020x}',
+            'lastLoginTime': '2024-03-01T12:34:56.000Z', 'creationTime': '2019-01-01T00:00:00.000Z',
+            'customSchemas': {'Employee': {'EmployeeID': str(i), 'Manager': f'user{rnd.randrange(count)}@example.com'}}}
+    users.append(user)
+  return users
+
+def loadPayloads(filename):
+  with open(filename, 'r', encoding='utf-8') as f:
+    data = f.read()
+  if data.lstrip().startswith('['):
+    return json.loads(data)
+  return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+def timeIt(function, payloads, repeat):
+  start = time.perf_counter()
+  for _ in range(repeat):
+    results = [list(function(payload, timeObjects=TIME_OBJECTS).items()) for payload in payloads]
+  return (time.perf_counter()-start, results)
+
+def main():
+  payloads = loadPayloads(sys.argv[1]) if len(sys.argv) > 1 else makeUsers(20000)
+  repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+# formatLocalTime needs the timezone settings; use the raw time values for both implementations
+  gam.formatLocalTime = gam.formatLocalTimestamp = lambda timestamp: timestamp
+  referenceTime, referenceResults = timeIt(referenceFlattenJSON, payloads, repeat)
+  currentTime, currentResults = timeIt(gam.flattenJSON, payloads, repeat)
+  if referenceResults != currentResults:
+    mismatches = sum(1 for a, b in zip(referenceResults, currentResults) if a != b)
+    sys.stderr.write(f'ERROR: {mismatches} payloads flatten differently\n')
+    sys.exit(1)
+  count = len(payloads)*repeat
+  print(f'Payloads: {len(payloads)} x {repeat}')
+  print(f'Recursive flattenJSON: {referenceTime:8.3f}s {count/referenceTime:10.0f} objects/s')
+  print(f'Current flattenJSON:   {currentTime:8.3f}s {count/currentTime:10.0f} objects/s')
+  print(f'Speedup: {referenceTime/currentTime:.2f}x')
+
+if __name__ == '__main__':
+  main()
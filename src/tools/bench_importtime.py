@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark: time to import gam, with a regression budget
+
+Usage: python tools/bench_importtime.py [budget_ms] [repeat] [top]
+
+The script adds its parent directory to sys.path so that the gam package can be imported;
+it can be run from any directory.
+Each run imports gam in a fresh interpreter with python -X importtime;
+the fastest of repeat runs (default 5) is reported along with the top (default 15)
+slowest imports by cumulative time.
+The script exits non-zero if a module that gam loads on first use with LazyLoader
+is imported by import gam, or if the import takes longer than budget_ms (default: 1000);
+a budget_ms of 0 disables the budget.
+"""
+
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+import gam
+
+DEFAULT_BUDGET_MS = 1000.0
+# LazyLoader modules that modules gam imports eagerly load anyway;
+# google.auth.crypt imports cryptography.x509
+DEPENDENCY_IMPORTS = {'cryptography.x509', 'cryptography.x509.oid'}
+
+def lazyModules():
+  modules = set()
+  for value in vars(gam).values():
+    if isinstance(value, gam.LazyLoader):
+      modules.add(value.__name__)
+      modules.update(value._submodules)
+  return modules-DEPENDENCY_IMPORTS
+
+def importTime():
+  result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import gam'],
+                          capture_output=True, text=True, check=False, cwd=SRC_DIR)
+  if result.returncode != 0:
+    sys.stderr.write(result.stderr)
+    sys.exit(1)
+  imports = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line[len('import time:'):].split('|')
+    imports[name.strip()] = int(cumulative)
+  return imports
+
+def main():
+  budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+  repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+  top = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+  runs = [importTime() for _ in range(repeat)]
+  imports = min(runs, key=lambda run: run['gam'])
+  gamTime = imports['gam']/1000
+  print(f'import gam: {gamTime:8.1f}ms (fastest of {repeat})')
+  slowest = sorted(((name, cumulative) for name, cumulative in imports.items() if name != 'gam'), key=lambda item: item[1], reverse=True)
+  for name, cumulative in slowest[:top]:
+    print(f'  {cumulative/1000:8.1f}ms {name}')
+  rc = 0
+  eager = sorted(lazyModules().intersection(imports))
+  if eager:
+    sys.stderr.write(f'ERROR: lazily loaded modules imported by import gam: {",".join(eager)}\n')
+    rc = 1
+  if budget and gamTime > budget:
+    sys.stderr.write(f'ERROR: import gam took {gamTime:.1f}ms, budget {budget:.1f}ms\n')
+    rc = 1
+  sys.exit(rc)
+
+if __name__ == '__main__':
+  main()
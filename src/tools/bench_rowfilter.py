@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: compiled CSV row filters (CompiledRowFilter) vs RowFilterMatch
+
+Usage: python tools/bench_rowfilter.py [rows]
+
+The script adds its parent directory to sys.path so that the gam package can be imported;
+it can be run from any directory.
+Both implementations are run over the same synthetic Drive file list rows,
+first with each filter on its own and then with all of the filters together;
+the script exits non-zero if they ever disagree.
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gam
+from gam.gamlib import glcfg as GC
+
+NUM_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+GC.Values[GC.NEVER_TIME] = 'Never'
+
+TITLES = ['Owner', 'id', 'name', 'mimeType', 'modifiedTime', 'createdTime', 'viewedByMeTime', 'size', 'trashed',
+          'permissions.0.emailAddress', 'permissions.1.emailAddress', 'permissions.2.emailAddress']
+MIMETYPES = ['application/vnd.google-apps.document', 'application/vnd.google-apps.spreadsheet',
+             'application/vnd.google-apps.folder', 'application/pdf', 'image/png']
+
+def makeRows(count):
+  rnd = random.Random(42)
+  rows = []
+  for i in range(count):
+    row = {'Owner': f'user{rnd.randrange(500)}@example.com', 'id': f'{i:016x}', 'name': f'File {i}',
+           'mimeType': rnd.choice(MIMETYPES),
+           'modifiedTime': f'20{rnd.randrange(18, 25)}-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}T{rnd.randrange(24):02d}:{rnd.randrange(60):02d}:00.000Z',
+           'createdTime': f'20{rnd.randrange(10, 18)}-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}T00:00:00.000Z',
+           'viewedByMeTime': rnd.choice(['Never', '', f'2023-06-{rnd.randrange(1, 29):02d}',
+                                         f'2023-06-{rnd.randrange(1, 29):02d}T{rnd.randrange(24):02d}:00:00-07:00']),
+           'size': str(rnd.randrange(0, 10000000)), 'trashed': rnd.choice(['True', 'False'])}
+    for j in range(rnd.randrange(4)):
+      row[f'permissions.{j}.emailAddress'] = f'user{rnd.randrange(500)}@{rnd.choice(["example.com", "other.com"])}'
+    rows.append(row)
+  return rows
+
+def columnPattern(column):
+  return re.compile(column if '.' in column or '*' in column else f'^{column}$', re.IGNORECASE)
+
+ROW_FILTER = [
+  (columnPattern('mimeType'), True, 'text', '=', 'application/vnd.google-apps.spreadsheet'),
+  (columnPattern('modifiedTime'), True, 'date', '>=', '2022-01-01T00:00:00+00:00'),
+  (columnPattern('size'), True, 'count', '>', 1000),
+  (columnPattern(r'permissions.\d+.emailAddress'), True, 'regex', re.compile(r'@other\.com$', re.IGNORECASE)),
+  ]
+ROW_DROP_FILTER = [
+  (columnPattern('trashed'), True, 'boolean', True),
+  ]
+# Filters that are only checked for equivalence, each on its own
+EQUIVALENCE_FILTERS = [
+  (columnPattern('modifiedTime'), True, 'daterange', '=', '2020-01-01T00:00:00+00:00', '2022-06-30T00:00:00+00:00'),
+  (columnPattern('modifiedTime'), True, 'daterange', '!=', '2020-01-01T00:00:00+00:00', '2022-06-30T00:00:00+00:00'),
+  (columnPattern('viewedByMeTime'), True, 'daterange', '=', '2023-06-10T00:00:00+00:00', '2023-06-20T00:00:00+00:00'),
+  (columnPattern('viewedByMeTime'), True, 'date', '<=', '2023-06-15T00:00:00+00:00'),
+  (columnPattern('modifiedTime'), True, 'timerange', '=', '2021-03-01T12:00:00+00:00', '2023-09-30T06:00:00+00:00'),
+  (columnPattern('viewedByMeTime'), True, 'timerange', '!=', '2023-06-10T00:00:00+00:00', '2023-06-20T00:00:00+00:00'),
+  (columnPattern('modifiedTime'), True, 'time', '>', '2022-01-01T12:00:00+00:00'),
+  (columnPattern('modifiedTime'), True, 'timeofdayrange', '=', '08:00', '17:30'),
+  (columnPattern('size'), True, 'countrange', '!=', 1000, 5000000),
+  ]
+
+def runInterpreted(rows, rowFilter=ROW_FILTER, rowDropFilter=ROW_DROP_FILTER):
+  return [gam.RowFilterMatch(row, TITLES, rowFilter, False, rowDropFilter, False) for row in rows]
+
+def runCompiled(rows, rowFilter=ROW_FILTER, rowDropFilter=ROW_DROP_FILTER):
+  compiledRowFilter = gam.CompiledRowFilter(rowFilter, False, rowDropFilter, False)
+  return [compiledRowFilter.Match(row, TITLES) for row in rows]
+
+def checkEquivalence(rows):
+  rc = 0
+  for filterVal in ROW_FILTER+ROW_DROP_FILTER+EQUIVALENCE_FILTERS:
+    for rowFilter, rowDropFilter in [([filterVal], []), ([], [filterVal])]:
+      interpretedResult = runInterpreted(rows, rowFilter, rowDropFilter)
+      compiledResult = runCompiled(rows, rowFilter, rowDropFilter)
+      if interpretedResult != compiledResult:
+        mismatches = sum(1 for a, b in zip(interpretedResult, compiledResult) if a != b)
+        kind = 'filter' if rowFilter else 'drop filter'
+        sys.stderr.write(f'ERROR: {kind} {filterVal[2]} {filterVal[3:]}: {mismatches} rows differ between RowFilterMatch and CompiledRowFilter\n')
+        rc = 1
+  return rc
+
+def timeIt(function, rows):
+  start = time.perf_counter()
+  result = function(rows)
+  return (time.perf_counter()-start, result)
+
+def main():
+  rows = makeRows(NUM_ROWS)
+  if checkEquivalence(rows[:20000]):
+    sys.exit(1)
+  interpretedTime, interpretedResult = timeIt(runInterpreted, rows)
+  compiledTime, compiledResult = timeIt(runCompiled, rows)
+  if interpretedResult != compiledResult:
+    mismatches = sum(1 for a, b in zip(interpretedResult, compiledResult) if a != b)
+    sys.stderr.write(f'ERROR: {mismatches} rows differ between RowFilterMatch and CompiledRowFilter\n')
+    sys.exit(1)
+  print(f'Rows: {NUM_ROWS}, Selected: {sum(compiledResult)}')
+  print(f'RowFilterMatch:    {interpretedTime:8.3f}s {NUM_ROWS/interpretedTime:12.0f} rows/s')
+  print(f'CompiledRowFilter: {compiledTime:8.3f}s {NUM_ROWS/compiledTime:12.0f} rows/s')
+  print(f'Speedup: {interpretedTime/compiledTime:.1f}x')
+
+if __name__ == '__main__':
+  main()